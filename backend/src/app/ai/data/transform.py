@@ -7,6 +7,7 @@ from typing import Dict, Iterable, List, Set
 import pandas as pd
 
 from app.ai.data.schema import REQUIRED_COLUMNS
+from app.infrastructure.ingestion import IngestionSchema
 
 COLUMN_ALIASES: Dict[str, List[str]] = {
     "name": ["name", "object", "объект"],
@@ -21,28 +22,23 @@ COLUMN_ALIASES: Dict[str, List[str]] = {
 }
 
 
+DATASET_SCHEMA = IngestionSchema(COLUMN_ALIASES)
+
+
 def align_required_columns(
     df: pd.DataFrame,
     required: Iterable[str] | None = None,
     optional: Iterable[str] | None = None,
 ) -> pd.DataFrame:
-    """Return copy of df where known aliases are remapped to canonical names."""
+    """Rename known aliases of df to canonical names in place (no copy) and return df."""
 
-    frame = df.copy()
     required = list(required or REQUIRED_COLUMNS)
     optional_set: Set[str] = set(optional or [])
 
-    for canonical in required:
-        if canonical in frame.columns:
-            continue
-        for alias in COLUMN_ALIASES.get(canonical, []):
-            if alias in frame.columns:
-                frame[canonical] = frame[alias]
-                break
+    frame = DATASET_SCHEMA.compile([str(column) for column in df.columns]).rename(df)
 
     missing = set(required) - set(frame.columns)
     blocking = [col for col in missing if col not in optional_set]
     if blocking:
         raise ValueError(f"Отсутствуют обязательные колонки: {', '.join(sorted(missing))}")
     return frame
-
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 """Central analytics service orchestrating dedicated domain services."""
 
-import io
+import asyncio
 from datetime import datetime
 from typing import Any, Dict, List
 
@@ -30,14 +30,14 @@ class AnalyticsService:
         cluster_service: ClusterService | None = None,
         forecast_service: ForecastService | None = None,
         anomaly_service: AnomalyService | None = None,
+        supabase: SupabaseClient | None = None,
     ) -> None:
         self.risk_service = risk_service or RiskService()
         self.summary_service = summary_service or SummaryService()
         self.cluster_service = cluster_service or ClusterService()
         self.forecast_service = forecast_service or ForecastService()
         self.anomaly_service = anomaly_service or AnomalyService()
-        settings = get_settings()
-        self._supabase = SupabaseClient(settings.supabase_url, settings.supabase_key)
+        self._supabase = supabase or SupabaseClient.from_settings(get_settings())
         self.refresh()
 
     # ------------------------------------------------------------------ #
@@ -103,10 +103,11 @@ class AnalyticsService:
         return self.risk_service.objects()
 
     async def upload_csv(self, file: UploadFile) -> Dict[str, Any]:
-        content = await file.read()
-        if not content:
-            raise HTTPException(status_code=400, detail="Файл пуст.")
-        frame = pd.read_csv(io.BytesIO(content))
+        # the spooled upload is parsed in place instead of being copied into memory first
+        try:
+            frame = await asyncio.to_thread(pd.read_csv, file.file)
+        except pd.errors.EmptyDataError as exc:
+            raise HTTPException(status_code=400, detail="Файл пуст.") from exc
         try:
             frame = align_required_columns(frame, REQUIRED_COLUMNS, optional=["condition"])
         except ValueError as exc:
@@ -1,33 +1,54 @@
 from fastapi import HTTPException, status
 
-from app.core.security import create_access_token, hash_password, verify_password
+from app.core.security import PasswordHasher, PasswordHasherBusy, create_access_token
 from app.domain.user import User
 from app.infrastructure.supabase.repositories import UserRepositorySupabase
 
 
+def issue_token(user: User) -> str:
+  return create_access_token(subject=user.login, extra_claims={"uid": user.id, "role": user.role})
+
+
 class RegisterUser:
-  def __init__(self, users: UserRepositorySupabase):
+  def __init__(self, users: UserRepositorySupabase, hasher: PasswordHasher):
     self._users = users
+    self._hasher = hasher
 
   async def __call__(self, login: str, password: str) -> User:
     existing = await self._users.get_by_login(login)
     if existing:
       raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="User already exists")
 
-    hashed_password = hash_password(password)
+    try:
+      hashed_password = await self._hasher.hash(password)
+    except PasswordHasherBusy as exc:
+      raise _busy() from exc
     return await self._users.create_user(login=login, password_hash=hashed_password)
 
 
 class AuthenticateUser:
-  def __init__(self, users: UserRepositorySupabase):
+  def __init__(self, users: UserRepositorySupabase, hasher: PasswordHasher):
     self._users = users
+    self._hasher = hasher
 
   async def __call__(self, login: str, password: str) -> str:
     user = await self._users.get_by_login(login)
     if user is None:
       raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
-    if not verify_password(password, user.password_hash):
+    try:
+      valid = await self._hasher.verify(password, user.password_hash)
+    except PasswordHasherBusy as exc:
+      raise _busy() from exc
+    if not valid:
       raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
-    return create_access_token(subject=user.login, extra_claims={"uid": user.id})
+    return issue_token(user)
+
+
+def _busy() -> HTTPException:
+  return HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    detail="Authentication is busy, retry shortly",
+    headers={"Retry-After": "1"},
+  )
@@ -0,0 +1,239 @@
+import math
+from collections.abc import Callable, Mapping
+from contextlib import AbstractAsyncContextManager
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any
+
+from app.infrastructure.jobs import Job, JobRun
+from app.infrastructure.supabase.computed_metrics import ComputedMetricsRepositorySupabase
+from app.models.condition_model import (
+  DEFAULT_THRESHOLDS,
+  DEFAULT_WEIGHTS,
+  METRIC_INPUT_COLUMNS,
+  TECHNICAL_COLUMNS,
+  ConditionBatch,
+  ConditionThresholds,
+  ConditionWeights,
+  compute_conditions_batch,
+  compute_priorities_batch,
+  model_version,
+)
+
+METRIC_OUTPUT_COLUMNS = (
+  "technical_condition",
+  "priority_score",
+  "priority_category",
+  "marker_color",
+)
+NUMERIC_INPUT_COLUMNS = ("depth_max_m", "fish_productivity")
+RECOMPUTE_ERRORS_LIMIT = 20
+RECOMPUTE_LOCK_KEY = 0x6D6574726963  # Postgres advisory lock shared by every process's recompute
+
+
+def _finite(value: Any) -> float | None:
+  try:
+    number = float(value)
+  except (TypeError, ValueError):
+    return None
+  return number if math.isfinite(number) else None
+
+
+def _non_finite(value: Any) -> bool:
+  try:
+    return not math.isfinite(float(value))
+  except (TypeError, ValueError):
+    return False
+
+
+def model_input(column: str, value: Any) -> Any:
+  """A CSV cell as the model sees it at import: ``nan``/``inf`` count as blank, as they are stored.
+
+  Other text is passed through for the model to accept or reject.
+  """
+  return "" if column in NUMERIC_INPUT_COLUMNS and _non_finite(value) else value
+
+
+def metric_inputs(row: Mapping[str, Any]) -> dict[str, Any]:
+  """Model inputs of an imported row as ``computed_metrics`` stores them (blanks as null).
+
+  Numbers are stored only when finite: NaN and infinities are not valid JSON for PostgREST.
+  """
+  inputs: dict[str, Any] = {}
+  for column in METRIC_INPUT_COLUMNS:
+    value = row.get(column)
+    if value in (None, ""):
+      inputs[column] = None
+    elif column in NUMERIC_INPUT_COLUMNS:
+      inputs[column] = _finite(value)
+    else:
+      inputs[column] = value
+  return inputs
+
+
+def metric_stamp(reference_date: date, version: str | None) -> dict[str, Any]:
+  """Columns recording what a metrics row was computed against."""
+  return {"reference_year": reference_date.year, "model_version": version}
+
+
+@dataclass
+class RecomputeReport:
+  reference_year: int
+  model_version: str
+  scanned: int = 0  # stale rows read
+  changed: int = 0  # rows with a new value, written back
+  stamped: int = 0  # rows whose values held, only re-stamped
+  failed: int = 0  # rows the model rejects or whose write failed; left stale for the next run
+  errors: list[dict[str, Any]] = field(default_factory=list)
+
+  def fail(self, error: dict[str, Any], rows: int = 1) -> None:
+    self.failed += rows
+    if len(self.errors) < RECOMPUTE_ERRORS_LIMIT:
+      self.errors.append(error)
+
+  def progress(self) -> dict[str, int]:
+    return {
+      "scanned": self.scanned,
+      "changed": self.changed,
+      "stamped": self.stamped,
+      "failed": self.failed,
+    }
+
+  def summary(self) -> dict[str, Any]:
+    return {
+      **self.progress(),
+      "reference_year": self.reference_year,
+      "model_version": self.model_version,
+      "errors": self.errors,
+    }
+
+
+class RecomputeMetrics:
+  """Brings ``computed_metrics`` up to date with the current year and condition model.
+
+  Passport age counts in calendar years, so a stored row goes stale only when the year turns or
+  the weights/thresholds change. Each row is stamped with the year and model version it was
+  computed for; only rows with another stamp are read, recomputed by the vectorized model a
+  chunk at a time, and upserted in bulk where a value changed. Rows whose values held only get
+  the new stamp. Rows stored before their model inputs were (no ``model_version``) keep their
+  condition and have priority and marker recomputed from it.
+  """
+
+  def __init__(
+    self,
+    metrics: ComputedMetricsRepositorySupabase,
+    *,
+    chunk_size: int = 1000,
+    weights: ConditionWeights = DEFAULT_WEIGHTS,
+    thresholds: ConditionThresholds = DEFAULT_THRESHOLDS,
+    reference_date: date | None = None,
+  ):
+    self._metrics = metrics
+    self._chunk_size = chunk_size
+    self._weights = weights
+    self._thresholds = thresholds
+    self._reference_date = reference_date
+
+  async def __call__(
+    self,
+    *,
+    full: bool = False,
+    on_progress: Callable[[RecomputeReport], None] | None = None,
+  ) -> RecomputeReport:
+    today = self._reference_date or date.today()
+    version = model_version(self._weights, self._thresholds)
+    report = RecomputeReport(today.year, version)
+    chunks = self._metrics.iter_stale(today.year, version, full=full, chunk_size=self._chunk_size)
+    async for rows in chunks:
+      report.scanned += len(rows)
+      modelled = [row for row in rows if row.get("model_version") is not None]
+      legacy = [row for row in rows if row.get("model_version") is None]
+      changed: list[dict[str, Any]] = []
+      for group, group_version in ((modelled, version), (legacy, None)):
+        if not group:
+          continue
+        stamp = metric_stamp(today, group_version)
+        batch = self._compute(group, group_version, today)
+        unchanged = self._diff(group, batch, stamp, changed, report)
+        if unchanged:
+          stamped = await self._metrics.stamp_many(unchanged, stamp, chunk_size=self._chunk_size)
+          report.stamped += stamped
+      if changed:
+        result = await self._metrics.upsert_many(changed, chunk_size=self._chunk_size)
+        report.changed += len(result.items)
+        for error in result.errors:
+          report.fail({"stage": "computed_metrics", "error": error.error}, rows=error.size)
+      if on_progress is not None:
+        on_progress(report)
+    return report
+
+  def _compute(
+    self, rows: list[dict[str, Any]], version: str | None, today: date
+  ) -> ConditionBatch:
+    if version is None:
+      columns = ("passport_date", "technical_condition")
+      return compute_priorities_batch(
+        {column: [row.get(column) for row in rows] for column in columns}, reference_date=today
+      )
+    return compute_conditions_batch(
+      {column: [row.get(column) for row in rows] for column in TECHNICAL_COLUMNS},
+      weights=self._weights,
+      thresholds=self._thresholds,
+      reference_date=today,
+    )
+
+  @staticmethod
+  def _diff(
+    rows: list[dict[str, Any]],
+    batch: ConditionBatch,
+    stamp: dict[str, Any],
+    changed: list[dict[str, Any]],
+    report: RecomputeReport,
+  ) -> list[str]:
+    """Appends rows with a new value to ``changed``; returns the ids of the others."""
+    unchanged: list[str] = []
+    for position, row in enumerate(rows):
+      error = batch.errors[position]
+      if error is not None:
+        report.fail({"object_id": row["object_id"], "error": error})
+        continue
+      values = {
+        "technical_condition": int(batch.technical_condition[position]),
+        "priority_score": int(batch.priority_score[position]),
+        "priority_category": str(batch.priority_category[position]),
+        "marker_color": str(batch.marker_color[position]),
+      }
+      if all(row.get(column) == values[column] for column in METRIC_OUTPUT_COLUMNS):
+        unchanged.append(row["object_id"])
+      else:
+        changed.append({"object_id": row["object_id"], **values, **stamp})
+    return unchanged
+
+
+def recompute_job(
+  recompute: RecomputeMetrics,
+  *,
+  full: bool = False,
+  lock: AbstractAsyncContextManager[bool] | None = None,
+) -> JobRun:
+  """``recompute`` as a background job reporting its counters as progress.
+
+  With ``lock`` the run happens only if the lock is taken; otherwise another process is already
+  recomputing and the job finishes at once, reporting it as skipped.
+  """
+
+  async def recompute_all(job: Job) -> dict[str, Any]:
+    report = await recompute(
+      full=full, on_progress=lambda report: job.report(report.progress(), report.errors)
+    )
+    return report.summary()
+
+  async def run(job: Job) -> dict[str, Any]:
+    if lock is None:
+      return await recompute_all(job)
+    async with lock as locked:
+      if not locked:
+        return {"skipped": "another process is recomputing metrics"}
+      return await recompute_all(job)
+
+  return run
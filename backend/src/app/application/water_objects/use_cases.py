@@ -1,4 +1,10 @@
-from app.domain.water_object import WaterObject
+from collections.abc import AsyncIterator
+from typing import Any
+
+from app.domain.bulk import BulkWriteResult
+from app.domain.water_object import WaterObject, WaterObjectPage
+from app.infrastructure.export import export_row
+from app.infrastructure.supabase.computed_metrics import ComputedMetricsRepositorySupabase
 from app.infrastructure.supabase.water_objects import WaterObjectRepositorySupabase
 from app.schemas.water_object import WaterObjectCreate, WaterObjectQuery
 
@@ -11,6 +17,15 @@ class CreateWaterObject:
     return await self._repo.create(payload)
 
 
+class CreateWaterObjects:
+  def __init__(self, repo: WaterObjectRepositorySupabase, *, chunk_size: int = 500):
+    self._repo = repo
+    self._chunk_size = chunk_size
+
+  async def __call__(self, payloads: list[WaterObjectCreate]) -> BulkWriteResult[WaterObject]:
+    return await self._repo.create_many(payloads, chunk_size=self._chunk_size)
+
+
 class ListWaterObjects:
   def __init__(self, repo: WaterObjectRepositorySupabase):
     self._repo = repo
@@ -19,6 +34,35 @@ class ListWaterObjects:
     return await self._repo.list_filtered(query)
 
 
+class PageWaterObjects:
+  def __init__(self, repo: WaterObjectRepositorySupabase):
+    self._repo = repo
+
+  async def __call__(self, query: WaterObjectQuery) -> WaterObjectPage:
+    return await self._repo.list_page(query)
+
+
+class ExportWaterObjects:
+  """Catalog rows joined with the model inputs stored in ``computed_metrics``, chunk by chunk."""
+
+  def __init__(
+    self,
+    repo: WaterObjectRepositorySupabase,
+    metrics: ComputedMetricsRepositorySupabase,
+    *,
+    chunk_size: int = 1000,
+  ):
+    self._repo = repo
+    self._metrics = metrics
+    self._chunk_size = chunk_size
+
+  async def __call__(self, query: WaterObjectQuery) -> AsyncIterator[list[dict[str, Any]]]:
+    async for chunk in self._repo.iter_chunks(query, chunk_size=self._chunk_size):
+      # the catalog view carries the computed values only: one metrics lookup per chunk
+      metrics = await self._metrics.get_by_object_ids([obj.id for obj in chunk])
+      yield [export_row(obj, metrics.get(obj.id)) for obj in chunk]
+
+
 class GetWaterObject:
   def __init__(self, repo: WaterObjectRepositorySupabase):
     self._repo = repo
@@ -1,8 +1,21 @@
-from fastapi import Depends, HTTPException, status
+from typing import Any
+
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from jose import JWTError, jwt
+from jose import JWTError
 
 from app.core.config import get_settings
+from app.core.security import PasswordHasher, TokenVerifier
+from app.infrastructure.cache import CatalogCache
+from app.infrastructure.catalog_mirror import CatalogMirror
+from app.infrastructure.catalog_version import CatalogVersion
+from app.infrastructure.jobs import JobManager
+from app.infrastructure.postgres.computed_metrics import ComputedMetricsRepositoryPostgres
+from app.infrastructure.postgres.pool import PostgresPool
+from app.infrastructure.postgres.repositories import UserRepositoryPostgres
+from app.infrastructure.postgres.water_objects import WaterObjectRepositoryPostgres
+from app.infrastructure.replicas import ReadSession
+from app.infrastructure.single_flight import SingleFlight
 from app.infrastructure.supabase.client import SupabaseClient
 from app.infrastructure.supabase.repositories import UserRepositorySupabase
 from app.infrastructure.supabase.water_objects import WaterObjectRepositorySupabase
@@ -10,30 +23,136 @@ from app.infrastructure.supabase.computed_metrics import ComputedMetricsReposito
 
 http_bearer = HTTPBearer(auto_error=False)
 
+UserRepository = UserRepositorySupabase | UserRepositoryPostgres
+WaterObjectRepository = WaterObjectRepositorySupabase | WaterObjectRepositoryPostgres
+ComputedMetricsRepository = ComputedMetricsRepositorySupabase | ComputedMetricsRepositoryPostgres
 
-def get_supabase_client() -> SupabaseClient:
-  settings = get_settings()
-  return SupabaseClient(settings.supabase_url, settings.supabase_key)
 
+async def get_supabase_client(request: Request) -> SupabaseClient:
+  return request.app.state.supabase
 
-def get_user_repository(client: SupabaseClient = Depends(get_supabase_client)) -> UserRepositorySupabase:
-  return UserRepositorySupabase(client)
 
+async def get_catalog_cache(request: Request) -> CatalogCache | None:
+  return request.app.state.catalog_cache
 
-def get_water_object_repository(
-  client: SupabaseClient = Depends(get_supabase_client),
-) -> WaterObjectRepositorySupabase:
-  return WaterObjectRepositorySupabase(client)
+
+async def get_catalog_version(request: Request) -> CatalogVersion:
+  return request.app.state.catalog_version
+
+
+async def get_catalog_mirror(request: Request) -> CatalogMirror:
+  return request.app.state.catalog_mirror
+
+
+async def get_password_hasher(request: Request) -> PasswordHasher:
+  return request.app.state.password_hasher
+
+
+async def get_single_flight(request: Request) -> SingleFlight:
+  return request.app.state.single_flight
+
+
+async def get_job_manager(request: Request) -> JobManager:
+  return request.app.state.jobs
+
+
+async def get_postgres_pool(request: Request) -> PostgresPool | None:
+  """Set only when ``repository_backend`` is ``postgres``."""
+  return request.app.state.postgres
 
 
-def get_computed_metrics_repository(
+async def get_read_session(request: Request) -> ReadSession:
+  """One per request (FastAPI caches it), so a write pins the request's later reads to the primary."""
+  return ReadSession(request.app.state.read_router)
+
+
+async def get_user_repository(
   client: SupabaseClient = Depends(get_supabase_client),
-) -> ComputedMetricsRepositorySupabase:
-  return ComputedMetricsRepositorySupabase(client)
+  pool: PostgresPool | None = Depends(get_postgres_pool),
+) -> UserRepository:
+  if pool is not None:
+    return UserRepositoryPostgres(pool)
+  return UserRepositorySupabase(client)
 
 
-def get_current_identity(
+async def get_water_object_repository(
+  client: SupabaseClient = Depends(get_supabase_client),
+  pool: PostgresPool | None = Depends(get_postgres_pool),
+  cache: CatalogCache | None = Depends(get_catalog_cache),
+  reads: ReadSession = Depends(get_read_session),
+  flights: SingleFlight = Depends(get_single_flight),
+  version: CatalogVersion = Depends(get_catalog_version),
+  mirror: CatalogMirror = Depends(get_catalog_mirror),
+) -> WaterObjectRepository:
+  if pool is not None:
+    return WaterObjectRepositoryPostgres(pool, cache, reads, flights, version, mirror)
+  return WaterObjectRepositorySupabase(client, cache, reads, flights, version, mirror)
+
+
+async def get_computed_metrics_repository(
+  client: SupabaseClient = Depends(get_supabase_client),
+  pool: PostgresPool | None = Depends(get_postgres_pool),
+  cache: CatalogCache | None = Depends(get_catalog_cache),
+  reads: ReadSession = Depends(get_read_session),
+  version: CatalogVersion = Depends(get_catalog_version),
+  mirror: CatalogMirror = Depends(get_catalog_mirror),
+) -> ComputedMetricsRepository:
+  if pool is not None:
+    return ComputedMetricsRepositoryPostgres(pool, cache, reads, version, mirror)
+  return ComputedMetricsRepositorySupabase(client, cache, reads, version, mirror)
+
+
+def job_repositories(state: Any) -> tuple[WaterObjectRepository, ComputedMetricsRepository]:
+  """Repositories for a background job, built from ``app.state`` when the job runs.
+
+  Jobs outlive the request that queued them, so they must not capture request-scoped
+  repositories: those share the request's ``ReadSession``. Each call opens a new session.
+  """
+  reads = ReadSession(state.read_router)
+  shared = (state.catalog_cache, reads)
+  mirrored = (state.catalog_version, state.catalog_mirror)
+  if state.postgres is not None:
+    return (
+      WaterObjectRepositoryPostgres(state.postgres, *shared, state.single_flight, *mirrored),
+      ComputedMetricsRepositoryPostgres(state.postgres, *shared, *mirrored),
+    )
+  return (
+    WaterObjectRepositorySupabase(state.supabase, *shared, state.single_flight, *mirrored),
+    ComputedMetricsRepositorySupabase(state.supabase, *shared, *mirrored),
+  )
+
+
+def _etag_matches(if_none_match: str | None, tag: str) -> bool:
+  if not if_none_match:
+    return False
+  # If-None-Match uses the weak comparison: a W/ prefix does not matter. "*" is not honoured:
+  # the tag is checked before the object is looked up, so existence is unknown here.
+  return tag in {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+
+
+def catalog_cache_headers(tag: str) -> dict[str, str]:
+  # clients may keep the body but must revalidate it every time
+  return {"ETag": tag, "Cache-Control": "no-cache"}
+
+
+async def get_catalog_etag(request: Request, version: CatalogVersion = Depends(get_catalog_version)) -> str:
+  """ETag of a catalog read for the current write version; answers 304 before any query runs
+  when the client's ``If-None-Match`` is still current. Taken before the read, so a write racing
+  with it can only leave the tag older than the body (the next poll refetches), never newer."""
+  tag = version.etag(request.url.path, *sorted(request.query_params.multi_items()))
+  if _etag_matches(request.headers.get("if-none-match"), tag):
+    version.not_modified += 1
+    raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=catalog_cache_headers(tag))
+  return tag
+
+
+async def get_token_verifier(request: Request) -> TokenVerifier:
+  return request.app.state.token_verifier
+
+
+async def get_current_identity(
   credentials: HTTPAuthorizationCredentials | None = Depends(http_bearer),
+  verifier: TokenVerifier = Depends(get_token_verifier),
 ) -> dict[str, str]:
   if credentials is None:
     raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Credentials missing")
@@ -41,7 +160,7 @@ def get_current_identity(
   settings = get_settings()
 
   try:
-    payload = jwt.decode(credentials.credentials, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
+    payload = verifier.decode(credentials.credentials, settings.jwt_secret, settings.jwt_algorithm)
   except JWTError:
     raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
@@ -52,4 +171,27 @@ def get_current_identity(
   identity = {"login": str(subject)}
   if payload.get("uid"):
     identity["user_id"] = str(payload["uid"])
+  if payload.get("role"):
+    identity["role"] = str(payload["role"])
+  return identity
+
+
+async def get_optional_identity(
+  credentials: HTTPAuthorizationCredentials | None = Depends(http_bearer),
+  verifier: TokenVerifier = Depends(get_token_verifier),
+) -> dict[str, str] | None:
+  """Identity of a valid bearer token, ``None`` otherwise; for endpoints open to anonymous callers."""
+  if credentials is None:
+    return None
+  try:
+    return await get_current_identity(credentials, verifier)
+  except HTTPException:
+    return None
+
+
+async def require_expert(
+  identity: dict[str, str] = Depends(get_current_identity),
+) -> dict[str, str]:
+  if identity.get("role") != "expert":
+    raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Expert role required")
   return identity
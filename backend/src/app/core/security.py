@@ -1,15 +1,22 @@
+import asyncio
+import hashlib
+import multiprocessing
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
 import bcrypt
 from jose import jwt
 
-from app.core.config import get_settings
+from app.core.config import Settings, get_settings
+from app.core.ttl_cache import TTLCache
 
 
-def hash_password(raw_password: str) -> str:
-  settings = get_settings()
-  salt = bcrypt.gensalt(rounds=settings.bcrypt_rounds)
+def hash_password(raw_password: str, rounds: int | None = None) -> str:
+  salt = bcrypt.gensalt(rounds=rounds or get_settings().bcrypt_rounds)
   return bcrypt.hashpw(raw_password.encode("utf-8"), salt).decode("utf-8")
 
 
@@ -32,3 +39,128 @@ def create_access_token(
   if extra_claims:
     to_encode.update(extra_claims)
   return jwt.encode(to_encode, settings.jwt_secret, algorithm=settings.jwt_algorithm)
+
+
+class PasswordHasherBusy(RuntimeError):
+  pass
+
+
+class PasswordHasher:
+  """Runs bcrypt in a bounded process pool so a hash never blocks the event loop.
+
+  At most ``max_pending`` operations may be running or queued; further calls fail fast with
+  :class:`PasswordHasherBusy` instead of letting a login burst queue up without bound. The pool
+  is started on first use with the ``spawn`` method, so workers do not inherit the event loop.
+  A pool broken by a dead worker (e.g. the OOM killer) is replaced, and the failed call is
+  retried once on the new pool; bcrypt calls have no side effects.
+  """
+
+  def __init__(self, *, workers: int = 2, max_pending: int = 64, rounds: int = 12):
+    self._workers = workers
+    self._max_pending = max_pending
+    self._rounds = rounds
+    self._executor: ProcessPoolExecutor | None = None
+    self._pending = 0
+    self.completed = 0
+    self.rejected = 0
+    self.restarts = 0
+
+  @classmethod
+  def from_settings(cls, settings: Settings) -> "PasswordHasher":
+    return cls(
+      workers=settings.password_hash_workers,
+      max_pending=settings.password_hash_max_pending,
+      rounds=settings.bcrypt_rounds,
+    )
+
+  async def hash(self, raw_password: str) -> str:
+    return await self._run(hash_password, raw_password, self._rounds)
+
+  async def verify(self, raw_password: str, hashed_password: str) -> bool:
+    return await self._run(verify_password, raw_password, hashed_password)
+
+  async def _run(self, func, *args):
+    if self._pending >= self._max_pending:
+      self.rejected += 1
+      raise PasswordHasherBusy("Too many password operations in progress")
+    self._pending += 1
+    try:
+      try:
+        result = await self._submit(func, *args)
+      except BrokenProcessPool:
+        result = await self._submit(func, *args)
+    finally:
+      self._pending -= 1
+    self.completed += 1
+    return result
+
+  async def _submit(self, func, *args):
+    if self._executor is None:
+      self._executor = ProcessPoolExecutor(self._workers, mp_context=multiprocessing.get_context("spawn"))
+    executor = self._executor
+    try:
+      return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+    except BrokenProcessPool:
+      # concurrent calls all see the same broken pool; only the first one replaces it
+      if self._executor is executor:
+        executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+        self.restarts += 1
+      raise
+
+  def close(self) -> None:
+    if self._executor is not None:
+      self._executor.shutdown(wait=False, cancel_futures=True)
+      self._executor = None
+
+  def stats(self) -> dict[str, int]:
+    return {
+      "workers": self._workers,
+      "pending": self._pending,
+      "max_pending": self._max_pending,
+      "completed": self.completed,
+      "rejected": self.rejected,
+      "restarts": self.restarts,
+    }
+
+
+class TokenVerifier:
+  """``jwt.decode`` with a bounded LRU of tokens that already passed verification.
+
+  Entries are keyed by a SHA-256 digest of the token (the token itself is not kept) and expire
+  at the token's ``exp``; tokens without ``exp`` are verified every time. The cache is emptied
+  whenever the secret or algorithm it is asked to verify with changes. Failures are not cached.
+  Every call returns its own copy of the claims, so a caller may change it freely.
+  """
+
+  def __init__(self, max_entries: int = 4096, *, wall_clock: Callable[[], float] = time.time):
+    # wall clock on both sides: an entry expires exactly at the token's exp
+    self._cache = TTLCache(max_entries, ttl_seconds=0, clock=wall_clock)
+    self._wall_clock = wall_clock
+    self._key_fingerprint: bytes | None = None
+
+  @classmethod
+  def from_settings(cls, settings: Settings) -> "TokenVerifier":
+    return cls(settings.token_cache_max_entries)
+
+  def decode(self, token: str, secret: str, algorithm: str) -> dict[str, Any]:
+    fingerprint = hashlib.sha256(f"{algorithm}:{secret}".encode("utf-8")).digest()
+    if fingerprint != self._key_fingerprint:
+      self._cache.clear()
+      self._key_fingerprint = fingerprint
+
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    claims = self._cache.get(key)
+    if claims is not None:
+      return dict(claims)
+
+    claims = jwt.decode(token, secret, algorithms=[algorithm])
+    exp = claims.get("exp")
+    if isinstance(exp, (int, float)):
+      remaining = exp - self._wall_clock()
+      if remaining > 0:
+        self._cache.set(key, dict(claims), ttl_seconds=remaining)
+    return claims
+
+  def stats(self) -> dict[str, int]:
+    return self._cache.stats()
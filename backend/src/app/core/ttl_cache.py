@@ -0,0 +1,62 @@
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any
+
+_MISSING = object()
+
+
+class TTLCache:
+  """Bounded LRU mapping whose entries also expire ``ttl_seconds`` after being stored."""
+
+  def __init__(self, max_entries: int, ttl_seconds: float, *, clock: Callable[[], float] = time.monotonic):
+    self._max_entries = max_entries
+    self._ttl = ttl_seconds
+    self._clock = clock
+    self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+    self.expirations = 0
+
+  def __len__(self) -> int:
+    return len(self._data)
+
+  def get(self, key: Hashable, default: Any = None) -> Any:
+    entry = self._data.get(key, _MISSING)
+    if entry is _MISSING:
+      self.misses += 1
+      return default
+    expires_at, value = entry
+    if expires_at <= self._clock():
+      del self._data[key]
+      self.expirations += 1
+      self.misses += 1
+      return default
+    self._data.move_to_end(key)
+    self.hits += 1
+    return value
+
+  def set(self, key: Hashable, value: Any, *, ttl_seconds: float | None = None) -> None:
+    ttl = self._ttl if ttl_seconds is None else ttl_seconds
+    self._data[key] = (self._clock() + ttl, value)
+    self._data.move_to_end(key)
+    while len(self._data) > self._max_entries:
+      self._data.popitem(last=False)
+      self.evictions += 1
+
+  def pop(self, key: Hashable) -> None:
+    self._data.pop(key, None)
+
+  def clear(self) -> None:
+    self._data.clear()
+
+  def stats(self) -> dict[str, int]:
+    return {
+      "size": len(self._data),
+      "max_entries": self._max_entries,
+      "hits": self.hits,
+      "misses": self.misses,
+      "evictions": self.evictions,
+      "expirations": self.expirations,
+    }
@@ -0,0 +1,22 @@
+from dataclasses import dataclass, field
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True, slots=True)
+class ChunkError:
+  start: int  # index of the first payload of the failed chunk
+  size: int
+  error: str
+
+
+@dataclass(slots=True)
+class BulkWriteResult(Generic[T]):
+  items: list[T] = field(default_factory=list)  # written rows, input order, failed chunks omitted
+  errors: list[ChunkError] = field(default_factory=list)
+  # payload index of each item, for writers that can drop rows inside a successful chunk
+  positions: list[int] = field(default_factory=list)
+
+  def failed_indexes(self) -> set[int]:
+    return {idx for err in self.errors for idx in range(err.start, err.start + err.size)}
@@ -0,0 +1,25 @@
+from typing import NamedTuple
+
+
+class BoundingBox(NamedTuple):
+  """Viewport in degrees, in ``bbox=`` order (west, south, east, north).
+
+  ``west > east`` describes a box crossing the antimeridian.
+  """
+
+  west: float
+  south: float
+  east: float
+  north: float
+
+  def contains(self, latitude: float, longitude: float) -> bool:
+    if not self.south <= latitude <= self.north:
+      return False
+    if self.west <= self.east:
+      return self.west <= longitude <= self.east
+    return longitude >= self.west or longitude <= self.east
+
+  def longitude_ranges(self) -> list[tuple[float, float]]:
+    if self.west <= self.east:
+      return [(self.west, self.east)]
+    return [(self.west, 180.0), (-180.0, self.east)]
@@ -1,5 +1,6 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import date
+from typing import Any
 
 
 @dataclass(frozen=True, slots=True)
@@ -16,3 +17,15 @@ class WaterObject:
   longitude: float
   pdf_url: str | None
   priority: int | None
+  # effective values from computed_metrics (see the water_objects_catalog view)
+  priority_category: str | None = None
+  priority_score: int | None = None
+  marker_color: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class WaterObjectPage:
+  # column dicts instead of objects when the query projects ``fields``
+  items: list[WaterObject] | list[dict[str, Any]] = field(default_factory=list)
+  total: int | None = None  # exact or estimated, depending on the requested count mode
+  next_cursor: str | None = None  # None when this is the last page
@@ -0,0 +1,40 @@
+from collections.abc import Iterable
+
+from app.core.config import Settings
+from app.core.ttl_cache import TTLCache
+
+
+class CatalogCache:
+  """Process-wide read-through cache for catalog repositories.
+
+  Objects and computed metrics are cached per id and dropped precisely when that id is written.
+  List pages can gain or lose any row on any write, so every write drops all of them.
+  ``generation`` changes on every invalidation; readers compare it before storing a value they
+  fetched, so a read racing with a write never re-populates the cache with the old row.
+  """
+
+  def __init__(self, max_entries: int = 2048, ttl_seconds: float = 60.0):
+    self.objects = TTLCache(max_entries, ttl_seconds)
+    self.metrics = TTLCache(max_entries, ttl_seconds)
+    self.pages = TTLCache(max(1, max_entries // 8), ttl_seconds)
+    self.generation = 0
+
+  @classmethod
+  def from_settings(cls, settings: Settings) -> "CatalogCache":
+    return cls(settings.catalog_cache_max_entries, settings.catalog_cache_ttl_seconds)
+
+  def invalidate_objects(self, object_ids: Iterable[str] = ()) -> None:
+    self.generation += 1
+    for object_id in object_ids:
+      self.objects.pop(object_id)
+    self.pages.clear()
+
+  def invalidate_metrics(self, object_ids: Iterable[str]) -> None:
+    object_ids = list(object_ids)
+    for object_id in object_ids:
+      self.metrics.pop(object_id)
+    # catalog rows embed the effective metric values
+    self.invalidate_objects(object_ids)
+
+  def stats(self) -> dict[str, dict[str, int]]:
+    return {"objects": self.objects.stats(), "metrics": self.metrics.stats(), "pages": self.pages.stats()}
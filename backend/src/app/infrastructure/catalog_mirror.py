@@ -0,0 +1,159 @@
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator, Callable, Mapping
+from dataclasses import replace
+from typing import Any
+
+from app.core.config import Settings
+from app.domain.water_object import WaterObject
+from app.infrastructure.nearest_index import NearestIndex
+from app.infrastructure.search_index import SearchIndex
+from app.infrastructure.spatial_index import SpatialGrid
+from app.models.condition_model import PRIORITY_CATEGORY_TO_VALUE
+
+logger = logging.getLogger(__name__)
+
+CatalogLoader = Callable[[], AsyncIterator[list[WaterObject]]]
+
+# computed_metrics columns the catalog view exposes as the object's effective values
+METRIC_FIELDS = ("technical_condition", "priority_score", "priority_category", "marker_color")
+
+
+class CatalogMirror:
+  """In-memory copy of the catalog behind the search, spatial and nearest-neighbour indexes.
+
+  Loaded in the background by :meth:`start` and kept current by the repositories of this
+  process: :meth:`add` for created objects, :meth:`update_metrics` for upserted metrics,
+  :meth:`update_pdf_url` for uploaded passports. Writes
+  made by other processes are picked up by a background reload once the copy is older than
+  ``refresh_seconds``; readers never wait for it. Objects written while a reload reads its
+  snapshot are applied on top of it.
+  """
+
+  def __init__(
+    self,
+    load: CatalogLoader,
+    *,
+    search: SearchIndex | None = None,
+    spatial: SpatialGrid | None = None,
+    nearest: NearestIndex | None = None,
+    refresh_seconds: float = 300.0,
+    clock: Callable[[], float] = time.monotonic,
+  ):
+    self._load = load
+    self.search = search if search is not None else SearchIndex()
+    self.spatial = spatial if spatial is not None else SpatialGrid()
+    self.nearest = nearest if nearest is not None else NearestIndex()
+    self._refresh_seconds = refresh_seconds
+    self._clock = clock
+    self._objects: dict[str, WaterObject] = {}
+    self._loaded_at: float | None = None
+    self._loading: asyncio.Task[None] | None = None
+    self._written_while_loading: list[WaterObject] | None = None
+    self._error: BaseException | None = None
+    self.loads = 0
+
+  @classmethod
+  def from_settings(cls, settings: Settings, load: CatalogLoader) -> "CatalogMirror":
+    return cls(
+      load,
+      spatial=SpatialGrid(settings.spatial_grid_cell_degrees),
+      refresh_seconds=settings.catalog_mirror_refresh_seconds,
+    )
+
+  def __len__(self) -> int:
+    return len(self._objects)
+
+  def start(self) -> None:
+    """Starts loading the catalog in the background."""
+    if self._loading is None or self._loading.done():
+      self._written_while_loading = []
+      self._loading = asyncio.create_task(self._reload())
+
+  async def close(self) -> None:
+    if self._loading is not None and not self._loading.done():
+      self._loading.cancel()
+      await asyncio.gather(self._loading, return_exceptions=True)
+
+  async def ready(self) -> None:
+    """Waits for the first load; re-raises its error (the next call retries) if it failed."""
+    if self.current():
+      return
+    self.start()
+    assert self._loading is not None
+    await asyncio.shield(self._loading)
+    if self._loaded_at is None:
+      error, self._error = self._error, None
+      raise error or RuntimeError("Catalog mirror is not loaded")
+
+  def current(self) -> bool:
+    """Whether the copy is loaded; starts a background reload when it is stale."""
+    if self._loaded_at is None:
+      return False
+    if self._refresh_seconds > 0 and self._clock() - self._loaded_at >= self._refresh_seconds:
+      self.start()
+    return True
+
+  def get(self, object_id: str) -> WaterObject | None:
+    return self._objects.get(object_id)
+
+  def add(self, obj: WaterObject) -> None:
+    """Mirrors a created object, or the new state of one that changed."""
+    if self._written_while_loading is not None:
+      self._written_while_loading.append(obj)
+    self._objects[obj.id] = obj
+    self.search.add(obj)
+    self.spatial.add(obj)
+    self.nearest.add(obj)
+
+  def update_metrics(self, metrics: Mapping[str, Any]) -> None:
+    """Applies an upserted ``computed_metrics`` row to its object, as the catalog view would."""
+    obj = self._objects.get(str(metrics.get("object_id")))
+    if obj is None:
+      return
+    changes = {name: metrics[name] for name in METRIC_FIELDS if metrics.get(name) is not None}
+    # the view derives the effective priority from the category
+    priority = PRIORITY_CATEGORY_TO_VALUE.get(changes.get("priority_category"))
+    if priority is not None:
+      changes["priority"] = priority
+    if changes:
+      self.add(replace(obj, **changes))
+
+  def update_pdf_url(self, object_id: str, pdf_url: str) -> None:
+    obj = self._objects.get(object_id)
+    if obj is not None:
+      self.add(replace(obj, pdf_url=pdf_url))
+
+  async def _reload(self) -> None:
+    started = self._clock()
+    try:
+      loaded: dict[str, WaterObject] = {}
+      async for chunk in self._load():
+        loaded.update((obj.id, obj) for obj in chunk)
+    except asyncio.CancelledError:
+      raise
+    except Exception as exc:  # noqa: BLE001 - readers report it, the next one retries
+      logger.exception("Catalog mirror load failed")
+      self._error = exc
+      self._written_while_loading = None
+      return
+    written, self._written_while_loading = self._written_while_loading or [], None
+    loaded.update((obj.id, obj) for obj in written)
+    self._objects = loaded
+    self.search.reset(loaded.values())
+    self.spatial.reset(loaded.values())
+    self.nearest.reset(loaded.values())
+    self._loaded_at = started
+    self.loads += 1
+
+  def stats(self) -> dict[str, Any]:
+    age = self._clock() - self._loaded_at if self._loaded_at is not None else None
+    return {
+      "objects": len(self._objects),
+      "loads": self.loads,
+      "age_seconds": round(age, 1) if age is not None else None,
+      "search": self.search.stats(),
+      "spatial": self.spatial.stats(),
+      "nearest": self.nearest.stats(),
+    }
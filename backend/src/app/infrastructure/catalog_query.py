@@ -0,0 +1,98 @@
+from collections.abc import Iterable
+from datetime import date
+from typing import Any
+
+from app.domain.water_object import WaterObject, WaterObjectPage
+from app.infrastructure.pagination import decode_cursor, encode_cursor
+from app.infrastructure.records import water_object_to_row
+from app.infrastructure.spatial_index import thin_for_zoom
+from app.schemas.water_object import WaterObjectQuery
+
+# ``WaterObjectQuery`` evaluated over mirrored objects, with the semantics of the SQL the
+# repositories run: same filters, ``order by <sort_by> [desc], id`` with Postgres null placement
+# and the same cursor format. Text sorts by code point rather than by database collation.
+
+
+def object_matches(obj: WaterObject, query: WaterObjectQuery) -> bool:
+  if query.region and query.region.lower() not in obj.region.lower():
+    return False
+  if query.resource_type and obj.resource_type != query.resource_type:
+    return False
+  if query.water_type and obj.water_type != query.water_type:
+    return False
+  if query.fauna is not None and obj.fauna != query.fauna:
+    return False
+  if query.technical_condition is not None and obj.technical_condition != query.technical_condition:
+    return False
+  if query.condition_min is not None and obj.technical_condition < query.condition_min:
+    return False
+  if query.priority is not None and obj.priority != query.priority:
+    return False
+  passport_date = obj.passport_date
+  date_from, date_to = query.passport_date_from, query.passport_date_to
+  if date_from and (passport_date is None or passport_date < date_from):
+    return False
+  if date_to and (passport_date is None or passport_date > date_to):
+    return False
+  if query.bbox is not None and not query.bbox.contains(obj.latitude, obj.longitude):
+    return False
+  return True
+
+
+def _sort_value(obj: WaterObject, column: str) -> Any:
+  value = getattr(obj, column)
+  # cursors carry dates as ISO strings, which order like the dates
+  return value.isoformat() if isinstance(value, date) else value
+
+
+def _after(value: Any, object_id: str, cursor_value: Any, after_id: str, descending: bool) -> bool:
+  """Whether a row sorts strictly after the cursor; mirrors ``pagination.keyset_filter``."""
+  if cursor_value is None:
+    return (value is None and object_id > after_id) or (descending and value is not None)
+  if value is None:
+    return not descending
+  if value == cursor_value:
+    return object_id > after_id
+  return value < cursor_value if descending else value > cursor_value
+
+
+def page_objects(objects: Iterable[WaterObject], query: WaterObjectQuery) -> WaterObjectPage:
+  matched = [obj for obj in objects if object_matches(obj, query)]
+  if query.zoom is not None:
+    matched = thin_for_zoom(matched, query.zoom)
+
+  descending = query.sort_dir == "desc"
+  column = query.sort_by
+  matched.sort(key=lambda obj: obj.id)
+  # stable: equal keys keep the id order; nulls first when descending, last when ascending
+  matched.sort(
+    key=lambda obj: (_sort_value(obj, column) is None, _sort_value(obj, column)), reverse=descending
+  )
+
+  if query.cursor:
+    cursor_value, after_id = decode_cursor(query.cursor, column, query.sort_dir)
+    start = next(
+      (
+        position
+        for position, obj in enumerate(matched)
+        if _after(_sort_value(obj, column), obj.id, cursor_value, after_id, descending)
+      ),
+      len(matched),
+    )
+  else:
+    start = query.offset
+  page = matched[start : start + query.limit]
+
+  next_cursor = None
+  if len(page) == query.limit:
+    last = page[-1]
+    next_cursor = encode_cursor(column, query.sort_dir, _sort_value(last, column), last.id)
+  items: list[WaterObject] | list[dict[str, Any]] = page
+  if query.fields:
+    rows = (water_object_to_row(obj) for obj in page)
+    items = [{name: row[name] for name in query.fields} for row in rows]
+  return WaterObjectPage(
+    items=items,
+    total=len(matched) if query.count else None,
+    next_cursor=next_cursor,
+  )
@@ -0,0 +1,38 @@
+import hashlib
+import time
+from collections.abc import Callable
+
+from app.core.config import Settings
+
+
+class CatalogVersion:
+  """Process-wide catalog write counter; read endpoints derive their ETags from it.
+
+  Every repository write (object, metric, passport URL) bumps :attr:`value`, so a tag issued
+  before the write never matches after it. The counter is process-local, like the catalog
+  cache: writes made by another worker are not seen here. Tags therefore also roll over every
+  ``window_seconds``, which bounds how long a client can keep revalidating a copy another
+  process has changed; ``0`` disables the rollover for single-process deployments.
+  """
+
+  def __init__(self, window_seconds: float = 60.0, *, clock: Callable[[], float] = time.time):
+    self._window = window_seconds
+    self._clock = clock
+    self.value = 0
+    self.not_modified = 0
+
+  @classmethod
+  def from_settings(cls, settings: Settings) -> "CatalogVersion":
+    return cls(settings.catalog_etag_window_seconds)
+
+  def bump(self) -> None:
+    self.value += 1
+
+  def etag(self, *parts: object) -> str:
+    """Strong ETag for the current version and the request identified by ``parts``."""
+    window = int(self._clock() // self._window) if self._window > 0 else 0
+    digest = hashlib.blake2b(repr((self.value, window, parts)).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+  def stats(self) -> dict[str, int | float]:
+    return {"version": self.value, "window_seconds": self._window, "not_modified": self.not_modified}
@@ -0,0 +1,146 @@
+import csv
+import io
+from collections.abc import AsyncIterable, AsyncIterator, Sequence
+from typing import Any
+
+import orjson
+
+from app.domain.water_object import WaterObject
+from app.infrastructure.records import water_object_to_row
+from app.models.condition_model import METRIC_INPUT_COLUMNS
+from app.schemas.water_object import WATER_OBJECT_FIELDS
+
+# Streaming encoders for catalog exports: each chunk from the repository becomes one piece of
+# the response body as soon as it is read, so memory is bounded by the chunk size.
+
+EXPORT_MEDIA_TYPES = {
+  "csv": "text/csv; charset=utf-8",
+  "ndjson": "application/x-ndjson",
+  "parquet": "application/vnd.apache.parquet",
+}
+
+# pyarrow type names per catalog field: every row group shares one schema, even a chunk in
+# which a column happens to be all nulls
+PARQUET_TYPES = {
+  "name": "string",
+  "region": "string",
+  "resource_type": "string",
+  "water_type": "string",
+  "fauna": "bool_",
+  "passport_date": "date32",
+  "technical_condition": "int16",
+  "latitude": "float64",
+  "longitude": "float64",
+  "pdf_url": "string",
+  "priority": "int16",
+  "id": "string",
+  "priority_category": "string",
+  "priority_score": "int32",
+  "marker_color": "string",
+  "depth_max_m": "float64",
+  "vegetation_surface": "string",
+  "vegetation_underwater": "string",
+  "phytoplankton_level": "string",
+  "fish_presence": "string",
+  "fish_productivity": "float64",
+}
+
+# catalog row followed by the condition model inputs kept in computed_metrics
+EXPORT_FIELDS = (*WATER_OBJECT_FIELDS, *METRIC_INPUT_COLUMNS)
+
+
+class ParquetUnavailable(RuntimeError):
+  """Raised when Parquet is requested but the optional ``pyarrow`` package is not installed."""
+
+
+def export_row(obj: WaterObject, metrics: dict[str, Any] | None) -> dict[str, Any]:
+  """Catalog row of ``obj`` with the model inputs of its ``computed_metrics`` row (null without one)."""
+  row = water_object_to_row(obj)
+  for column in METRIC_INPUT_COLUMNS:
+    row[column] = metrics.get(column) if metrics is not None else None
+  return row
+
+
+def _csv_value(value: Any) -> Any:
+  if isinstance(value, bool):
+    return "true" if value else "false"
+  return "" if value is None else value
+
+
+async def encode_csv(
+  chunks: AsyncIterable[list[dict[str, Any]]], columns: Sequence[str]
+) -> AsyncIterator[bytes]:
+  """CSV with ``columns`` as the header; a column the rows do not have is left empty.
+
+  Starts with a UTF-8 BOM so spreadsheets pick the encoding; the importer strips it.
+  """
+  buffer = io.StringIO()
+  writer = csv.writer(buffer)
+  writer.writerow(columns)
+  yield ("\ufeff" + buffer.getvalue()).encode("utf-8")
+  async for chunk in chunks:
+    buffer.seek(0)
+    buffer.truncate()
+    for row in chunk:
+      writer.writerow([_csv_value(row.get(column)) for column in columns])
+    yield buffer.getvalue().encode("utf-8")
+
+
+async def encode_ndjson(chunks: AsyncIterable[list[dict[str, Any]]]) -> AsyncIterator[bytes]:
+  async for chunk in chunks:
+    if chunk:
+      yield b"\n".join(orjson.dumps(row) for row in chunk) + b"\n"
+
+
+class _Sink:
+  """Write-only file for ``ParquetWriter`` whose bytes are handed out after every row group."""
+
+  def __init__(self):
+    self._parts: list[bytes] = []
+    self._position = 0
+    self.closed = False
+
+  def write(self, data: bytes) -> int:
+    self._parts.append(bytes(data))
+    self._position += len(data)
+    return len(data)
+
+  def tell(self) -> int:
+    return self._position
+
+  def flush(self) -> None:
+    pass
+
+  def close(self) -> None:
+    self.closed = True
+
+  def drain(self) -> bytes:
+    data, self._parts = b"".join(self._parts), []
+    return data
+
+
+def parquet_schema() -> Any:
+  try:
+    import pyarrow as pa
+  except ImportError as exc:
+    raise ParquetUnavailable("Parquet export needs the optional pyarrow package") from exc
+  return pa.schema([(name, getattr(pa, PARQUET_TYPES[name])()) for name in EXPORT_FIELDS])
+
+
+async def encode_parquet(chunks: AsyncIterable[list[dict[str, Any]]], schema: Any) -> AsyncIterator[bytes]:
+  """One Parquet row group per chunk; ``schema`` comes from :func:`parquet_schema`, which the
+  caller resolves before the response starts so a missing pyarrow is reported as an error."""
+  import pyarrow as pa
+  import pyarrow.parquet as pq
+
+  sink = _Sink()
+  writer = pq.ParquetWriter(sink, schema, compression="zstd")
+  try:
+    async for chunk in chunks:
+      if not chunk:
+        continue
+      writer.write_table(pa.Table.from_pylist(chunk, schema=schema))
+      yield sink.drain()
+  finally:
+    writer.close()
+  yield sink.drain()
@@ -0,0 +1,121 @@
+from collections.abc import Callable, Hashable, Mapping, Sequence
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+import pandas as pd
+
+T = TypeVar("T")
+
+
+def normalize_header(value: str | None) -> str:
+  return (value or "").strip().lower()
+
+
+@dataclass(frozen=True)
+class HeaderPlan:
+  """Header row of one file resolved against an :class:`IngestionSchema`.
+
+  ``sources`` maps every canonical column to the positions that may hold it, best alias first;
+  a row takes the first non-empty one. Built once per file, applied to every row.
+  """
+
+  headers: tuple[str, ...]
+  sources: dict[str, tuple[int, ...]]
+  missing: tuple[str, ...]
+  extra: tuple[str, ...]
+
+  def values(self, row: Sequence[str]) -> dict[str, str | None]:
+    size = len(row)
+    resolved: dict[str, str | None] = {}
+    for canonical, positions in self.sources.items():
+      value = None
+      for position in positions:
+        if position < size and row[position] != "":
+          value = row[position]
+          break
+      resolved[canonical] = value
+    return resolved
+
+  def record(self, row: Sequence[str]) -> dict[str, str]:
+    """The row keyed by its original headers, as ``csv.DictReader`` would return it."""
+    return dict(zip(self.headers, row))
+
+  def rename(self, frame: pd.DataFrame) -> pd.DataFrame:
+    """Renames the best source column of each canonical column in place; returns ``frame``."""
+    mapping = {
+      self.headers[positions[0]]: canonical
+      for canonical, positions in self.sources.items()
+      if positions and self.headers[positions[0]] != canonical and canonical not in self.headers
+    }
+    if mapping:
+      frame.rename(columns=mapping, inplace=True)
+    return frame
+
+
+class IngestionSchema:
+  """Canonical columns with their accepted header aliases, matched case-insensitively.
+
+  :meth:`compile` resolves a header row to column positions once, so per-row work is a few
+  list lookups instead of scanning every alias against every key.
+  """
+
+  def __init__(self, aliases: Mapping[str, Sequence[str]]):
+    self.columns = tuple(aliases)
+    self._lookup: dict[str, list[tuple[str, int]]] = {}
+    for canonical, names in aliases.items():
+      for rank, name in enumerate(names):
+        matches = self._lookup.setdefault(normalize_header(name), [])
+        if all(existing != canonical for existing, _ in matches):
+          matches.append((canonical, rank))
+
+  def compile(self, headers: Sequence[str | None]) -> HeaderPlan:
+    # a repeated header keeps its last column, like csv.DictReader
+    positions = {header: index for index, header in enumerate(headers) if header}
+    found: dict[str, list[tuple[int, int]]] = {canonical: [] for canonical in self.columns}
+    for header, index in positions.items():
+      for canonical, rank in self._lookup.get(normalize_header(header), ()):
+        found[canonical].append((rank, index))
+
+    sources = {canonical: tuple(index for _, index in sorted(matches)) for canonical, matches in found.items()}
+    return HeaderPlan(
+      headers=tuple(header or "" for header in headers),
+      sources=sources,
+      missing=tuple(canonical for canonical, matched in sources.items() if not matched),
+      extra=tuple(name for name in map(normalize_header, headers) if name and name not in self._lookup),
+    )
+
+
+class Vocabulary(Generic[T]):
+  """Maps free-text enumeration values through a precomputed lookup table.
+
+  Values are matched after ``strip().lower()``; ``fallback`` handles normalized values missing
+  from the table. Each distinct raw value is resolved once and remembered (up to
+  ``max_entries``), so a column with a handful of spellings costs one dict lookup per row.
+  """
+
+  def __init__(
+    self,
+    table: Mapping[str, T],
+    fallback: Callable[[str], T | None] | None = None,
+    *,
+    max_entries: int = 4096,
+  ):
+    self._table = {normalize_header(key): value for key, value in table.items()}
+    self._fallback = fallback
+    self._max_entries = max_entries
+    self._resolved: dict[Hashable, T | None] = {}
+
+  def __call__(self, value: str | None) -> T | None:
+    if value is None:
+      return None
+    try:
+      return self._resolved[value]
+    except KeyError:
+      pass
+    normalized = normalize_header(value)
+    result = self._table.get(normalized)
+    if result is None and self._fallback is not None:
+      result = self._fallback(normalized)
+    if len(self._resolved) < self._max_entries:
+      self._resolved[value] = result
+    return result
@@ -0,0 +1,186 @@
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Literal
+
+from app.core.config import Settings
+
+logger = logging.getLogger(__name__)
+
+JobStatus = Literal["queued", "running", "succeeded", "failed"]
+
+
+class JobQueueFull(RuntimeError):
+  """Raised by :meth:`JobManager.submit` when ``max_queued`` jobs are already waiting."""
+
+
+def _now() -> datetime:
+  return datetime.now(timezone.utc)
+
+
+@dataclass
+class Job:
+  """State of one background job. ``progress`` and ``errors`` are updated by the job while it runs."""
+
+  id: str
+  kind: str
+  max_errors: int
+  status: JobStatus = "queued"
+  created_at: datetime = field(default_factory=_now)
+  started_at: datetime | None = None
+  finished_at: datetime | None = None
+  progress: dict[str, int] = field(default_factory=dict)
+  errors: list[dict[str, Any]] = field(default_factory=list)
+  result: dict[str, Any] | None = None
+  error: str | None = None
+
+  @property
+  def finished(self) -> bool:
+    return self.status in ("succeeded", "failed")
+
+  def report(self, progress: dict[str, int], errors: list[dict[str, Any]] | None = None) -> None:
+    self.progress = progress
+    if errors is not None:
+      self.errors = errors[: self.max_errors]
+
+  def snapshot(self) -> dict[str, Any]:
+    return {
+      "id": self.id,
+      "kind": self.kind,
+      "status": self.status,
+      "created_at": self.created_at,
+      "started_at": self.started_at,
+      "finished_at": self.finished_at,
+      "progress": dict(self.progress),
+      "errors": list(self.errors),
+      "result": self.result,
+      "error": self.error,
+    }
+
+
+JobRun = Callable[[Job], Awaitable[dict[str, Any]]]
+
+
+class JobManager:
+  """In-process job queue: ``workers`` asyncio tasks run submitted jobs one at a time each.
+
+  No external broker, so jobs live and die with the process. Workers start on the first
+  submit; :meth:`close` cancels them on shutdown and marks the interrupted job failed. The
+  ``max_retained`` most recent jobs stay queryable; older finished ones are dropped. A
+  submit with an ``idempotency_key`` seen before returns the existing job instead of
+  queueing the same upload twice. Keys are scoped by job kind and ``owner``: the same key
+  sent to another endpoint or by another user queues its own job.
+  """
+
+  def __init__(self, workers: int = 2, *, max_queued: int = 16, max_retained: int = 500, max_errors: int = 20):
+    self._workers = workers
+    self._max_retained = max_retained
+    self._max_errors = max_errors
+    self._queue: asyncio.Queue[tuple[Job, JobRun]] = asyncio.Queue(max_queued)
+    self._tasks: list[asyncio.Task[None]] = []
+    self._jobs: OrderedDict[str, Job] = OrderedDict()
+    self._keys: dict[tuple[str, str | None, str], str] = {}
+    self.submitted = 0
+    self.succeeded = 0
+    self.failed = 0
+    self.rejected = 0
+
+  @classmethod
+  def from_settings(cls, settings: Settings) -> "JobManager":
+    return cls(
+      settings.jobs_workers,
+      max_queued=settings.jobs_max_queued,
+      max_retained=settings.jobs_max_retained,
+      max_errors=settings.jobs_max_errors,
+    )
+
+  def submit(
+    self, kind: str, run: JobRun, *, idempotency_key: str | None = None, owner: str | None = None
+  ) -> Job:
+    existing = self.find(kind, idempotency_key, owner=owner)
+    if existing is not None:
+      return existing
+
+    job = Job(id=uuid.uuid4().hex, kind=kind, max_errors=self._max_errors)
+    try:
+      self._queue.put_nowait((job, run))
+    except asyncio.QueueFull:
+      self.rejected += 1
+      raise JobQueueFull("Too many background jobs queued") from None
+    self._start_workers()
+    self.submitted += 1
+    self._jobs[job.id] = job
+    if idempotency_key is not None:
+      self._keys[(kind, owner, idempotency_key)] = job.id
+    self._trim()
+    return job
+
+  def get(self, job_id: str) -> Job | None:
+    return self._jobs.get(job_id)
+
+  def find(self, kind: str, idempotency_key: str | None, *, owner: str | None = None) -> Job | None:
+    if idempotency_key is None:
+      return None
+    return self._jobs.get(self._keys.get((kind, owner, idempotency_key), ""))
+
+  async def close(self) -> None:
+    for task in self._tasks:
+      task.cancel()
+    await asyncio.gather(*self._tasks, return_exceptions=True)
+    self._tasks = []
+
+  def _start_workers(self) -> None:
+    if not self._tasks:
+      self._tasks = [asyncio.create_task(self._work()) for _ in range(self._workers)]
+
+  async def _work(self) -> None:
+    while True:
+      job, run = await self._queue.get()
+      job.status = "running"
+      job.started_at = _now()
+      try:
+        job.result = await run(job)
+      except asyncio.CancelledError:
+        self._finish(job, "failed", "interrupted by shutdown")
+        raise
+      except Exception as exc:  # noqa: BLE001 - the job reports its own failure
+        logger.exception("Background job failed", extra={"job_id": job.id, "kind": job.kind})
+        self._finish(job, "failed", str(exc) or type(exc).__name__)
+      else:
+        self._finish(job, "succeeded")
+      finally:
+        self._queue.task_done()
+
+  def _finish(self, job: Job, status: JobStatus, error: str | None = None) -> None:
+    job.status = status
+    job.error = error
+    job.finished_at = _now()
+    if status == "succeeded":
+      self.succeeded += 1
+    else:
+      self.failed += 1
+
+  def _trim(self) -> None:
+    excess = len(self._jobs) - self._max_retained
+    if excess <= 0:
+      return
+    for job_id in [job_id for job_id, job in self._jobs.items() if job.finished][:excess]:
+      del self._jobs[job_id]
+    if len(self._keys) > len(self._jobs):
+      self._keys = {key: job_id for key, job_id in self._keys.items() if job_id in self._jobs}
+
+  def stats(self) -> dict[str, int]:
+    return {
+      "workers": self._workers,
+      "queued": self._queue.qsize(),
+      "running": sum(1 for job in self._jobs.values() if job.status == "running"),
+      "retained": len(self._jobs),
+      "submitted": self.submitted,
+      "succeeded": self.succeeded,
+      "failed": self.failed,
+      "rejected": self.rejected,
+    }
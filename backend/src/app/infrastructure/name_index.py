@@ -0,0 +1,113 @@
+import re
+from collections.abc import Callable, Iterable
+from difflib import SequenceMatcher
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+SUBSTRING_RATIO = 0.95  # strong preference for substring matches
+
+
+def normalize_name(name: str) -> str:
+  cleaned = name.replace("_", " ").replace("-", " ")
+  cleaned = re.sub(r"\s+", " ", cleaned)
+  return cleaned.strip().lower()
+
+
+def trigrams(text: str) -> set[str]:
+  return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+class NameMatcher(Generic[T]):
+  """Fuzzy object-name resolver built once over a snapshot of the catalog.
+
+  Follows the rules of a sequential scan (case-insensitive equality, then exact normalized
+  match, then the best ``SequenceMatcher`` ratio with substrings boosted to 0.95 and earlier
+  rows winning ties), but first scores only rows sharing a trigram with the target.
+  Substring matches always share every trigram of the shorter side and names shorter than
+  a trigram are always scored. The remaining rows are then checked against the best ratio
+  found so far behind the cheap ``real_quick_ratio``/``quick_ratio`` upper bounds, which
+  rarely let one through, so the result is always the one the full scan would return.
+  """
+
+  def __init__(self, items: Iterable[T], name_of: Callable[[T], str]):
+    self._items: list[T] = []
+    self._normalized: list[str] = []
+    self._by_lower: dict[str, int] = {}
+    self._by_normalized: dict[str, int] = {}
+    self._grams: dict[str, list[int]] = {}
+    self._short: list[int] = []
+
+    for position, item in enumerate(items):
+      name = name_of(item)
+      normalized = normalize_name(name)
+      self._items.append(item)
+      self._normalized.append(normalized)
+      self._by_lower.setdefault(name.lower(), position)
+      self._by_normalized.setdefault(normalized, position)
+      grams = trigrams(normalized)
+      if not grams:
+        self._short.append(position)
+      for gram in grams:
+        self._grams.setdefault(gram, []).append(position)
+
+  def __len__(self) -> int:
+    return len(self._items)
+
+  def lookup(self, name: str) -> T | None:
+    """Case-insensitive equality, the in-memory counterpart of ``get_by_name``."""
+    position = self._by_lower.get(name.lower())
+    return self._items[position] if position is not None else None
+
+  def match(self, name: str, *, min_ratio: float = 0.6) -> T | None:
+    direct = self.lookup(name)
+    if direct is not None:
+      return direct
+
+    target = normalize_name(name)
+    position = self._by_normalized.get(target)
+    if position is not None:
+      return self._items[position]
+
+    shortlist = self._candidates(target)
+    best = self._best(target, shortlist, min_ratio)
+    if len(shortlist) < len(self._items):
+      shortlisted = set(shortlist)
+      rest = [position for position in range(len(self._items)) if position not in shortlisted]
+      best = self._best(target, rest, min_ratio, best)
+    return self._items[best[1]] if best else None
+
+  def _best(
+    self,
+    target: str,
+    positions: list[int],
+    min_ratio: float,
+    best: tuple[float, int] | None = None,
+  ) -> tuple[float, int] | None:
+    """Best ``(ratio, position)`` over ``positions`` and ``best``; an earlier row wins a tie."""
+    matcher = SequenceMatcher(None, target, "")
+    for position in positions:
+      candidate = self._normalized[position]
+      substring = target in candidate or candidate in target
+      floor = max(min_ratio, best[0]) if best else min_ratio
+      matcher.set_seq2(candidate)
+      if not substring and (matcher.real_quick_ratio() < floor or matcher.quick_ratio() < floor):
+        continue
+      ratio = matcher.ratio()
+      if substring:
+        ratio = max(ratio, SUBSTRING_RATIO)
+      if ratio < min_ratio:
+        continue
+      if best is None or ratio > best[0] or (ratio == best[0] and position < best[1]):
+        best = (ratio, position)
+    return best
+
+  def _candidates(self, target: str) -> list[int]:
+    grams = trigrams(target)
+    if not grams:
+      return list(range(len(self._items)))
+    positions = set(self._short)
+    for gram in grams:
+      positions.update(self._grams.get(gram, ()))
+    # row order decides ties, as in a sequential scan
+    return sorted(positions)
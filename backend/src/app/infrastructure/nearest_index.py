@@ -0,0 +1,122 @@
+import heapq
+import math
+from collections.abc import Callable, Iterable
+
+import numpy as np
+from sklearn.neighbors import BallTree
+
+from app.domain.water_object import WaterObject
+
+EARTH_RADIUS_KM = 6371.0088
+REBUILD_MIN_PENDING = 256  # every query scans pending objects; past this many the tree is rebuilt
+REBUILD_PENDING_SHARE = 1 / 32  # ... or past this share of the tree, whichever is larger
+FILTER_OVERFETCH = 4  # neighbours fetched per result under a filter; widened until enough match
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+  lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+  a = math.sin((lat2 - lat1) / 2) ** 2
+  a += math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+  return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class NearestIndex:
+  """k-nearest objects by great-circle distance.
+
+  A haversine ``BallTree`` over the loaded positions answers in O(log n). A ball tree cannot
+  take inserts, so writes are applied incrementally around it: a created or moved object goes
+  to a small pending set that every query scans exactly, its old tree entry is masked, and the
+  tree is rebuilt from scratch on the next query once the pending set outgrows
+  ``REBUILD_MIN_PENDING`` / ``REBUILD_PENDING_SHARE``. Changes that keep the position (metrics)
+  only replace the object. Filled and kept current by the :class:`CatalogMirror`.
+  """
+
+  def __init__(self):
+    self._objects: dict[str, WaterObject] = {}
+    self._tree: BallTree | None = None
+    self._tree_ids: list[str] = []
+    self._tree_positions: dict[str, tuple[float, float]] = {}
+    self._pending: dict[str, WaterObject] = {}
+    self.queries = 0
+    self.builds = 0
+
+  def __len__(self) -> int:
+    return len(self._objects)
+
+  def reset(self, objects: Iterable[WaterObject]) -> None:
+    self._objects = {obj.id: obj for obj in objects}
+    self._build()
+
+  def add(self, obj: WaterObject) -> None:
+    """Indexes a created object, or re-indexes one that changed."""
+    self._objects[obj.id] = obj
+    if self._tree_positions.get(obj.id) == (obj.latitude, obj.longitude):
+      self._pending.pop(obj.id, None)
+    else:
+      self._pending[obj.id] = obj
+
+  def nearest(
+    self,
+    latitude: float,
+    longitude: float,
+    k: int,
+    matches: Callable[[WaterObject], bool] | None = None,
+  ) -> list[tuple[WaterObject, float]]:
+    """Up to ``k`` objects closest to the point (accepted by ``matches``), with distances in km."""
+    self.queries += 1
+    if len(self._pending) > max(REBUILD_MIN_PENDING, len(self._tree_ids) * REBUILD_PENDING_SHARE):
+      self._build()
+    found = [
+      (haversine_km(latitude, longitude, obj.latitude, obj.longitude), obj.id)
+      for obj in self._pending.values()
+      if matches is None or matches(obj)
+    ]
+    found.extend(self._from_tree(latitude, longitude, k, matches))
+    closest = heapq.nsmallest(k, found)
+    return [(self._objects[object_id], distance) for distance, object_id in closest]
+
+  def _from_tree(
+    self,
+    latitude: float,
+    longitude: float,
+    k: int,
+    matches: Callable[[WaterObject], bool] | None,
+  ) -> list[tuple[float, str]]:
+    size = len(self._tree_ids)
+    if self._tree is None or size == 0:
+      return []
+    point = np.radians([[latitude, longitude]])
+    fetch = min(size, k + len(self._pending))  # masked entries still take slots in the answer
+    if matches is not None:
+      fetch = min(size, fetch * FILTER_OVERFETCH)
+    while True:
+      distances, positions = self._tree.query(point, k=fetch)
+      found = []
+      for distance, position in zip(distances[0], positions[0]):
+        object_id = self._tree_ids[position]
+        if object_id in self._pending:
+          continue
+        if matches is None or matches(self._objects[object_id]):
+          found.append((float(distance) * EARTH_RADIUS_KM, object_id))
+      if len(found) >= k or fetch == size:
+        return found
+      fetch = min(size, fetch * FILTER_OVERFETCH)
+
+  def _build(self) -> None:
+    self._pending = {}
+    self._tree_ids = list(self._objects)
+    self._tree_positions = {obj.id: (obj.latitude, obj.longitude) for obj in self._objects.values()}
+    if not self._tree_ids:
+      self._tree = None
+      return
+    coordinates = np.radians([self._tree_positions[object_id] for object_id in self._tree_ids])
+    self._tree = BallTree(coordinates, metric="haversine")
+    self.builds += 1
+
+  def stats(self) -> dict[str, int]:
+    return {
+      "objects": len(self._objects),
+      "pending": len(self._pending),
+      "builds": self.builds,
+      "queries": self.queries,
+    }
@@ -0,0 +1,54 @@
+import base64
+import json
+from typing import Any
+
+
+class InvalidCursor(ValueError):
+  pass
+
+
+def encode_cursor(sort_by: str, sort_dir: str, value: Any, object_id: str) -> str:
+  """Opaque keyset cursor: the sort key of the last row plus the id tie-breaker."""
+  # default=str keeps dates readable when rows come from a native driver instead of JSON
+  raw = json.dumps([sort_by, sort_dir, value, object_id], ensure_ascii=False, separators=(",", ":"), default=str)
+  return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str, sort_dir: str) -> tuple[Any, str]:
+  try:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    payload = json.loads(base64.urlsafe_b64decode(padded))
+  except (ValueError, TypeError) as exc:
+    raise InvalidCursor("Malformed cursor") from exc
+  # a four-character string would unpack too; only the list encode_cursor writes is accepted
+  if not isinstance(payload, list) or len(payload) != 4 or not isinstance(payload[3], str):
+    raise InvalidCursor("Malformed cursor")
+  cursor_sort_by, cursor_sort_dir, value, object_id = payload
+  if (cursor_sort_by, cursor_sort_dir) != (sort_by, sort_dir):
+    raise InvalidCursor("Cursor was issued for a different sort order")
+  return value, object_id
+
+
+def quote_literal(value: Any) -> str:
+  """Double-quoted value for PostgREST ``or``/``and`` filter bodies."""
+  text = str(value).lower() if isinstance(value, bool) else str(value)
+  return '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def keyset_filter(sort_by: str, descending: bool, value: Any, object_id: str) -> str:
+  """Body of a PostgREST ``or`` filter selecting rows strictly after ``(value, object_id)``.
+
+  Mirrors ``order=<sort_by>[.desc],id`` with Postgres default null placement:
+  NULLS FIRST for descending and NULLS LAST for ascending order.
+  """
+  after_id = f"id.gt.{quote_literal(object_id)}"
+  if value is None:
+    same_key = f"and({sort_by}.is.null,{after_id})"
+    # With NULLS FIRST every non-null row follows the null block.
+    return f"{same_key},{sort_by}.not.is.null" if descending else same_key
+
+  op = "lt" if descending else "gt"
+  conditions = [f"{sort_by}.{op}.{quote_literal(value)}", f"and({sort_by}.eq.{quote_literal(value)},{after_id})"]
+  if not descending:
+    conditions.append(f"{sort_by}.is.null")
+  return ",".join(conditions)
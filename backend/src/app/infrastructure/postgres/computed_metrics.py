@@ -0,0 +1,167 @@
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any, TypeVar
+
+import psycopg
+from psycopg import sql
+
+from app.domain.bulk import BulkWriteResult, ChunkError
+from app.infrastructure.cache import CatalogCache
+from app.infrastructure.catalog_mirror import CatalogMirror
+from app.infrastructure.catalog_version import CatalogVersion
+from app.infrastructure.postgres.pool import PostgresPool, insert_statement
+from app.infrastructure.replicas import ReadSession
+
+T = TypeVar("T")
+
+
+class ComputedMetricsRepositoryPostgres:
+  def __init__(
+    self,
+    pool: PostgresPool,
+    cache: CatalogCache | None = None,
+    reads: ReadSession[PostgresPool] | None = None,
+    version: CatalogVersion | None = None,
+    mirror: CatalogMirror | None = None,
+  ):
+    self._pool = pool
+    self._cache = cache
+    self._reads = reads
+    self._version = version
+    self._mirror = mirror
+    self._table = "computed_metrics"
+
+  async def upsert_metric(self, payload: dict[str, Any]) -> dict[str, Any]:
+    columns = list(payload)
+    try:
+      row = await self._pool.fetch_one(
+        insert_statement(self._table, columns, 1, conflict_key="object_id"), list(payload.values())
+      )
+    finally:
+      self._invalidate([payload["object_id"]])
+    return self._mirrored([self._to_row(row) if row else payload])[0]
+
+  async def upsert_many(
+    self, payloads: list[dict[str, Any]], *, chunk_size: int = 500
+  ) -> BulkWriteResult[dict[str, Any]]:
+    result: BulkWriteResult[dict[str, Any]] = BulkWriteResult()
+    async with self._pool.connection() as conn:
+      for start in range(0, len(payloads), chunk_size):
+        chunk = payloads[start : start + chunk_size]
+        columns = list(dict.fromkeys(column for payload in chunk for column in payload))
+        params = [payload.get(column) for payload in chunk for column in columns]
+        statement = insert_statement(self._table, columns, len(chunk), conflict_key="object_id")
+        try:
+          cursor = await conn.execute(statement, params)
+          rows = await cursor.fetchall()
+        except psycopg.Error as exc:
+          result.errors.append(ChunkError(start=start, size=len(chunk), error=str(exc)))
+          continue
+        finally:
+          self._invalidate([payload["object_id"] for payload in chunk])
+        result.items.extend(self._mirrored([self._to_row(row) for row in rows] or chunk))
+    return result
+
+  async def iter_stale(
+    self, reference_year: int, model_version: str, *, full: bool = False, chunk_size: int = 1000
+  ) -> AsyncIterator[list[dict[str, Any]]]:
+    """Metrics rows computed for another year or model, with their object's ``passport_date``.
+
+    Rows without a ``model_version`` predate stored model inputs and are stale only by year;
+    ``full`` returns every row. Keyset on ``object_id``, so rows the caller leaves stale are
+    not returned twice.
+    """
+    stale = sql.SQL("true") if full else sql.SQL(
+      "(m.reference_year is distinct from %(year)s or m.model_version <> %(version)s)"
+    )
+    statement = sql.SQL(
+      "select m.*, o.passport_date from {table} m join water_objects o on o.id = m.object_id"
+      " where {stale} and m.object_id > %(after)s::uuid order by m.object_id limit %(limit)s"
+    ).format(table=sql.Identifier(self._table), stale=stale)
+    params = {
+      "year": reference_year,
+      "version": model_version,
+      "after": "00000000-0000-0000-0000-000000000000",
+      "limit": chunk_size,
+    }
+    while True:
+      rows = await self._read(lambda pool: pool.fetch_all(statement, dict(params)))
+      if rows:
+        yield [self._to_row(row) for row in rows]
+      if len(rows) < chunk_size:
+        return
+      params["after"] = str(rows[-1]["object_id"])
+
+  async def stamp_many(
+    self, object_ids: list[str], stamp: dict[str, Any], *, chunk_size: int = 500
+  ) -> int:
+    """Sets ``stamp`` columns on rows whose values did not change; returns the rows written."""
+    # the catalog view does not expose the stamp: caches and the ETag version stay valid
+    statement = sql.SQL("update {table} set {assignments} where object_id = any(%s::uuid[])")
+    statement = statement.format(
+      table=sql.Identifier(self._table),
+      assignments=sql.SQL(", ").join(
+        sql.SQL("{} = %s").format(sql.Identifier(column)) for column in stamp
+      ),
+    )
+    stamped = 0
+    async with self._pool.connection() as conn:
+      for start in range(0, len(object_ids), chunk_size):
+        chunk = object_ids[start : start + chunk_size]
+        cursor = await conn.execute(statement, [*stamp.values(), chunk])
+        stamped += cursor.rowcount
+    return stamped
+
+  async def get_by_object_ids(self, object_ids: list[str]) -> dict[str, dict[str, Any]]:
+    if not object_ids:
+      return {}
+    found: dict[str, dict[str, Any]] = {}
+    missing = object_ids
+    generation = None
+    if self._cache is not None:
+      generation = self._cache.generation
+      missing = []
+      for object_id in object_ids:
+        row = self._cache.metrics.get(object_id)
+        if row is None:
+          missing.append(object_id)
+        else:
+          found[object_id] = row
+      if not missing:
+        return found
+    statement = sql.SQL("select * from {table} where object_id = any(%s::uuid[])").format(
+      table=sql.Identifier(self._table)
+    )
+    def select(pool: PostgresPool):
+      return pool.fetch_all(statement, [missing])
+
+    rows = await self._read(select)
+    cacheable = self._cache is not None and self._cache.generation == generation
+    for row in map(self._to_row, rows):
+      found[row["object_id"]] = row
+      if cacheable:
+        self._cache.metrics.set(row["object_id"], row)
+    return found
+
+  @staticmethod
+  def _to_row(row: dict[str, Any]) -> dict[str, Any]:
+    # same shape as the PostgREST JSON rows: uuid keys as strings
+    return {**row, "object_id": str(row["object_id"])}
+
+  async def _read(self, call: Callable[[PostgresPool], Awaitable[T]]) -> T:
+    if self._reads is None:
+      return await call(self._pool)
+    return await self._reads.read(call)
+
+  def _mirrored(self, rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    if self._mirror is not None:
+      for row in rows:
+        self._mirror.update_metrics(row)
+    return rows
+
+  def _invalidate(self, object_ids: list[str]) -> None:
+    if self._reads is not None:
+      self._reads.note_write()
+    if self._version is not None:
+      self._version.bump()
+    if self._cache is not None:
+      self._cache.invalidate_metrics(object_ids)
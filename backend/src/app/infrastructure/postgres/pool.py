@@ -0,0 +1,127 @@
+from collections.abc import AsyncIterator, Sequence
+from contextlib import asynccontextmanager
+from typing import Any
+
+from psycopg import AsyncConnection, sql
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool
+
+from app.core.config import Settings
+
+Query = str | sql.Composable
+
+
+def conninfo_from_url(url: str) -> str:
+  """Drop the SQLAlchemy-style driver suffix: ``postgresql+psycopg://`` -> ``postgresql://``."""
+  scheme, sep, rest = url.partition("://")
+  return scheme.split("+", 1)[0] + sep + rest
+
+
+class PostgresPool:
+  """Process-wide async connection pool for the direct Postgres repository backend.
+
+  Connections run in autocommit mode, so a read never holds a transaction open; multi-statement
+  writes open one explicitly. With ``prepared_statements`` every query is prepared on first use
+  and the plan is reused per connection (psycopg keeps the most recent ones). Disable it behind
+  a transaction-mode pooler such as PgBouncer, which cannot keep per-connection statements.
+  """
+
+  def __init__(
+    self,
+    conninfo: str,
+    *,
+    min_size: int = 1,
+    max_size: int = 10,
+    prepared_statements: bool = True,
+  ):
+    self._pool = AsyncConnectionPool(
+      conninfo,
+      min_size=min_size,
+      max_size=max_size,
+      open=False,
+      kwargs={
+        "autocommit": True,
+        "row_factory": dict_row,
+        "prepare_threshold": 0 if prepared_statements else None,
+      },
+    )
+
+  @classmethod
+  def from_settings(cls, settings: Settings, *, url: str | None = None) -> "PostgresPool":
+    return cls(
+      conninfo_from_url(url or settings.database_url),
+      min_size=settings.database_pool_min_size,
+      max_size=settings.database_pool_max_size,
+      prepared_statements=settings.database_prepared_statements,
+    )
+
+  async def open(self) -> None:
+    await self._pool.open()
+
+  async def close(self) -> None:
+    await self._pool.close()
+
+  def connection(self):
+    """``async with pool.connection() as conn`` borrows a connection for several statements."""
+    return self._pool.connection()
+
+  async def fetch_all(self, query: Query, params: Sequence[Any] | dict[str, Any] | None = None) -> list[dict[str, Any]]:
+    async with self._pool.connection() as conn:
+      return await fetch_all(conn, query, params)
+
+  async def fetch_one(
+    self, query: Query, params: Sequence[Any] | dict[str, Any] | None = None
+  ) -> dict[str, Any] | None:
+    async with self._pool.connection() as conn:
+      cursor = await conn.execute(query, params)
+      return await cursor.fetchone()
+
+  @asynccontextmanager
+  async def try_advisory_lock(self, key: int) -> AsyncIterator[bool]:
+    """Session-level ``pg_try_advisory_lock`` held on one pooled connection for the block.
+
+    Yields whether the lock was taken; another process holding it makes the block see ``False``.
+    """
+    async with self._pool.connection() as conn:
+      cursor = await conn.execute("select pg_try_advisory_lock(%s) as locked", [key])
+      locked = bool((await cursor.fetchone())["locked"])
+      try:
+        yield locked
+      finally:
+        if locked:
+          await conn.execute("select pg_advisory_unlock(%s)", [key])
+
+  def stats(self) -> dict[str, int]:
+    return self._pool.get_stats()
+
+
+async def fetch_all(
+  conn: AsyncConnection, query: Query, params: Sequence[Any] | dict[str, Any] | None = None
+) -> list[dict[str, Any]]:
+  cursor = await conn.execute(query, params)
+  return await cursor.fetchall()
+
+
+def insert_statement(
+  table: str,
+  columns: Sequence[str],
+  row_count: int,
+  *,
+  conflict_key: str | None = None,
+) -> sql.Composed:
+  """Multi-row ``insert ... returning *``; with ``conflict_key`` an upsert updating every other column."""
+  placeholders = sql.SQL("({})").format(sql.SQL(", ").join(sql.Placeholder() * len(columns)))
+  statement = sql.SQL("insert into {table} ({columns}) values {values}").format(
+    table=sql.Identifier(table),
+    columns=sql.SQL(", ").join(map(sql.Identifier, columns)),
+    values=sql.SQL(", ").join([placeholders] * row_count),
+  )
+  if conflict_key is not None:
+    updated = [column for column in columns if column != conflict_key] or [conflict_key]
+    statement += sql.SQL(" on conflict ({key}) do update set {assignments}").format(
+      key=sql.Identifier(conflict_key),
+      assignments=sql.SQL(", ").join(
+        sql.SQL("{column} = excluded.{column}").format(column=sql.Identifier(column)) for column in updated
+      ),
+    )
+  return statement + sql.SQL(" returning *")
@@ -0,0 +1,23 @@
+from uuid import uuid4
+
+from psycopg import sql
+
+from app.domain.user import User
+from app.infrastructure.postgres.pool import PostgresPool, insert_statement
+from app.infrastructure.records import user_from_row
+
+
+class UserRepositoryPostgres:
+  def __init__(self, pool: PostgresPool):
+    self._pool = pool
+    self._table = "users"
+
+  async def get_by_login(self, login: str) -> User | None:
+    statement = sql.SQL("select * from {table} where login = %s limit 1").format(table=sql.Identifier(self._table))
+    row = await self._pool.fetch_one(statement, [login])
+    return user_from_row(row) if row else None
+
+  async def create_user(self, login: str, password_hash: str) -> User:
+    statement = insert_statement(self._table, ["id", "login", "password_hash"], 1)
+    row = await self._pool.fetch_one(statement, [str(uuid4()), login, password_hash])
+    return user_from_row(row)
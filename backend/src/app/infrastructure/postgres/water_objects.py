@@ -0,0 +1,352 @@
+from collections.abc import AsyncIterator, Awaitable, Callable
+from decimal import Decimal
+from typing import Any, TypeVar
+
+import psycopg
+from psycopg import sql
+
+from app.domain.bulk import BulkWriteResult, ChunkError
+from app.domain.water_object import WaterObject, WaterObjectPage
+from app.infrastructure.cache import CatalogCache
+from app.infrastructure.catalog_mirror import CatalogMirror
+from app.infrastructure.catalog_query import page_objects
+from app.infrastructure.catalog_version import CatalogVersion
+from app.infrastructure.name_index import NameMatcher
+from app.infrastructure.pagination import decode_cursor, encode_cursor
+from app.infrastructure.postgres.pool import PostgresPool, insert_statement
+from app.infrastructure.records import is_uuid, water_object_from_row, water_object_record
+from app.infrastructure.replicas import ReadSession
+from app.infrastructure.single_flight import SingleFlight
+from app.schemas.water_object import WaterObjectCreate, WaterObjectQuery
+
+T = TypeVar("T")
+
+# Above this many planned rows an ``estimated`` count keeps the planner estimate (as PostgREST does).
+EXACT_COUNT_LIMIT = 1000
+
+
+class WaterObjectRepositoryPostgres:
+  """Same contract as ``WaterObjectRepositorySupabase``, over a direct Postgres connection.
+
+  Reads use the ``water_objects_catalog`` view, so the join with computed metrics runs in the
+  database; cursors are interchangeable with the PostgREST backend.
+  """
+
+  def __init__(
+    self,
+    pool: PostgresPool,
+    cache: CatalogCache | None = None,
+    reads: ReadSession[PostgresPool] | None = None,
+    flights: SingleFlight | None = None,
+    version: CatalogVersion | None = None,
+    mirror: CatalogMirror | None = None,
+  ):
+    self._pool = pool  # primary: all writes
+    self._cache = cache
+    self._reads = reads  # routes reads to a replica when one is configured
+    self._flights = flights  # shares identical in-flight reads between concurrent requests
+    self._version = version  # bumped by every write; read endpoints' ETags derive from it
+    self._mirror = mirror  # in-memory catalog: serves viewport queries, mirrors every created object
+    self._table = "water_objects"
+    self._view = "water_objects_catalog"
+
+  async def create(self, payload: WaterObjectCreate) -> WaterObject:
+    record = water_object_record(payload)
+    try:
+      row = await self._pool.fetch_one(insert_statement(self._table, list(record), 1), list(record.values()))
+    finally:
+      self._invalidate()
+    return self._indexed([water_object_from_row(row)])[0]
+
+  async def create_many(
+    self, payloads: list[WaterObjectCreate], *, chunk_size: int = 500
+  ) -> BulkWriteResult[WaterObject]:
+    """Insert objects with one statement per chunk; a failed chunk is reported, not raised.
+
+    ``positions`` maps every created object back to its payload, as for the Supabase backend.
+    """
+    result: BulkWriteResult[WaterObject] = BulkWriteResult()
+    async with self._pool.connection() as conn:
+      for start in range(0, len(payloads), chunk_size):
+        records = [water_object_record(payload) for payload in payloads[start : start + chunk_size]]
+        columns = list(records[0])
+        params = [record[column] for record in records for column in columns]
+        try:
+          cursor = await conn.execute(insert_statement(self._table, columns, len(records)), params)
+          rows = await cursor.fetchall()
+        except psycopg.Error as exc:
+          result.errors.append(ChunkError(start=start, size=len(records), error=str(exc)))
+          continue
+        finally:
+          self._invalidate()
+        by_id = {str(row["id"]): row for row in rows}
+        echoed = [
+          (start + offset, record["id"])
+          for offset, record in enumerate(records)
+          if record["id"] in by_id
+        ]
+        created = [water_object_from_row(by_id[record_id]) for _, record_id in echoed]
+        result.items.extend(self._indexed(created))
+        result.positions.extend(position for position, _ in echoed)
+    return result
+
+  async def list_filtered(self, query: WaterObjectQuery) -> list[WaterObject]:
+    return (await self.list_page(query)).items
+
+  async def list_page(self, query: WaterObjectQuery) -> WaterObjectPage:
+    if query.bbox is not None and self._mirror is not None and self._mirror.current():
+      # viewport queries come from the spatial grid; the database path ignores ``zoom``
+      return page_objects(self._mirror.spatial.within(query.bbox), query)
+    key = query.model_dump_json()
+    if self._cache is not None:
+      page = self._cache.pages.get(key)
+      if page is not None:
+        return page
+    return await self._coalesce(("page", key), lambda: self._load_page(key, query))
+
+  async def _load_page(self, key: str, query: WaterObjectQuery) -> WaterObjectPage:
+    generation = self._cache.generation if self._cache is not None else None
+    page = await self._fetch_page(query)
+    if self._cache is not None and self._cache.generation == generation:
+      self._cache.pages.set(key, page)
+    return page
+
+  async def _fetch_page(self, query: WaterObjectQuery) -> WaterObjectPage:
+    descending = query.sort_dir == "desc"
+    sort_column = sql.Identifier(query.sort_by)
+    conditions, params = self._filters(query)
+    where = self._where(conditions)
+
+    page_conditions = list(conditions)
+    page_params = list(params)
+    offset = query.offset
+    if query.cursor:
+      value, after_id = decode_cursor(query.cursor, query.sort_by, query.sort_dir)
+      condition, keyset_params = self._keyset(sort_column, descending, value, after_id)
+      page_conditions.append(condition)
+      page_params.extend(keyset_params)
+      offset = 0
+
+    columns: sql.Composable = sql.SQL("*")
+    if query.fields:
+      columns = sql.SQL(", ").join(
+        map(sql.Identifier, dict.fromkeys(["id", *query.fields, query.sort_by]))
+      )
+    statement = sql.SQL(
+      "select {columns} from {view}{where} order by {sort} {direction}, id limit %s offset %s"
+    ).format(
+      columns=columns,
+      view=sql.Identifier(self._view),
+      where=self._where(page_conditions),
+      sort=sort_column,
+      direction=sql.SQL("desc" if descending else "asc"),
+    )
+
+    async def select(pool: PostgresPool) -> tuple[list[dict[str, Any]], int | None]:
+      async with pool.connection() as conn:
+        cursor = await conn.execute(statement, [*page_params, query.limit, offset])
+        return await cursor.fetchall(), await self._count(conn, query.count, where, params)
+
+    rows, total = await self._read(select)
+
+    next_cursor = None
+    if len(rows) == query.limit:
+      last = rows[-1]
+      next_cursor = encode_cursor(query.sort_by, query.sort_dir, last.get(query.sort_by), str(last["id"]))
+    if query.fields:
+      items = [{name: self._json_value(row.get(name)) for name in query.fields} for row in rows]
+    else:
+      items = [water_object_from_row(row) for row in rows]
+    return WaterObjectPage(items=items, total=total, next_cursor=next_cursor)
+
+  async def iter_chunks(
+    self, query: WaterObjectQuery, *, chunk_size: int = 1000
+  ) -> AsyncIterator[list[WaterObject]]:
+    """Every object matching the filters of ``query``, ``chunk_size`` at a time in id order.
+
+    Keyset on the primary key rather than one server-side cursor, so no connection is held
+    while the client drains a chunk. Neither cached nor shared: export chunks are read once.
+    """
+    conditions, params = self._filters(query)
+    after_id: str | None = None
+    while True:
+      chunk_conditions = list(conditions)
+      chunk_params = list(params)
+      if after_id is not None:
+        chunk_conditions.append(sql.SQL("id > %s"))
+        chunk_params.append(after_id)
+      statement = sql.SQL("select * from {view}{where} order by id limit %s").format(
+        view=sql.Identifier(self._view), where=self._where(chunk_conditions)
+      )
+      rows = await self._read(lambda pool: pool.fetch_all(statement, [*chunk_params, chunk_size]))
+      if rows:
+        yield [water_object_from_row(row) for row in rows]
+      if len(rows) < chunk_size:
+        return
+      after_id = str(rows[-1]["id"])
+
+  async def get_by_id(self, object_id: str) -> WaterObject | None:
+    if self._cache is not None:
+      cached = self._cache.objects.get(object_id)
+      if cached is not None:
+        return cached
+    if not is_uuid(object_id):
+      return None
+    found = await self._coalesce(("objects", object_id), lambda: self._fetch_objects([object_id]))
+    return found.get(object_id)
+
+  async def _fetch_objects(self, object_ids: list[str]) -> dict[str, WaterObject]:
+    generation = self._cache.generation if self._cache is not None else None
+    statement = sql.SQL("select * from {view} where id = any(%s::uuid[])").format(view=sql.Identifier(self._view))
+    rows = await self._read(lambda pool: pool.fetch_all(statement, [object_ids]))
+    found = {}
+    for row in rows:
+      entity = water_object_from_row(row)
+      found[entity.id] = entity
+      if self._cache is not None and self._cache.generation == generation:
+        self._cache.objects.set(entity.id, entity)
+    return found
+
+  async def get_by_name(self, name: str) -> WaterObject | None:
+    # ilike (case-insensitive equality) or the exact name in one query
+    statement = sql.SQL(
+      "select * from {view} where name ilike %(name)s or name = %(name)s order by id"
+    ).format(view=sql.Identifier(self._view))
+    rows = await self._read(lambda pool: pool.fetch_all(statement, {"name": name}))
+    matcher = NameMatcher([water_object_from_row(row) for row in rows], lambda obj: obj.name)
+    return matcher.lookup(name)
+
+  async def find_by_similar_name(self, name: str, *, min_ratio: float = 0.6) -> WaterObject | None:
+    """Find the closest matching object name using fuzzy comparison."""
+    direct = await self.get_by_name(name)
+    if direct:
+      return direct
+    return (await self.name_matcher()).match(name, min_ratio=min_ratio)
+
+  async def name_matcher(self) -> NameMatcher[WaterObject]:
+    statement = sql.SQL("select * from {view}").format(view=sql.Identifier(self._view))
+    rows = await self._read(lambda pool: pool.fetch_all(statement))
+    return NameMatcher([water_object_from_row(row) for row in rows], lambda obj: obj.name)
+
+  async def update_pdf_url(self, object_id: str, pdf_url: str) -> None:
+    statement = sql.SQL("update {table} set pdf_url = %s where id = %s").format(table=sql.Identifier(self._table))
+    try:
+      async with self._pool.connection() as conn:
+        await conn.execute(statement, [pdf_url, object_id])
+      if self._mirror is not None:
+        self._mirror.update_pdf_url(object_id, pdf_url)
+    finally:
+      self._invalidate([object_id])
+
+  async def _read(self, call: Callable[[PostgresPool], Awaitable[T]]) -> T:
+    if self._reads is None:
+      return await call(self._pool)
+    return await self._reads.read(call)
+
+  async def _coalesce(self, key: tuple[str, str], load: Callable[[], Awaitable[T]]) -> T:
+    # a request that has written reads its own writes, not a read shared with other requests
+    if self._flights is None or (self._reads is not None and self._reads.pinned):
+      return await load()
+    return await self._flights.do(key, load)
+
+  def _invalidate(self, object_ids: list[str] | None = None) -> None:
+    # runs after every write, successful or not
+    if self._reads is not None:
+      self._reads.note_write()
+    if self._flights is not None:
+      self._flights.forget()
+    if self._version is not None:
+      self._version.bump()
+    if self._cache is not None:
+      self._cache.invalidate_objects(object_ids or [])
+
+  def _indexed(self, created: list[WaterObject]) -> list[WaterObject]:
+    if self._mirror is not None:
+      for obj in created:
+        self._mirror.add(obj)
+    return created
+
+  def _filters(self, query: WaterObjectQuery) -> tuple[list[sql.Composable], list[Any]]:
+    conditions: list[sql.Composable] = []
+    params: list[Any] = []
+
+    def add(condition: str, value: Any) -> None:
+      conditions.append(sql.SQL(condition))
+      params.append(value)
+
+    if query.region:
+      add("region ilike %s", f"%{query.region}%")
+    if query.resource_type:
+      add("resource_type = %s", query.resource_type)
+    if query.water_type:
+      add("water_type = %s", query.water_type)
+    if query.fauna is not None:
+      add("fauna = %s", query.fauna)
+    if query.technical_condition is not None:
+      add("technical_condition = %s", query.technical_condition)
+    if query.condition_min is not None:
+      add("technical_condition >= %s", query.condition_min)
+    if query.priority is not None:
+      add("priority = %s", query.priority)
+    if query.passport_date_from:
+      add("passport_date >= %s", query.passport_date_from)
+    if query.passport_date_to:
+      add("passport_date <= %s", query.passport_date_to)
+    if query.bbox is not None:
+      conditions.append(sql.SQL("latitude between %s and %s"))
+      params.extend([query.bbox.south, query.bbox.north])
+      joiner = "and" if query.bbox.west <= query.bbox.east else "or"
+      conditions.append(sql.SQL(f"longitude >= %s {joiner} longitude <= %s"))
+      params.extend([query.bbox.west, query.bbox.east])
+    return conditions, params
+
+  @staticmethod
+  def _where(conditions: list[sql.Composable]) -> sql.Composable:
+    if not conditions:
+      return sql.SQL("")
+    return sql.SQL(" where ") + sql.SQL(" and ").join(
+      sql.SQL("({})").format(condition) for condition in conditions
+    )
+
+  @staticmethod
+  def _keyset(
+    column: sql.Identifier, descending: bool, value: Any, after_id: str
+  ) -> tuple[sql.Composable, list[Any]]:
+    """Rows strictly after ``(value, after_id)``; same null placement as ``pagination.keyset_filter``."""
+    if value is None:
+      if descending:
+        return sql.SQL("({col} is null and id > %s) or {col} is not null").format(col=column), [after_id]
+      return sql.SQL("{col} is null and id > %s").format(col=column), [after_id]
+    op = sql.SQL("<" if descending else ">")
+    condition = sql.SQL("{col} {op} %s or ({col} = %s and id > %s)").format(col=column, op=op)
+    if not descending:
+      condition += sql.SQL(" or {col} is null").format(col=column)
+    return condition, [value, value, after_id]
+
+  async def _count(
+    self, conn: psycopg.AsyncConnection, mode: str | None, where: sql.Composable, params: list[Any]
+  ) -> int | None:
+    if mode is None:
+      return None
+    view = sql.Identifier(self._view)
+    if mode != "exact":
+      cursor = await conn.execute(
+        sql.SQL("explain (format json) select 1 from {view}{where}").format(view=view, where=where), params
+      )
+      plan = (await cursor.fetchone())["QUERY PLAN"]
+      planned = int(plan[0]["Plan"]["Plan Rows"])
+      if mode == "planned" or planned > EXACT_COUNT_LIMIT:
+        return planned
+    cursor = await conn.execute(
+      sql.SQL("select count(*) as total from {view}{where}").format(view=view, where=where), params
+    )
+    return (await cursor.fetchone())["total"]
+
+  @staticmethod
+  def _json_value(value: Any) -> Any:
+    # projected rows bypass water_object_from_row; keep them shaped like PostgREST JSON
+    if value is None or isinstance(value, (str, int, float, bool)):
+      return value
+    if isinstance(value, Decimal):
+      return float(value)
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
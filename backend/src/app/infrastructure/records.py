@@ -0,0 +1,78 @@
+from datetime import date
+from operator import attrgetter
+from typing import Any
+from uuid import UUID, uuid4
+
+from app.domain.user import User
+from app.domain.water_object import WaterObject
+from app.schemas.water_object import WATER_OBJECT_FIELDS, WaterObjectCreate
+
+# Row <-> entity mapping shared by the PostgREST and the direct Postgres repositories.
+
+
+def water_object_record(payload: WaterObjectCreate) -> dict[str, Any]:
+  return {
+    "id": str(uuid4()),
+    "name": payload.name,
+    "region": payload.region,
+    "resource_type": payload.resource_type,
+    "water_type": payload.water_type,
+    "fauna": payload.fauna,
+    "passport_date": payload.passport_date.isoformat(),
+    "technical_condition": payload.technical_condition,
+    "latitude": payload.latitude,
+    "longitude": payload.longitude,
+    "pdf_url": str(payload.pdf_url) if payload.pdf_url else None,
+    "priority": payload.priority,
+  }
+
+
+def water_object_from_row(row: dict[str, Any]) -> WaterObject:
+  return WaterObject(
+    id=str(row["id"]),
+    name=row["name"],
+    region=row["region"],
+    resource_type=row["resource_type"],
+    water_type=row["water_type"],
+    fauna=bool(row["fauna"]),
+    passport_date=_parse_date(row["passport_date"]),
+    technical_condition=int(row["technical_condition"]),
+    latitude=float(row["latitude"]),
+    longitude=float(row["longitude"]),
+    pdf_url=row.get("pdf_url"),
+    priority=row.get("priority"),
+    priority_category=row.get("priority_category"),
+    priority_score=int(row["priority_score"]) if row.get("priority_score") is not None else None,
+    marker_color=row.get("marker_color"),
+  )
+
+
+_response_values = attrgetter(*WATER_OBJECT_FIELDS)
+
+
+def water_object_to_row(obj: WaterObject) -> dict[str, Any]:
+  """Entity -> plain dict in ``WaterObjectResponse`` field order (a flat, much cheaper ``asdict``)."""
+  return dict(zip(WATER_OBJECT_FIELDS, _response_values(obj)))
+
+
+def user_from_row(row: dict[str, Any]) -> User:
+  return User(
+    id=str(row["id"]),
+    login=row["login"],
+    password_hash=row["password_hash"],
+    role=row.get("role", "guest"),
+  )
+
+
+def is_uuid(value: str) -> bool:
+  try:
+    UUID(value)
+  except ValueError:
+    return False
+  return True
+
+
+def _parse_date(value: Any):
+  if isinstance(value, str):
+    return date.fromisoformat(value)
+  return value
@@ -0,0 +1,117 @@
+import time
+from collections.abc import Awaitable, Callable
+from typing import Generic, TypeVar
+
+from app.core.config import Settings
+
+C = TypeVar("C")
+T = TypeVar("T")
+
+
+class ReplicaRouter(Generic[C]):
+  """Process-wide choice between the primary and an optional read replica.
+
+  ``C`` is whatever the repositories query through (``SupabaseClient`` or ``PostgresPool``).
+  Reads go to the replica unless:
+
+  - no replica is configured;
+  - this process wrote less than ``sticky_seconds`` ago, so the replica may still lag behind
+    (this also keeps the catalog cache from being refilled with pre-write rows);
+  - the replica failed with one of ``unavailable_errors`` less than ``retry_seconds`` ago.
+    The failing read itself is retried on the primary. ``is_unavailable`` narrows those
+    errors further (e.g. only 5xx answers); the others are raised to the caller.
+  """
+
+  def __init__(
+    self,
+    primary: C,
+    replica: C | None = None,
+    *,
+    unavailable_errors: tuple[type[BaseException], ...] = (),
+    is_unavailable: Callable[[BaseException], bool] | None = None,
+    sticky_seconds: float = 5.0,
+    retry_seconds: float = 30.0,
+    clock: Callable[[], float] = time.monotonic,
+  ):
+    self.primary = primary
+    self.replica = replica
+    self._unavailable_errors = unavailable_errors
+    self._is_unavailable = is_unavailable
+    self._sticky_seconds = sticky_seconds
+    self._retry_seconds = retry_seconds
+    self._clock = clock
+    self._primary_until = 0.0
+    self._unhealthy_until = 0.0
+    self.replica_reads = 0
+    self.primary_reads = 0
+    self.fallbacks = 0
+
+  @classmethod
+  def from_settings(
+    cls,
+    settings: Settings,
+    primary: C,
+    replica: C | None,
+    *,
+    unavailable_errors: tuple[type[BaseException], ...],
+    is_unavailable: Callable[[BaseException], bool] | None = None,
+  ) -> "ReplicaRouter[C]":
+    return cls(
+      primary,
+      replica,
+      unavailable_errors=unavailable_errors,
+      is_unavailable=is_unavailable,
+      sticky_seconds=settings.read_replica_sticky_seconds,
+      retry_seconds=settings.read_replica_retry_seconds,
+    )
+
+  @property
+  def replica_healthy(self) -> bool:
+    return self._unhealthy_until <= self._clock()
+
+  def note_write(self) -> None:
+    self._primary_until = self._clock() + self._sticky_seconds
+
+  async def read(self, call: Callable[[C], Awaitable[T]], *, pinned: bool = False) -> T:
+    now = self._clock()
+    if self.replica is not None and not pinned and now >= self._primary_until and now >= self._unhealthy_until:
+      try:
+        result = await call(self.replica)
+      except self._unavailable_errors as exc:
+        if self._is_unavailable is not None and not self._is_unavailable(exc):
+          raise
+        self._unhealthy_until = self._clock() + self._retry_seconds
+        self.fallbacks += 1
+      else:
+        self.replica_reads += 1
+        return result
+    self.primary_reads += 1
+    return await call(self.primary)
+
+  def stats(self) -> dict[str, int | bool]:
+    return {
+      "configured": self.replica is not None,
+      "healthy": self.replica is not None and self.replica_healthy,
+      "replica_reads": self.replica_reads,
+      "primary_reads": self.primary_reads,
+      "fallbacks": self.fallbacks,
+    }
+
+
+class ReadSession(Generic[C]):
+  """Per-request view of a :class:`ReplicaRouter`: once the request writes, its reads stay on the primary."""
+
+  def __init__(self, router: ReplicaRouter[C]):
+    self._router = router
+    self._pinned = False
+
+  @property
+  def pinned(self) -> bool:
+    return self._pinned
+
+  async def read(self, call: Callable[[C], Awaitable[T]]) -> T:
+    return await self._router.read(call, pinned=self._pinned)
+
+  def note_write(self) -> None:
+    self._pinned = True
+    self._router.note_write()
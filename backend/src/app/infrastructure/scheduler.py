@@ -0,0 +1,64 @@
+import asyncio
+import logging
+from typing import Any
+
+from app.infrastructure.jobs import Job, JobManager, JobQueueFull, JobRun
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicJob:
+  """Submits ``run`` to the job queue at startup and then every ``interval_seconds``.
+
+  Runs go through the :class:`JobManager` like uploads do, so they share its workers and are
+  visible at ``GET /jobs/{id}``. A tick is skipped while the previous run is still queued or
+  running, or when the queue is full. ``interval_seconds <= 0`` disables the schedule.
+  """
+
+  def __init__(self, jobs: JobManager, kind: str, run: JobRun, interval_seconds: float):
+    self._jobs = jobs
+    self._kind = kind
+    self._run = run
+    self._interval = interval_seconds
+    self._task: asyncio.Task[None] | None = None
+    self._last: Job | None = None
+    self.submitted = 0
+    self.skipped = 0
+
+  def start(self) -> None:
+    if self._interval > 0 and self._task is None:
+      self._task = asyncio.create_task(self._loop())
+
+  async def close(self) -> None:
+    if self._task is not None:
+      self._task.cancel()
+      await asyncio.gather(self._task, return_exceptions=True)
+      self._task = None
+
+  def tick(self) -> Job | None:
+    """Submits a run unless the previous one is unfinished; returns the submitted job."""
+    if self._last is not None and not self._last.finished:
+      self.skipped += 1
+      return None
+    try:
+      self._last = self._jobs.submit(self._kind, self._run)
+    except JobQueueFull:
+      logger.warning("Scheduled job skipped: queue is full", extra={"kind": self._kind})
+      self.skipped += 1
+      return None
+    self.submitted += 1
+    return self._last
+
+  async def _loop(self) -> None:
+    while True:
+      self.tick()
+      await asyncio.sleep(self._interval)
+
+  def stats(self) -> dict[str, Any]:
+    return {
+      "interval_seconds": self._interval,
+      "submitted": self.submitted,
+      "skipped": self.skipped,
+      "last_job_id": self._last.id if self._last is not None else None,
+      "last_status": self._last.status if self._last is not None else None,
+    }
@@ -0,0 +1,182 @@
+import heapq
+import re
+from bisect import bisect_left
+from collections.abc import Iterable
+from itertools import islice
+
+from app.domain.water_object import WaterObject
+from app.infrastructure.name_index import normalize_name
+
+NAME_WEIGHT = 2.0  # a term found in the name outranks the same term found in the region
+REGION_WEIGHT = 1.0
+EXACT_QUALITY = 1.0
+PREFIX_QUALITY = 0.6  # plus up to 0.3 the closer the prefix is to the whole word
+TYPO_QUALITY = 0.7  # minus TYPO_PENALTY per edit; a typo inside a prefix scores lower again
+TYPO_PENALTY = 0.15
+TYPO_PREFIX_DISCOUNT = 0.15
+MAX_PREFIX_EXPANSIONS = 256  # words tried per prefix term, in vocabulary order
+_TOKEN = re.compile(r"\w+")
+
+
+def search_terms(text: str) -> list[str]:
+  """Words of ``text`` under the ``normalize_name`` rules, with ``ё`` folded into ``е``."""
+  return _TOKEN.findall(normalize_name(text).replace("ё", "е"))
+
+
+def _grams(word: str) -> set[str]:
+  padded = f" {word} "
+  return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def _max_edits(term: str) -> int:
+  if len(term) < 4:
+    return 0
+  return 1 if len(term) < 7 else 2
+
+
+def _edit_distances(term: str, word: str, limit: int) -> tuple[int, int] | None:
+  """Optimal-string-alignment distance from ``term`` to ``word`` and to its closest prefix,
+  or ``None`` once both certainly exceed ``limit``."""
+  previous2: list[int] | None = None
+  previous = list(range(len(word) + 1))
+  for i in range(1, len(term) + 1):
+    current = [i] + [0] * len(word)
+    for j in range(1, len(word) + 1):
+      cost = 0 if term[i - 1] == word[j - 1] else 1
+      value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+      transposed = j > 1 and term[i - 1] == word[j - 2] and term[i - 2] == word[j - 1]
+      if previous2 is not None and transposed:
+        value = min(value, previous2[j - 2] + 1)
+      current[j] = value
+    if min(current) > limit:
+      return None
+    previous2, previous = previous, current
+  return previous[-1], min(previous)
+
+
+class SearchIndex:
+  """In-memory typeahead index over object names and regions.
+
+  Every word of a name or region is a vocabulary entry pointing at the objects that contain
+  it. A search term matches a word exactly, as a prefix (binary search over the sorted
+  vocabulary) or with up to one typo (two for terms of seven letters or more), where typo
+  candidates come from padded trigrams and are confirmed by edit distance. Every term must
+  match; objects are ranked by the summed match quality, name matches weighted above region
+  matches. Filled and kept current by the :class:`CatalogMirror`.
+  """
+
+  def __init__(self):
+    self._objects: dict[str, WaterObject] = {}
+    self._sort_keys: dict[str, tuple[int, str]] = {}
+    self._postings: dict[str, dict[str, float]] = {}
+    self._vocabulary: list[str] = []
+    self._grams: dict[str, set[str]] = {}
+    self.queries = 0
+
+  def __len__(self) -> int:
+    return len(self._objects)
+
+  def reset(self, objects: Iterable[WaterObject]) -> None:
+    self._objects, self._sort_keys, self._postings = {}, {}, {}
+    self._vocabulary, self._grams = [], {}
+    for obj in objects:
+      self.add(obj)
+
+  def add(self, obj: WaterObject) -> None:
+    """Indexes a created object, or re-indexes one that changed."""
+    if obj.id in self._objects:
+      self._unindex(obj.id)
+    self._objects[obj.id] = obj
+    name = normalize_name(obj.name)
+    self._sort_keys[obj.id] = (len(name), name)
+    weights: dict[str, float] = {}
+    for weight, text in ((REGION_WEIGHT, obj.region), (NAME_WEIGHT, obj.name)):
+      for word in search_terms(text):
+        weights[word] = weight
+    for word, weight in weights.items():
+      postings = self._postings.get(word)
+      if postings is None:
+        postings = self._postings[word] = {}
+        self._vocabulary.insert(bisect_left(self._vocabulary, word), word)
+        for gram in _grams(word):
+          self._grams.setdefault(gram, set()).add(word)
+      postings[obj.id] = weight
+
+  def search(self, text: str, *, limit: int = 10) -> list[tuple[WaterObject, float]]:
+    """Best ``limit`` objects matching every term of ``text``, with their scores."""
+    self.queries += 1
+    scores: dict[str, float] | None = None
+    for term in dict.fromkeys(search_terms(text)):
+      term_scores: dict[str, float] = {}
+      for word, quality in self._matches(term).items():
+        for object_id, weight in self._postings[word].items():
+          score = quality * weight
+          if score > term_scores.get(object_id, 0.0):
+            term_scores[object_id] = score
+      if scores is None:
+        scores = term_scores
+      else:
+        scores = {
+          object_id: scores[object_id] + score
+          for object_id, score in term_scores.items()
+          if object_id in scores
+        }
+      if not scores:
+        return []
+    if not scores:
+      return []
+    # ties go to the shorter, then alphabetically first, name
+    best = heapq.nsmallest(
+      limit, scores.items(), key=lambda item: (-item[1], self._sort_keys[item[0]])
+    )
+    return [(self._objects[object_id], round(score, 3)) for object_id, score in best]
+
+  def _matches(self, term: str) -> dict[str, float]:
+    found: dict[str, float] = {}
+    if term in self._postings:
+      found[term] = EXACT_QUALITY
+    start = bisect_left(self._vocabulary, term)
+    for word in islice(self._vocabulary, start, start + MAX_PREFIX_EXPANSIONS):
+      if not word.startswith(term):
+        break
+      if word != term:
+        found[word] = PREFIX_QUALITY + 0.3 * len(term) / len(word)
+
+    edits = _max_edits(term)
+    if edits:
+      grams = _grams(term)
+      shared: dict[str, int] = {}
+      for gram in grams:
+        for word in self._grams.get(gram, ()):
+          shared[word] = shared.get(word, 0) + 1
+      # each edit breaks at most three trigrams; a prefix match also loses the closing ones
+      needed = max(1, len(grams) - 3 * edits - 2)
+      for word, count in shared.items():
+        if count < needed or word in found:
+          continue
+        distances = _edit_distances(term, word, edits)
+        if distances is None:
+          continue
+        whole, prefix = distances
+        if whole <= edits:
+          found[word] = TYPO_QUALITY - TYPO_PENALTY * whole
+        elif prefix <= edits:
+          found[word] = TYPO_QUALITY - TYPO_PREFIX_DISCOUNT - TYPO_PENALTY * prefix
+    return found
+
+  def _unindex(self, object_id: str) -> None:
+    obj = self._objects.pop(object_id)
+    del self._sort_keys[object_id]
+    for word in set(search_terms(obj.name)) | set(search_terms(obj.region)):
+      postings = self._postings.get(word)
+      if postings is None:
+        continue
+      postings.pop(object_id, None)
+      if not postings:
+        del self._postings[word]
+        del self._vocabulary[bisect_left(self._vocabulary, word)]
+        for gram in _grams(word):
+          self._grams[gram].discard(word)
+
+  def stats(self) -> dict[str, int]:
+    return {"objects": len(self._objects), "words": len(self._vocabulary), "queries": self.queries}
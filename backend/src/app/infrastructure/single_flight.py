@@ -0,0 +1,50 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from functools import partial
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+  """Coalesces identical concurrent reads: callers with the same key await one shared task.
+
+  Only calls that are still in flight are shared; a finished result is never reused, so this
+  adds no staleness of its own. :meth:`forget` detaches the running calls after a write, so a
+  read that starts after the write cannot join one that started before it. The shared task is
+  shielded: a disconnecting caller does not cancel it for the others.
+  """
+
+  def __init__(self):
+    self._calls: dict[Hashable, asyncio.Future[Any]] = {}
+    self.leaders = 0
+    self.followers = 0
+
+  async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+    task = self._calls.get(key)
+    if task is None:
+      task = asyncio.ensure_future(call())
+      self._calls[key] = task
+      task.add_done_callback(partial(self._finished, key))
+      self.leaders += 1
+    else:
+      self.followers += 1
+    return await asyncio.shield(task)
+
+  def forget(self) -> None:
+    self._calls.clear()
+
+  def _finished(self, key: Hashable, task: asyncio.Future[Any]) -> None:
+    if self._calls.get(key) is task:
+      del self._calls[key]
+    if not task.cancelled():
+      task.exception()  # retrieved here in case every caller has gone away
+
+  def stats(self) -> dict[str, int | float]:
+    total = self.leaders + self.followers
+    return {
+      "in_flight": len(self._calls),
+      "leaders": self.leaders,
+      "followers": self.followers,
+      "hit_rate": round(self.followers / total, 4) if total else 0.0,
+    }
@@ -0,0 +1,102 @@
+import math
+from collections.abc import Iterable
+
+from app.domain.geo import BoundingBox
+from app.domain.water_object import WaterObject
+
+MAP_TILE_CELLS = 8  # zoom thinning keeps one object per 1/8 of a 256px map tile (32px)
+
+
+class SpatialGrid:
+  """Uniform latitude/longitude grid over the mirrored catalog.
+
+  Each object sits in the ``cell_degrees`` square containing it; a viewport query visits the
+  cells overlapping the box and checks only their objects, so a pan costs the objects near the
+  view rather than a scan of the catalog. When the box spans more cells than are occupied the
+  occupied ones are visited instead.
+  """
+
+  def __init__(self, cell_degrees: float = 0.25):
+    self._cell = cell_degrees
+    self._cells: dict[tuple[int, int], dict[str, WaterObject]] = {}
+    self._where: dict[str, tuple[int, int]] = {}
+    self.queries = 0
+
+  def __len__(self) -> int:
+    return len(self._where)
+
+  def reset(self, objects: Iterable[WaterObject]) -> None:
+    self._cells, self._where = {}, {}
+    for obj in objects:
+      self.add(obj)
+
+  def add(self, obj: WaterObject) -> None:
+    """Indexes a created object, or moves one that changed."""
+    previous = self._where.get(obj.id)
+    if previous is not None:
+      cell = self._cells[previous]
+      del cell[obj.id]
+      if not cell:
+        del self._cells[previous]
+    key = self._key(obj.latitude, obj.longitude)
+    self._cells.setdefault(key, {})[obj.id] = obj
+    self._where[obj.id] = key
+
+  def within(self, bbox: BoundingBox) -> list[WaterObject]:
+    self.queries += 1
+    rows = range(self._index(bbox.south), self._index(bbox.north) + 1)
+    columns = [
+      range(self._index(west), self._index(east) + 1) for west, east in bbox.longitude_ranges()
+    ]
+    visited = len(rows) * sum(len(span) for span in columns)
+    if visited > len(self._cells):
+      cells = [
+        cell
+        for (row, column), cell in self._cells.items()
+        if row in rows and any(column in span for span in columns)
+      ]
+    else:
+      cells = [
+        cell
+        for row in rows
+        for span in columns
+        for column in span
+        if (cell := self._cells.get((row, column))) is not None
+      ]
+    return [
+      obj for cell in cells for obj in cell.values() if bbox.contains(obj.latitude, obj.longitude)
+    ]
+
+  def _index(self, degrees: float) -> int:
+    return math.floor(degrees / self._cell)
+
+  def _key(self, latitude: float, longitude: float) -> tuple[int, int]:
+    return self._index(latitude), self._index(longitude)
+
+  def stats(self) -> dict[str, int | float]:
+    return {
+      "objects": len(self._where),
+      "cells": len(self._cells),
+      "cell_degrees": self._cell,
+      "queries": self.queries,
+    }
+
+
+def _importance(obj: WaterObject) -> tuple[int, int, int]:
+  return (obj.priority_score or 0, obj.priority or 0, obj.technical_condition)
+
+
+def thin_for_zoom(objects: Iterable[WaterObject], zoom: int) -> list[WaterObject]:
+  """At most one object per on-screen cell at ``zoom``: the one with the highest priority.
+
+  Web-map tiles span ``360 / 2**zoom`` degrees of longitude; markers closer than a fraction of
+  a tile would overlap anyway.
+  """
+  size = 360.0 / (2**zoom) / MAP_TILE_CELLS
+  best: dict[tuple[int, int], WaterObject] = {}
+  for obj in objects:
+    key = (math.floor(obj.latitude / size), math.floor(obj.longitude / size))
+    current = best.get(key)
+    if current is None or _importance(obj) > _importance(current):
+      best[key] = obj
+  return list(best.values())
@@ -2,51 +2,270 @@ import asyncio
 from functools import cached_property
 from typing import Any
 
-from storage3.utils import StorageException
+import httpx
+from postgrest import APIError, APIResponse, AsyncPostgrestClient, SyncPostgrestClient
+from postgrest.constants import DEFAULT_POSTGREST_CLIENT_HEADERS, DEFAULT_POSTGREST_CLIENT_TIMEOUT
+from postgrest.utils import SyncClient as PostgrestSession
+from storage3 import AsyncStorageClient, SyncStorageClient
+from storage3.constants import DEFAULT_TIMEOUT as DEFAULT_STORAGE_CLIENT_TIMEOUT
+from storage3.utils import StorageException, SyncClient as StorageSession
 from supabase import Client, create_client
+from supabase.lib.client_options import DEFAULT_HEADERS
+
+from app.core.config import Settings
+
+
+class _PooledPostgrestClient(SyncPostgrestClient):
+  """PostgREST client whose HTTP session keeps a bounded keep-alive pool."""
+
+  def __init__(self, base_url: str, *, limits: httpx.Limits, **kwargs: Any):
+    self._limits = limits
+    super().__init__(base_url, **kwargs)
+
+  def create_session(self, base_url, headers, timeout, verify=True, proxy=None) -> PostgrestSession:
+    return PostgrestSession(
+      base_url=base_url,
+      headers=headers,
+      timeout=timeout,
+      verify=verify,
+      proxy=proxy,
+      follow_redirects=True,
+      http2=True,
+      limits=self._limits,
+    )
+
+
+class _PooledStorageClient(SyncStorageClient):
+  """Storage client sharing the same pool limits as PostgREST."""
+
+  def __init__(self, url: str, headers: dict[str, str], timeout: int, *, limits: httpx.Limits):
+    self._limits = limits
+    super().__init__(url, headers, timeout)
+
+  def _create_session(self, base_url, headers, timeout, verify=True, proxy=None) -> StorageSession:
+    return StorageSession(
+      base_url=base_url,
+      headers=headers,
+      timeout=timeout,
+      proxy=proxy,
+      verify=bool(verify),
+      follow_redirects=True,
+      http2=True,
+      limits=self._limits,
+    )
+
+
+class _PooledAsyncPostgrestClient(AsyncPostgrestClient):
+  def __init__(self, base_url: str, *, limits: httpx.Limits, **kwargs: Any):
+    self._limits = limits
+    super().__init__(base_url, **kwargs)
+
+  def create_session(self, base_url, headers, timeout, verify=True, proxy=None) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+      base_url=base_url,
+      headers=headers,
+      timeout=timeout,
+      verify=verify,
+      proxy=proxy,
+      follow_redirects=True,
+      http2=True,
+      limits=self._limits,
+    )
+
+
+class _PooledAsyncStorageClient(AsyncStorageClient):
+  def __init__(self, url: str, headers: dict[str, str], timeout: int, *, limits: httpx.Limits):
+    self._limits = limits
+    super().__init__(url, headers, timeout)
+
+  def _create_session(self, base_url, headers, timeout, verify=True, proxy=None) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+      base_url=base_url,
+      headers=headers,
+      timeout=timeout,
+      proxy=proxy,
+      verify=bool(verify),
+      follow_redirects=True,
+      http2=True,
+      limits=self._limits,
+    )
+
+
+# PostgREST error codes answered with 5xx because the database behind it cannot serve the query:
+# PGRST000-PGRST003 (no connection / pool timeout) and the SQLSTATE classes 08 (connection),
+# 53 (insufficient resources), 57 (operator intervention, e.g. shutdown), 58 (system error), XX
+_UNAVAILABLE_CODE_PREFIXES = ("PGRST00", "08", "53", "57", "58", "XX")
+
+
+def project_url(url: str) -> str:
+  """Supabase project URL; a PostgREST URL (``…/rest/v1``) is accepted and cut back to it."""
+  return url.rstrip("/").removesuffix("/rest/v1")
+
+
+def replica_unavailable(exc: BaseException) -> bool:
+  """Whether a failed read means the replica cannot serve, rather than the query being wrong.
+
+  Network errors and server-side PostgREST failures qualify; a 4xx answer (bad filter, missing
+  column) would fail on the primary too and is raised as is. A gateway error without a JSON body
+  reaches ``APIError`` with its HTTP status as the code.
+  """
+  if isinstance(exc, httpx.TransportError):
+    return True
+  if not isinstance(exc, APIError):
+    return False
+  code = exc.code
+  if isinstance(code, int):
+    return code >= 500
+  return isinstance(code, str) and code.startswith(_UNAVAILABLE_CODE_PREFIXES)
 
 
 class SupabaseClient:
-  def __init__(self, url: str, key: str):
-    self._url = url
+  """Process-wide Supabase adapter.
+
+  One instance is created per application (see ``app.main``) and shared by every repository,
+  so the HTTP connections, TLS sessions and bucket memo survive between requests.
+
+  With ``async_io`` enabled (default) PostgREST and Storage calls run on native httpx async
+  clients; otherwise the sync supabase-py builders are executed in the default thread pool.
+  Repositories build queries through :meth:`table` and run them with :meth:`execute`, so
+  they do not depend on which path is active.
+  """
+
+  def __init__(
+    self,
+    url: str,
+    key: str,
+    *,
+    max_connections: int = 100,
+    max_keepalive_connections: int = 20,
+    keepalive_expiry: float = 30.0,
+    async_io: bool = True,
+  ):
+    self._url = project_url(url)
     self._key = key
+    self._limits = httpx.Limits(
+      max_connections=max_connections,
+      max_keepalive_connections=max_keepalive_connections,
+      keepalive_expiry=keepalive_expiry,
+    )
+    self._async_io = async_io
     self._ensured_buckets: set[str] = set()
 
+  @classmethod
+  def from_settings(cls, settings: Settings, *, url: str | None = None) -> "SupabaseClient":
+    return cls(
+      url or settings.supabase_url,
+      settings.supabase_key,
+      max_connections=settings.supabase_pool_max_connections,
+      max_keepalive_connections=settings.supabase_pool_max_keepalive,
+      keepalive_expiry=settings.supabase_pool_keepalive_expiry,
+      async_io=settings.supabase_async_io,
+    )
+
+  @property
+  def async_io(self) -> bool:
+    return self._async_io
+
   @cached_property
   def raw(self) -> Client:
-    return create_client(self._url, self._key)
+    client = create_client(self._url, self._key)
+    options = client.options
+    # supabase-py builds both sub-clients lazily; plug in pooled ones before first use.
+    client._postgrest = _PooledPostgrestClient(
+      client.rest_url,
+      headers=options.headers,
+      schema=options.schema,
+      timeout=options.postgrest_client_timeout,
+      limits=self._limits,
+    )
+    client._storage = _PooledStorageClient(
+      client.storage_url,
+      options.headers,
+      options.storage_client_timeout,
+      limits=self._limits,
+    )
+    return client
+
+  @cached_property
+  def postgrest(self) -> AsyncPostgrestClient:
+    return _PooledAsyncPostgrestClient(
+      f"{self._url}/rest/v1",
+      headers={**DEFAULT_POSTGREST_CLIENT_HEADERS, **self._auth_headers()},
+      timeout=DEFAULT_POSTGREST_CLIENT_TIMEOUT,
+      limits=self._limits,
+    )
+
+  @cached_property
+  def storage(self) -> AsyncStorageClient:
+    return _PooledAsyncStorageClient(
+      f"{self._url}/storage/v1",
+      self._auth_headers(),
+      DEFAULT_STORAGE_CLIENT_TIMEOUT,
+      limits=self._limits,
+    )
+
+  def _auth_headers(self) -> dict[str, str]:
+    return {**DEFAULT_HEADERS, "apiKey": self._key, "Authorization": f"Bearer {self._key}"}
+
+  def table(self, table: str):
+    """Return a PostgREST request builder for the active (async or sync) path."""
+    if self._async_io:
+      return self.postgrest.from_(table)
+    return self.raw.table(table)
+
+  async def execute(self, builder) -> APIResponse:
+    if self._async_io:
+      return await builder.execute()
+    return await asyncio.to_thread(builder.execute)
+
+  async def aclose(self) -> None:
+    if "postgrest" in self.__dict__:
+      await self.__dict__.pop("postgrest").aclose()
+    if "storage" in self.__dict__:
+      await self.__dict__.pop("storage").aclose()
+    if "raw" in self.__dict__:
+      client = self.__dict__.pop("raw")
+      client.postgrest.aclose()
+      client.storage.aclose()
 
   async def insert(self, table: str, data: dict[str, Any]) -> dict[str, Any]:
-    response = await asyncio.to_thread(self.raw.table(table).insert(data).execute)
+    response = await self.execute(self.table(table).insert(data))
     return response.data[0] if response.data else {}
 
+  async def insert_many(self, table: str, rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    if not rows:
+      return []
+    response = await self.execute(self.table(table).insert(rows))
+    return response.data or []
+
   async def select_one(self, table: str, column: str, value: Any) -> dict[str, Any] | None:
-    response = await asyncio.to_thread(self.raw.table(table).select("*").eq(column, value).limit(1).execute)
+    response = await self.execute(self.table(table).select("*").eq(column, value).limit(1))
     if not response.data:
       return None
     return response.data[0]
 
   async def select_many(self, table: str) -> list[dict[str, Any]]:
-    response = await asyncio.to_thread(self.raw.table(table).select("*").execute)
+    response = await self.execute(self.table(table).select("*"))
     return response.data or []
 
   async def _ensure_bucket(self, bucket: str) -> None:
     if bucket in self._ensured_buckets:
       return
 
-    storage = self.raw.storage
-
-    def _create_if_missing() -> None:
-      buckets = storage.list_buckets()
+    try:
+      if self._async_io:
+        buckets = await self.storage.list_buckets()
+      else:
+        buckets = await asyncio.to_thread(self.raw.storage.list_buckets)
       exists = any(getattr(b, "name", None) == bucket or (isinstance(b, dict) and b.get("name") == bucket) for b in buckets)
-      if exists:
-        return
-      try:
-        storage.create_bucket(bucket, options={"public": True})
-      except StorageException as exc:
-        # Ignore race if another worker created the bucket.
-        if "already exists" in str(exc).lower():
-          return
+      if not exists:
+        if self._async_io:
+          await self.storage.create_bucket(bucket, options={"public": True})
+        else:
+          await asyncio.to_thread(self.raw.storage.create_bucket, bucket, options={"public": True})
+    except StorageException as exc:
+      # Ignore race if another worker created the bucket.
+      if "already exists" not in str(exc).lower():
         # Anon keys cannot create buckets; surface a clearer hint.
         if "unauthorized" in str(exc).lower() or "row-level security" in str(exc).lower():
           raise RuntimeError(
@@ -54,7 +273,6 @@ class SupabaseClient:
           ) from exc
         raise
 
-    await asyncio.to_thread(_create_if_missing)
     self._ensured_buckets.add(bucket)
 
   async def upload_to_bucket(
@@ -67,17 +285,31 @@ class SupabaseClient:
     upsert: bool = True,
   ) -> None:
     await self._ensure_bucket(bucket)
+    # storage3 forwards these as HTTP headers, so values must be strings
+    file_options = {"contentType": content_type, "upsert": "true" if upsert else "false"}
+    if self._async_io:
+      storage = self.storage.from_(bucket)
+      # Supabase may retain old content-type on upsert; remove first to refresh metadata.
+      if upsert:
+        try:
+          await storage.remove([path])
+        except Exception:
+          # best-effort cleanup; keep going
+          pass
+      await storage.upload(path, data, file_options)
+      return
+
     storage = self.raw.storage.from_(bucket)
-    # Supabase may retain old content-type on upsert; remove first to refresh metadata.
     if upsert:
       try:
         await asyncio.to_thread(storage.remove, [path])
       except Exception:
-        # best-effort cleanup; keep going
         pass
-    file_options = {"contentType": content_type, "upsert": upsert}
     await asyncio.to_thread(storage.upload, path, data, file_options)
 
   def get_public_url(self, bucket: str, path: str) -> str:
+    if self._async_io:
+      # Same layout storage3 builds locally; avoids creating the sync client just for this.
+      return f"{self._url}/storage/v1/object/public/{bucket}/{path}"
     storage = self.raw.storage.from_(bucket)
     return storage.get_public_url(path)
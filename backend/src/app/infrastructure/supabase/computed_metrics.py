@@ -1,24 +1,163 @@
-import asyncio
-from typing import Any
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any, TypeVar
 
+import httpx
+from postgrest import APIError
+
+from app.domain.bulk import BulkWriteResult, ChunkError
+from app.infrastructure.cache import CatalogCache
+from app.infrastructure.catalog_mirror import CatalogMirror
+from app.infrastructure.catalog_version import CatalogVersion
+from app.infrastructure.replicas import ReadSession
 from app.infrastructure.supabase.client import SupabaseClient
 
+T = TypeVar("T")
+
 
 class ComputedMetricsRepositorySupabase:
-  def __init__(self, client: SupabaseClient):
+  def __init__(
+    self,
+    client: SupabaseClient,
+    cache: CatalogCache | None = None,
+    reads: ReadSession[SupabaseClient] | None = None,
+    version: CatalogVersion | None = None,
+    mirror: CatalogMirror | None = None,
+  ):
     self._client = client
+    self._cache = cache
+    self._reads = reads
+    self._version = version
+    self._mirror = mirror
     self._table = "computed_metrics"
 
   async def upsert_metric(self, payload: dict[str, Any]) -> dict[str, Any]:
-    query = self._client.raw.table(self._table).upsert(payload, on_conflict="object_id")
-    response = await asyncio.to_thread(query.execute)
-    return response.data[0] if response.data else payload
+    query = self._client.table(self._table).upsert(payload, on_conflict="object_id")
+    try:
+      response = await self._client.execute(query)
+    finally:
+      self._invalidate([payload["object_id"]])
+    return self._mirrored([response.data[0] if response.data else payload])[0]
+
+  async def upsert_many(
+    self, payloads: list[dict[str, Any]], *, chunk_size: int = 500
+  ) -> BulkWriteResult[dict[str, Any]]:
+    result: BulkWriteResult[dict[str, Any]] = BulkWriteResult()
+    for start in range(0, len(payloads), chunk_size):
+      chunk = payloads[start : start + chunk_size]
+      query = self._client.table(self._table).upsert(chunk, on_conflict="object_id")
+      try:
+        response = await self._client.execute(query)
+      except (APIError, httpx.HTTPError) as exc:
+        result.errors.append(ChunkError(start=start, size=len(chunk), error=str(exc)))
+        continue
+      finally:
+        self._invalidate([payload["object_id"] for payload in chunk])
+      result.items.extend(self._mirrored(response.data or chunk))
+    return result
+
+  async def iter_stale(
+    self, reference_year: int, model_version: str, *, full: bool = False, chunk_size: int = 1000
+  ) -> AsyncIterator[list[dict[str, Any]]]:
+    """Metrics rows computed for another year or model, with their object's ``passport_date``.
+
+    Rows without a ``model_version`` predate stored model inputs and are stale only by year;
+    ``full`` returns every row. Keyset on ``object_id``, so rows the caller leaves stale are
+    not returned twice.
+    """
+    after_id: str | None = None
+    while True:
+      response = await self._read(
+        lambda client: client.execute(
+          self._stale_query(client, reference_year, model_version, full, after_id, chunk_size)
+        )
+      )
+      rows = response.data or []
+      if rows:
+        yield [self._flatten(row) for row in rows]
+      if len(rows) < chunk_size:
+        return
+      after_id = str(rows[-1]["object_id"])
+
+  def _stale_query(
+    self,
+    client: SupabaseClient,
+    reference_year: int,
+    model_version: str,
+    full: bool,
+    after_id: str | None,
+    chunk_size: int,
+  ):
+    qb = client.table(self._table).select("*,water_objects(passport_date)")
+    if not full:
+      year, version = f"reference_year.neq.{reference_year}", f"model_version.neq.{model_version}"
+      qb = qb.or_(f"reference_year.is.null,{year},{version}")
+    if after_id is not None:
+      qb = qb.gt("object_id", after_id)
+    return qb.order("object_id").limit(chunk_size)
+
+  async def stamp_many(
+    self, object_ids: list[str], stamp: dict[str, Any], *, chunk_size: int = 500
+  ) -> int:
+    """Sets ``stamp`` columns on rows whose values did not change; returns the rows written."""
+    # the catalog view does not expose the stamp: caches and the ETag version stay valid
+    stamped = 0
+    for start in range(0, len(object_ids), chunk_size):
+      chunk = object_ids[start : start + chunk_size]
+      response = await self._client.execute(
+        self._client.table(self._table).update(stamp).in_("object_id", chunk)
+      )
+      stamped += len(response.data or [])
+    return stamped
+
+  @staticmethod
+  def _flatten(row: dict[str, Any]) -> dict[str, Any]:
+    embedded = row.pop("water_objects", None) or {}
+    return {**row, "passport_date": embedded.get("passport_date")}
 
   async def get_by_object_ids(self, object_ids: list[str]) -> dict[str, dict[str, Any]]:
     if not object_ids:
       return {}
-    query = self._client.raw.table(self._table).select("*").in_("object_id", object_ids)
-    response = await asyncio.to_thread(query.execute)
-    rows = response.data or []
-    return {row["object_id"]: row for row in rows}
+    found: dict[str, dict[str, Any]] = {}
+    missing = object_ids
+    generation = None
+    if self._cache is not None:
+      generation = self._cache.generation
+      missing = []
+      for object_id in object_ids:
+        row = self._cache.metrics.get(object_id)
+        if row is None:
+          missing.append(object_id)
+        else:
+          found[object_id] = row
+      if not missing:
+        return found
+    def select(client: SupabaseClient):
+      return client.execute(client.table(self._table).select("*").in_("object_id", missing))
+
+    response = await self._read(select)
+    cacheable = self._cache is not None and self._cache.generation == generation
+    for row in response.data or []:
+      found[row["object_id"]] = row
+      if cacheable:
+        self._cache.metrics.set(row["object_id"], row)
+    return found
+
+  async def _read(self, call: Callable[[SupabaseClient], Awaitable[T]]) -> T:
+    if self._reads is None:
+      return await call(self._client)
+    return await self._reads.read(call)
+
+  def _mirrored(self, rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    if self._mirror is not None:
+      for row in rows:
+        self._mirror.update_metrics(row)
+    return rows
+
+  def _invalidate(self, object_ids: list[str]) -> None:
+    if self._reads is not None:
+      self._reads.note_write()
+    if self._version is not None:
+      self._version.bump()
+    if self._cache is not None:
+      self._cache.invalidate_metrics(object_ids)
 
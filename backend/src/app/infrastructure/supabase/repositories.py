@@ -2,6 +2,7 @@ from typing import Any
 from uuid import uuid4
 
 from app.domain.user import User
+from app.infrastructure.records import user_from_row
 from app.infrastructure.supabase.client import SupabaseClient
 
 
@@ -24,9 +25,4 @@ class UserRepositorySupabase:
     return self._to_entity(record)
 
   def _to_entity(self, row: dict[str, Any]) -> User:
-    return User(
-      id=str(row["id"]),
-      login=row["login"],
-      password_hash=row["password_hash"],
-      role=row.get("role", "guest"),
-    )
+    return user_from_row(row)
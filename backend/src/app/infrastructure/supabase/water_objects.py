@@ -1,42 +1,143 @@
-import asyncio
-import re
-from difflib import SequenceMatcher
-from typing import Any
-from uuid import uuid4
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any, TypeVar
 
-from app.domain.water_object import WaterObject
+import httpx
+from postgrest import APIError
+
+from app.domain.bulk import BulkWriteResult, ChunkError
+from app.domain.water_object import WaterObject, WaterObjectPage
+from app.infrastructure.cache import CatalogCache
+from app.infrastructure.catalog_mirror import CatalogMirror
+from app.infrastructure.catalog_query import page_objects
+from app.infrastructure.catalog_version import CatalogVersion
+from app.infrastructure.name_index import NameMatcher
+from app.infrastructure.pagination import decode_cursor, encode_cursor, keyset_filter, quote_literal
+from app.infrastructure.records import is_uuid, water_object_from_row, water_object_record
+from app.infrastructure.replicas import ReadSession
+from app.infrastructure.single_flight import SingleFlight
 from app.infrastructure.supabase.client import SupabaseClient
 from app.schemas.water_object import WaterObjectCreate, WaterObjectQuery
 
+T = TypeVar("T")
+
 
 class WaterObjectRepositorySupabase:
-  def __init__(self, client: SupabaseClient):
-    self._client = client
+  def __init__(
+    self,
+    client: SupabaseClient,
+    cache: CatalogCache | None = None,
+    reads: ReadSession[SupabaseClient] | None = None,
+    flights: SingleFlight | None = None,
+    version: CatalogVersion | None = None,
+    mirror: CatalogMirror | None = None,
+  ):
+    self._client = client  # primary: all writes
+    self._cache = cache
+    self._reads = reads  # routes reads to a replica when one is configured
+    self._flights = flights  # shares identical in-flight reads between concurrent requests
+    self._version = version  # bumped by every write; read endpoints' ETags derive from it
+    self._mirror = mirror  # in-memory catalog: serves viewport queries, mirrors every created object
     self._table = "water_objects"
+    # water_objects left-joined with computed_metrics; exposes effective condition/priority.
+    self._view = "water_objects_catalog"
 
   async def create(self, payload: WaterObjectCreate) -> WaterObject:
-    record = await self._client.insert(
-      self._table,
-      {
-        "id": str(uuid4()),
-        "name": payload.name,
-        "region": payload.region,
-        "resource_type": payload.resource_type,
-        "water_type": payload.water_type,
-        "fauna": payload.fauna,
-        "passport_date": payload.passport_date.isoformat(),
-        "technical_condition": payload.technical_condition,
-        "latitude": payload.latitude,
-        "longitude": payload.longitude,
-        "pdf_url": str(payload.pdf_url) if payload.pdf_url else None,
-        "priority": payload.priority,
-      },
-    )
-    return self._to_entity(record)
+    try:
+      record = await self._client.insert(self._table, self._to_record(payload))
+    finally:
+      self._invalidate()
+    return self._indexed([self._to_entity(record)])[0]
+
+  async def create_many(
+    self, payloads: list[WaterObjectCreate], *, chunk_size: int = 500
+  ) -> BulkWriteResult[WaterObject]:
+    """Insert objects with one request per chunk; a failed chunk is reported, not raised.
+
+    ``positions`` maps every created object back to its payload; a row the insert did not echo
+    has no item.
+    """
+    result: BulkWriteResult[WaterObject] = BulkWriteResult()
+    for start in range(0, len(payloads), chunk_size):
+      records = [self._to_record(payload) for payload in payloads[start : start + chunk_size]]
+      try:
+        rows = await self._client.insert_many(self._table, records)
+      except (APIError, httpx.HTTPError) as exc:
+        result.errors.append(ChunkError(start=start, size=len(records), error=str(exc)))
+        continue
+      finally:
+        self._invalidate()
+      # PostgREST does not promise to echo rows in insert order; realign by the generated ids.
+      by_id = {str(row["id"]): row for row in rows}
+      echoed = [
+        (start + offset, record["id"])
+        for offset, record in enumerate(records)
+        if record["id"] in by_id
+      ]
+      created = [self._to_entity(by_id[record_id]) for _, record_id in echoed]
+      result.items.extend(self._indexed(created))
+      result.positions.extend(position for position, _ in echoed)
+    return result
 
   async def list_filtered(self, query: WaterObjectQuery) -> list[WaterObject]:
-    qb = self._client.raw.table(self._table).select("*")
+    return (await self.list_page(query)).items
+
+  async def list_page(self, query: WaterObjectQuery) -> WaterObjectPage:
+    """Page by keyset when ``query.cursor`` is set, by offset otherwise; always emits a cursor."""
+    if query.bbox is not None and self._mirror is not None and self._mirror.current():
+      # viewport queries come from the spatial grid; the database path ignores ``zoom``
+      return page_objects(self._mirror.spatial.within(query.bbox), query)
+    key = query.model_dump_json()
+    if self._cache is not None:
+      page = self._cache.pages.get(key)
+      if page is not None:
+        return page
+    return await self._coalesce(("page", key), lambda: self._load_page(key, query))
+
+  async def _load_page(self, key: str, query: WaterObjectQuery) -> WaterObjectPage:
+    generation = self._cache.generation if self._cache is not None else None
+    page = await self._fetch_page(query)
+    if self._cache is not None and self._cache.generation == generation:
+      self._cache.pages.set(key, page)
+    return page
+
+  async def _fetch_page(self, query: WaterObjectQuery) -> WaterObjectPage:
+    response = await self._read(lambda client: client.execute(self._page_query(client, query)))
+    rows = response.data or []
+    next_cursor = None
+    if len(rows) == query.limit:
+      last = rows[-1]
+      next_cursor = encode_cursor(query.sort_by, query.sort_dir, last.get(query.sort_by), str(last["id"]))
+    if query.fields:
+      items = [{name: row.get(name) for name in query.fields} for row in rows]
+    else:
+      items = [self._to_entity(row) for row in rows]
+    return WaterObjectPage(
+      items=items,
+      total=response.count,
+      next_cursor=next_cursor,
+    )
+
+  def _page_query(self, client: SupabaseClient, query: WaterObjectQuery):
+    descending = query.sort_dir == "desc"
+    columns = "*"
+    if query.fields:
+      # the sort column is needed to build the next cursor even when it is not returned
+      columns = ",".join(dict.fromkeys(["id", *query.fields, query.sort_by]))
+    qb = self._filter(client.table(self._view).select(columns, count=query.count), query)
+
+    if query.cursor:
+      value, after_id = decode_cursor(query.cursor, query.sort_by, query.sort_dir)
+      qb = qb.or_(keyset_filter(query.sort_by, descending, value, after_id))
+      offset = 0
+    else:
+      offset = query.offset
 
+    # id breaks ties so keyset pages stay stable while rows with equal sort keys are inserted
+    qb = qb.order(query.sort_by, desc=descending).order("id")
+    return qb.range(offset, offset + query.limit - 1)
+
+  @staticmethod
+  def _filter(qb, query: WaterObjectQuery):
     if query.region:
       qb = qb.ilike("region", f"%{query.region}%")
     if query.resource_type:
@@ -55,88 +156,126 @@ class WaterObjectRepositorySupabase:
       qb = qb.gte("passport_date", query.passport_date_from.isoformat())
     if query.passport_date_to:
       qb = qb.lte("passport_date", query.passport_date_to.isoformat())
+    if query.bbox is not None:
+      qb = qb.gte("latitude", query.bbox.south).lte("latitude", query.bbox.north)
+      if query.bbox.west <= query.bbox.east:
+        qb = qb.gte("longitude", query.bbox.west).lte("longitude", query.bbox.east)
+      else:
+        qb = qb.or_(f"longitude.gte.{query.bbox.west},longitude.lte.{query.bbox.east}")
+    return qb
+
+  async def iter_chunks(
+    self, query: WaterObjectQuery, *, chunk_size: int = 1000
+  ) -> AsyncIterator[list[WaterObject]]:
+    """Every object matching the filters of ``query``, ``chunk_size`` at a time in id order.
 
-    qb = qb.order(query.sort_by, desc=query.sort_dir == "desc")
-    end = query.offset + query.limit - 1
-    qb = qb.range(query.offset, end)
+    Keyset on the primary key, so each chunk is one index range scan however far the export has
+    got. Neither cached nor shared: export chunks are read once.
+    """
+    after_id: str | None = None
+    while True:
+      response = await self._read(
+        lambda client: client.execute(self._chunk_query(client, query, after_id, chunk_size))
+      )
+      rows = response.data or []
+      if rows:
+        yield [self._to_entity(row) for row in rows]
+      if len(rows) < chunk_size:
+        return
+      after_id = str(rows[-1]["id"])
 
-    rows = await asyncio.to_thread(qb.execute)
-    return [self._to_entity(row) for row in rows.data or []]
+  def _chunk_query(
+    self, client: SupabaseClient, query: WaterObjectQuery, after_id: str | None, chunk_size: int
+  ):
+    qb = self._filter(client.table(self._view).select("*"), query)
+    if after_id is not None:
+      qb = qb.gt("id", after_id)
+    return qb.order("id").limit(chunk_size)
 
   async def get_by_id(self, object_id: str) -> WaterObject | None:
-    record = await self._client.select_one(self._table, "id", object_id)
-    if record is None:
+    if self._cache is not None:
+      cached = self._cache.objects.get(object_id)
+      if cached is not None:
+        return cached
+    if not is_uuid(object_id):
       return None
-    return self._to_entity(record)
+    found = await self._coalesce(("objects", object_id), lambda: self._fetch_objects([object_id]))
+    return found.get(object_id)
+
+  async def _fetch_objects(self, object_ids: list[str]) -> dict[str, WaterObject]:
+    generation = self._cache.generation if self._cache is not None else None
+    response = await self._read(
+      lambda client: client.execute(client.table(self._view).select("*").in_("id", object_ids))
+    )
+    found = {}
+    for row in response.data or []:
+      entity = self._to_entity(row)
+      found[entity.id] = entity
+      if self._cache is not None and self._cache.generation == generation:
+        self._cache.objects.set(entity.id, entity)
+    return found
 
   async def get_by_name(self, name: str) -> WaterObject | None:
-    qb = self._client.raw.table(self._table).select("*").ilike("name", name).limit(1)
-    rows = await asyncio.to_thread(qb.execute)
-    data = rows.data[0] if rows.data else None
-    if data:
-      return self._to_entity(data)
-    # fallback: try exact match to account for case-sensitive names
-    qb = self._client.raw.table(self._table).select("*").eq("name", name).limit(1)
-    rows = await asyncio.to_thread(qb.execute)
-    data = rows.data[0] if rows.data else None
-    if data:
-      return self._to_entity(data)
-    return None
+    # ilike (case-insensitive equality) or the exact name in one request
+    conditions = f"name.ilike.{quote_literal(name)},name.eq.{quote_literal(name)}"
+    rows = await self._read(
+      lambda client: client.execute(client.table(self._view).select("*").or_(conditions).order("id"))
+    )
+    matcher = NameMatcher([self._to_entity(row) for row in rows.data or []], lambda obj: obj.name)
+    return matcher.lookup(name)
 
   async def find_by_similar_name(self, name: str, *, min_ratio: float = 0.6) -> WaterObject | None:
     """Find the closest matching object name using fuzzy comparison."""
-    target = self._normalize_name(name)
-
     # First try straightforward ilike/eq matches
     direct = await self.get_by_name(name)
     if direct:
       return direct
+    return (await self.name_matcher()).match(name, min_ratio=min_ratio)
 
-    qb = self._client.raw.table(self._table).select("*")
-    rows = await asyncio.to_thread(qb.execute)
-    best: tuple[float, dict[str, Any]] | None = None
-    for row in rows.data or []:
-      candidate = self._normalize_name(row["name"])
-      if candidate == target:
-        return self._to_entity(row)
-      ratio = SequenceMatcher(None, target, candidate).ratio()
-      if target in candidate or candidate in target:
-        ratio = max(ratio, 0.95)  # strong preference for substring matches
-      if ratio >= min_ratio and (best is None or ratio > best[0]):
-        best = (ratio, row)
-
-    if best:
-      return self._to_entity(best[1])
-    return None
+  async def name_matcher(self) -> NameMatcher[WaterObject]:
+    """Load all names once; reuse the matcher for every file of a batch upload."""
+    rows = await self._read(lambda client: client.execute(client.table(self._view).select("*")))
+    return NameMatcher([self._to_entity(row) for row in rows.data or []], lambda obj: obj.name)
 
   async def update_pdf_url(self, object_id: str, pdf_url: str) -> None:
-    qb = self._client.raw.table(self._table).update({"pdf_url": pdf_url}).eq("id", object_id)
-    await asyncio.to_thread(qb.execute)
+    qb = self._client.table(self._table).update({"pdf_url": pdf_url}).eq("id", object_id)
+    try:
+      await self._client.execute(qb)
+      if self._mirror is not None:
+        self._mirror.update_pdf_url(object_id, pdf_url)
+    finally:
+      self._invalidate([object_id])
 
-  def _to_entity(self, row: dict[str, Any]) -> WaterObject:
-    return WaterObject(
-      id=str(row["id"]),
-      name=row["name"],
-      region=row["region"],
-      resource_type=row["resource_type"],
-      water_type=row["water_type"],
-      fauna=bool(row["fauna"]),
-      passport_date=self._parse_date(row["passport_date"]),
-      technical_condition=int(row["technical_condition"]),
-      latitude=float(row["latitude"]),
-      longitude=float(row["longitude"]),
-      pdf_url=row.get("pdf_url"),
-      priority=row.get("priority"),
-    )
+  async def _read(self, call: Callable[[SupabaseClient], Awaitable[T]]) -> T:
+    if self._reads is None:
+      return await call(self._client)
+    return await self._reads.read(call)
+
+  async def _coalesce(self, key: tuple[str, str], load: Callable[[], Awaitable[T]]) -> T:
+    # a request that has written reads its own writes, not a read shared with other requests
+    if self._flights is None or (self._reads is not None and self._reads.pinned):
+      return await load()
+    return await self._flights.do(key, load)
 
-  def _parse_date(self, value: Any):
-    if isinstance(value, str):
-      from datetime import date
+  def _invalidate(self, object_ids: list[str] | None = None) -> None:
+    # runs after every write, successful or not
+    if self._reads is not None:
+      self._reads.note_write()
+    if self._flights is not None:
+      self._flights.forget()
+    if self._version is not None:
+      self._version.bump()
+    if self._cache is not None:
+      self._cache.invalidate_objects(object_ids or [])
 
-      return date.fromisoformat(value)
-    return value
+  def _indexed(self, created: list[WaterObject]) -> list[WaterObject]:
+    if self._mirror is not None:
+      for obj in created:
+        self._mirror.add(obj)
+    return created
 
-  def _normalize_name(self, name: str) -> str:
-    cleaned = name.replace("_", " ").replace("-", " ")
-    cleaned = re.sub(r"\s+", " ", cleaned)
-    return cleaned.strip().lower()
+  def _to_record(self, payload: WaterObjectCreate) -> dict[str, Any]:
+    return water_object_record(payload)
+
+  def _to_entity(self, row: dict[str, Any]) -> WaterObject:
+    return water_object_from_row(row)
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends
 
-from app.application.auth.use_cases import AuthenticateUser, RegisterUser
-from app.core.deps import get_current_identity, get_user_repository
+from app.application.auth.use_cases import AuthenticateUser, RegisterUser, issue_token
+from app.core.deps import get_current_identity, get_password_hasher, get_user_repository
+from app.core.security import PasswordHasher
 from app.domain.token import Token
 from app.infrastructure.supabase.repositories import UserRepositorySupabase
 from app.schemas.auth import LoginRequest, RegisterRequest
@@ -11,16 +12,21 @@ router = APIRouter(tags=["auth"])
 
 @router.post("/auth/register", response_model=Token, status_code=201)
 async def register_user(
-  payload: RegisterRequest, repo: UserRepositorySupabase = Depends(get_user_repository)
+  payload: RegisterRequest,
+  repo: UserRepositorySupabase = Depends(get_user_repository),
+  hasher: PasswordHasher = Depends(get_password_hasher),
 ) -> Token:
-  await RegisterUser(repo)(payload.login, payload.password)
-  token = await AuthenticateUser(repo)(payload.login, payload.password)
-  return Token(access_token=token)
+  user = await RegisterUser(repo, hasher)(payload.login, payload.password)
+  return Token(access_token=issue_token(user))
 
 
 @router.post("/auth/login", response_model=Token)
-async def login(payload: LoginRequest, repo: UserRepositorySupabase = Depends(get_user_repository)) -> Token:
-  token = await AuthenticateUser(repo)(payload.login, payload.password)
+async def login(
+  payload: LoginRequest,
+  repo: UserRepositorySupabase = Depends(get_user_repository),
+  hasher: PasswordHasher = Depends(get_password_hasher),
+) -> Token:
+  token = await AuthenticateUser(repo, hasher)(payload.login, payload.password)
   return Token(access_token=token)
 
 
@@ -0,0 +1,68 @@
+from collections.abc import Callable
+from typing import BinaryIO
+import tempfile
+
+from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, status
+from fastapi.responses import JSONResponse
+
+from app.core.deps import get_job_manager
+from app.infrastructure.jobs import JobManager, JobQueueFull, JobRun
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+JOB_RETRY_AFTER_SECONDS = 5
+
+
+def detach_upload(file: UploadFile) -> BinaryIO:
+  """Takes the spooled upload away from ``file``: FastAPI closes form files as soon as the
+  endpoint returns, before a streaming body or a background job has read them. The caller
+  closes the result."""
+  stream, file.file = file.file, tempfile.SpooledTemporaryFile()
+  return stream
+
+
+def submit_job(
+  request: Request,
+  jobs: JobManager,
+  kind: str,
+  run: JobRun,
+  *,
+  idempotency_key: str | None = None,
+  identity: dict[str, str] | None = None,
+  release: Callable[[], None] | None = None,
+) -> JSONResponse:
+  """Queues ``run`` and answers 202 with the job id; 503 with ``Retry-After`` when the queue is full.
+
+  The idempotency key is scoped by ``kind`` and the caller's login, when there is one.
+  ``release`` frees what ``run`` would have owned (the upload) when it is not queued: the queue
+  is full or the idempotency key already belongs to a job, whose id is returned instead.
+  """
+  owner = identity["login"] if identity is not None else None
+  job = jobs.find(kind, idempotency_key, owner=owner)
+  if job is not None:
+    if release is not None:
+      release()
+  else:
+    try:
+      job = jobs.submit(kind, run, idempotency_key=idempotency_key, owner=owner)
+    except JobQueueFull as exc:
+      if release is not None:
+        release()
+      raise HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Очередь фоновых задач заполнена, повторите позже",
+        headers={"Retry-After": str(JOB_RETRY_AFTER_SECONDS)},
+      ) from exc
+  return JSONResponse(
+    {"job_id": job.id, "status": job.status},
+    status_code=status.HTTP_202_ACCEPTED,
+    headers={"Location": str(request.url_for("get_job", job_id=job.id))},
+  )
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: str, jobs: JobManager = Depends(get_job_manager)) -> dict:
+  job = jobs.get(job_id)
+  if job is None:
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+  return job.snapshot()
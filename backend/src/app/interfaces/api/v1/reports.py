@@ -1,37 +1,33 @@
-import io
+import asyncio
 from pathlib import Path
 import zipfile
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Query, Request, UploadFile, status
 
 from app.core.config import get_settings
-from app.core.deps import get_supabase_client, get_water_object_repository
+from app.core.deps import (
+  get_job_manager,
+  get_optional_identity,
+  get_supabase_client,
+  get_water_object_repository,
+  job_repositories,
+)
+from app.domain.water_object import WaterObject
+from app.infrastructure.jobs import Job, JobManager
 from app.infrastructure.supabase.client import SupabaseClient
 from app.infrastructure.supabase.water_objects import WaterObjectRepositorySupabase
+from app.interfaces.api.v1.jobs import detach_upload, submit_job
 
 
 router = APIRouter(prefix="/reports", tags=["reports"])
 
 
-@router.post("/passports/upload-zip")
-async def upload_passport_zip(
-  archive: UploadFile = File(...),
-  repo: WaterObjectRepositorySupabase = Depends(get_water_object_repository),
-  supabase: SupabaseClient = Depends(get_supabase_client),
-):
-  if not archive.filename or not archive.filename.lower().endswith(".zip"):
-    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Поддерживаются только ZIP архивы.")
-
-  raw = await archive.read()
-  try:
-    zip_file = zipfile.ZipFile(io.BytesIO(raw))
-  except zipfile.BadZipFile as exc:
-    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Некорректный ZIP: {exc}") from exc
-
-  settings = get_settings()
-  bucket = settings.supabase_storage_bucket
-
-  summary: dict[str, int | list[dict[str, str]]] = {"processed": 0, "uploaded": 0, "skipped": 0, "items": []}
+async def _match_passports(
+  zip_file: zipfile.ZipFile, repo: WaterObjectRepositorySupabase, summary: dict, errors: list[dict]
+) -> list[tuple[zipfile.ZipInfo, WaterObject]]:
+  matcher = None
+  # one file per object: a later file replaces an earlier one, as in a sequential upload
+  matched: dict[str, tuple[zipfile.ZipInfo, WaterObject]] = {}
 
   for item in zip_file.infolist():
     if item.is_dir():
@@ -39,27 +35,115 @@ async def upload_passport_zip(
     if not item.filename.lower().endswith(".pdf"):
       continue
 
-    summary["processed"] = int(summary["processed"]) + 1
+    summary["processed"] += 1
 
-    content = zip_file.read(item)
     file_name = Path(item.filename).stem.strip()
     if not file_name:
-      summary["skipped"] = int(summary["skipped"]) + 1
+      summary["skipped"] += 1
+      errors.append({"file": item.filename, "reason": "empty file name"})
       continue
 
     normalized_name = file_name.replace("_", " ").replace("-", " ").strip()
-    obj = await repo.find_by_similar_name(normalized_name)
+    if matcher is None:
+      # one catalog snapshot per archive instead of a full-table scan per file
+      matcher = await repo.name_matcher()
+    obj = matcher.match(normalized_name)
     if obj is None:
-      summary["skipped"] = int(summary["skipped"]) + 1
+      summary["skipped"] += 1
+      errors.append({"file": item.filename, "reason": "no water object with this name"})
       continue
+    replaced = matched.pop(obj.id, None)
+    if replaced is not None:
+      summary["skipped"] += 1
+      reason = f"replaced by {item.filename} for the same object"
+      errors.append({"file": replaced[0].filename, "reason": reason})
+    matched[obj.id] = (item, obj)
+  return list(matched.values())
+
+
+async def _upload_passports(
+  zip_file: zipfile.ZipFile,
+  matched: list[tuple[zipfile.ZipInfo, WaterObject]],
+  repo: WaterObjectRepositorySupabase,
+  supabase: SupabaseClient,
+  summary: dict,
+  errors: list[dict],
+) -> list[dict[str, str]]:
+  settings = get_settings()
+  bucket = settings.supabase_storage_bucket
+  # uploads and pdf_url updates are independent per file: run them concurrently, bounded
+  semaphore = asyncio.Semaphore(settings.passport_upload_concurrency)
+
+  async def upload(item: zipfile.ZipInfo, obj: WaterObject) -> dict[str, str] | None:
+    async with semaphore:
+      try:
+        content = zip_file.read(item)
+        storage_path = f"passports/{obj.id}.pdf"
+        await supabase.upload_to_bucket(
+          bucket, storage_path, content, content_type="application/pdf", upsert=True
+        )
+        public_url = supabase.get_public_url(bucket, storage_path)
+        await repo.update_pdf_url(obj.id, public_url)
+      except Exception as exc:  # noqa: BLE001 - one failed file must not cancel the others
+        summary["failed"] += 1
+        errors.append({"file": item.filename, "object_id": obj.id, "reason": str(exc)})
+        return None
+    summary["uploaded"] += 1
+    return {"object_id": obj.id, "name": obj.name, "pdf_url": public_url}
+
+  results = await asyncio.gather(*(upload(item, obj) for item, obj in matched))
+  return [result for result in results if result is not None]
 
-    storage_path = f"passports/{obj.id}.pdf"
-    await supabase.upload_to_bucket(bucket, storage_path, content, content_type="application/pdf", upsert=True)
-    public_url = supabase.get_public_url(bucket, storage_path)
-    await repo.update_pdf_url(obj.id, public_url)
 
-    summary["uploaded"] = int(summary["uploaded"]) + 1
-    summary["items"].append({"object_id": obj.id, "name": obj.name, "pdf_url": public_url})
+@router.post("/passports/upload-zip")
+async def upload_passport_zip(
+  request: Request,
+  archive: UploadFile = File(...),
+  repo: WaterObjectRepositorySupabase = Depends(get_water_object_repository),
+  supabase: SupabaseClient = Depends(get_supabase_client),
+  jobs: JobManager = Depends(get_job_manager),
+  background: bool = Query(False, description="Answer 202 with a job id at once; poll GET /jobs/{id}"),
+  idempotency_key: str | None = Header(None),
+  identity: dict[str, str] | None = Depends(get_optional_identity),
+):
+  if not archive.filename or not archive.filename.lower().endswith(".zip"):
+    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Поддерживаются только ZIP архивы.")
 
-  return summary
+  # the spooled upload is seekable, so the archive is read in place instead of copied into memory
+  stream = detach_upload(archive) if background else archive.file
+  try:
+    zip_file = zipfile.ZipFile(stream)
+  except zipfile.BadZipFile as exc:
+    if background:
+      stream.close()
+    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Некорректный ZIP: {exc}") from exc
 
+  if background:
+    state = request.app.state
+
+    async def run(job: Job) -> dict:
+      job_repo, _ = job_repositories(state)
+      summary = {"processed": 0, "uploaded": 0, "skipped": 0, "failed": 0}
+      errors: list[dict] = []
+      job.report(summary, errors)
+      with zip_file, stream:
+        matched = await _match_passports(zip_file, job_repo, summary, errors)
+        job.report(summary, errors)
+        items = await _upload_passports(zip_file, matched, job_repo, supabase, summary, errors)
+      return {**summary, "uploaded_ids": [item["object_id"] for item in items], "errors": errors}
+
+    return submit_job(
+      request,
+      jobs,
+      "passports-zip",
+      run,
+      idempotency_key=idempotency_key,
+      identity=identity,
+      release=stream.close,
+    )
+
+  summary = {"processed": 0, "uploaded": 0, "skipped": 0, "failed": 0}
+  errors: list[dict] = []
+  matched = await _match_passports(zip_file, repo, summary, errors)
+  items = await _upload_passports(zip_file, matched, repo, supabase, summary, errors)
+  return {**summary, "items": items, "errors": errors}
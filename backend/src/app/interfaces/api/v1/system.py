@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends, Header, Query, Request
+from fastapi.responses import JSONResponse
+
+from app.core.deps import get_job_manager, require_expert
+from app.infrastructure.jobs import JobManager
+from app.interfaces.api.v1.jobs import submit_job
+
+router = APIRouter(prefix="/system", tags=["system"])
+
+
+@router.get("/stats")
+async def runtime_stats(request: Request) -> dict:
+  """Process-local counters of the in-memory performance layers."""
+  cache = request.app.state.catalog_cache
+  postgres = request.app.state.postgres
+  return {
+    "catalog_cache": cache.stats() if cache is not None else None,
+    "catalog_version": request.app.state.catalog_version.stats(),
+    "catalog_mirror": request.app.state.catalog_mirror.stats(),
+    "postgres_pool": postgres.stats() if postgres is not None else None,
+    "read_replica": request.app.state.read_router.stats(),
+    "single_flight": request.app.state.single_flight.stats(),
+    "password_hasher": request.app.state.password_hasher.stats(),
+    "token_cache": request.app.state.token_verifier.stats(),
+    "jobs": request.app.state.jobs.stats(),
+    "metrics_recompute": request.app.state.metrics_recompute.stats(),
+  }
+
+
+@router.post("/recompute-metrics")
+async def recompute_metrics(
+  request: Request,
+  identity: dict[str, str] = Depends(require_expert),
+  jobs: JobManager = Depends(get_job_manager),
+  full: bool = Query(False, description="Every row, not only those of another year or model"),
+  idempotency_key: str | None = Header(None),
+) -> JSONResponse:
+  """Queues a recompute of stale ``computed_metrics``; poll ``GET /jobs/{id}`` for the counters."""
+  run = request.app.state.metrics_recompute_runs(full)
+  return submit_job(
+    request, jobs, "recompute-metrics", run, idempotency_key=idempotency_key, identity=identity
+  )
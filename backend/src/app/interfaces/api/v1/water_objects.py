@@ -1,23 +1,72 @@
-from dataclasses import asdict
+from collections.abc import AsyncIterator, Iterator
+from dataclasses import asdict, dataclass, field
 from datetime import datetime, date
-from io import StringIO
+from itertools import islice
+from typing import Any, BinaryIO
+import asyncio
+import codecs
 import csv
+import io
+import json
 import logging
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status, File, UploadFile
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status, File, UploadFile
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import ValidationError
 
-from app.application.water_objects.use_cases import CreateWaterObject, GetWaterObject, ListWaterObjects
-from app.core.deps import get_water_object_repository, get_computed_metrics_repository
+from app.application.metrics.use_cases import metric_inputs, metric_stamp, model_input
+from app.application.water_objects.use_cases import (
+  CreateWaterObject,
+  CreateWaterObjects,
+  ExportWaterObjects,
+  GetWaterObject,
+  PageWaterObjects,
+)
+from app.core.config import get_settings
+from app.core.deps import (
+  catalog_cache_headers,
+  get_catalog_etag,
+  get_catalog_mirror,
+  get_computed_metrics_repository,
+  get_job_manager,
+  get_optional_identity,
+  get_water_object_repository,
+  job_repositories,
+)
+from app.infrastructure.export import (
+  EXPORT_MEDIA_TYPES,
+  ParquetUnavailable,
+  encode_csv,
+  encode_ndjson,
+  encode_parquet,
+  parquet_schema,
+)
+from app.infrastructure.ingestion import HeaderPlan, IngestionSchema, Vocabulary
+from app.infrastructure.catalog_mirror import CatalogMirror
+from app.infrastructure.catalog_query import object_matches
+from app.infrastructure.jobs import Job, JobManager
+from app.interfaces.api.v1.jobs import detach_upload, submit_job
+from app.infrastructure.pagination import InvalidCursor
+from app.infrastructure.records import water_object_to_row
 from app.infrastructure.supabase.computed_metrics import ComputedMetricsRepositorySupabase
 from app.infrastructure.supabase.water_objects import WaterObjectRepositorySupabase
 from app.models.condition_model import (
-  calculate_priority_score,
-  compute_technical_condition,
-  marker_color_for_condition,
   PRIORITY_CATEGORY_TO_VALUE,
+  TECHNICAL_COLUMNS,
+  compute_conditions_batch,
+  model_version,
+)
+from app.schemas.water_object import (
+  PROJECTION_RESPONSE,
+  WATER_OBJECT_FIELDS,
+  WaterObjectCreate,
+  WaterObjectNearestResult,
+  WaterObjectQuery,
+  WaterObjectResponse,
+  WaterObjectSearchResult,
+  parse_bbox,
+  parse_fields,
 )
-from app.schemas.water_object import WaterObjectCreate, WaterObjectQuery, WaterObjectResponse
 
 router = APIRouter(prefix="/water-objects", tags=["water_objects"])
 logger = logging.getLogger(__name__)
@@ -53,24 +102,13 @@ CSV_COLUMN_ALIASES: dict[str, list[str]] = {
 }
 
 CANONICAL_COLUMNS = list(CSV_COLUMN_ALIASES.keys())
-ALLOWED_HEADERS = {alias.lower() for aliases in CSV_COLUMN_ALIASES.values() for alias in aliases}
-
-
-def _normalize_header(value: str | None) -> str:
-  return (value or "").strip().lower()
-
-
-def _validate_headers(headers: list[str]) -> None:
-  normalized_headers = [_normalize_header(name) for name in headers if name]
+CSV_SCHEMA = IngestionSchema(CSV_COLUMN_ALIASES)
+CSV_READ_CHUNK_BYTES = 1 << 20
+SKIPPED_DETAILS_LIMIT = 5
 
-  missing = []
-  for canonical, aliases in CSV_COLUMN_ALIASES.items():
-    if not any(_normalize_header(alias) in normalized_headers for alias in aliases):
-      missing.append(canonical)
 
-  extra = [header for header in normalized_headers if header and header not in ALLOWED_HEADERS]
-
-  if missing or extra:
+def _validate_headers(plan: HeaderPlan) -> None:
+  if plan.missing or plan.extra:
     raise HTTPException(
       status_code=status.HTTP_400_BAD_REQUEST,
       detail=(
@@ -80,60 +118,7 @@ def _validate_headers(headers: list[str]) -> None:
     )
 
 
-def _row_value(row: dict[str, str], canonical: str) -> str | None:
-  aliases = CSV_COLUMN_ALIASES.get(canonical, [])
-  for alias in aliases:
-    for candidate in {alias, alias.lower()}:
-      if candidate in row and row[candidate] not in (None, ""):
-        return row[candidate]
-      # DictReader сохраняет исходный регистр, пробуем матчить вручную
-      for key, value in row.items():
-        if key and key.strip().lower() == candidate and value not in (None, ""):
-          return value
-  return None
-
-
-def _normalize_water_type(value: str | None) -> str | None:
-  if value is None:
-    return None
-  normalized = value.strip().lower()
-  fresh_values = {"fresh", "presnaya", "пресная", "пресная вода", "пресн.", "несоленая", "не соленая"}
-  non_fresh_values = {
-    "non_fresh",
-    "non-fresh",
-    "saline",
-    "solenaya",
-    "соленая",
-    "солёная",
-    "солоноватая",
-    "непресная",
-  }
-  if normalized in fresh_values:
-    return "fresh"
-  if normalized in non_fresh_values:
-    return "non_fresh"
-  return None
-
-
-def _normalize_resource_type(value: str | None) -> str | None:
-  if value is None:
-    return None
-  normalized = value.strip().lower()
-  mapping = {
-    "lake": "lake",
-    "ozero": "lake",
-    "озеро": "lake",
-    "canal": "canal",
-    "kanal": "canal",
-    "канал": "canal",
-    "reservoir": "reservoir",
-    "vodokhranilishche": "reservoir",
-    "водохранилище": "reservoir",
-    "гтс": "reservoir",
-  }
-  direct = mapping.get(normalized)
-  if direct:
-    return direct
+def _resource_type_by_stem(normalized: str) -> str | None:
   if "водохранилищ" in normalized or "гтс" in normalized:
     return "reservoir"
   if "канал" in normalized:
@@ -143,15 +128,31 @@ def _normalize_resource_type(value: str | None) -> str | None:
   return None
 
 
-def _bool_from_text(value: str | None) -> bool | None:
-  if value is None:
-    return None
-  normalized = value.strip().lower()
-  if normalized in {"true", "1", "yes", "da", "y", "да"}:
-    return True
-  if normalized in {"false", "0", "no", "net", "n", "нет"}:
-    return False
-  return None
+WATER_TYPES = Vocabulary(
+  {
+    **dict.fromkeys(
+      ["fresh", "presnaya", "пресная", "пресная вода", "пресн.", "несоленая", "не соленая"], "fresh"
+    ),
+    **dict.fromkeys(
+      ["non_fresh", "non-fresh", "saline", "solenaya", "соленая", "солёная", "солоноватая", "непресная"],
+      "non_fresh",
+    ),
+  }
+)
+RESOURCE_TYPES = Vocabulary(
+  {
+    **dict.fromkeys(["lake", "ozero", "озеро"], "lake"),
+    **dict.fromkeys(["canal", "kanal", "канал"], "canal"),
+    **dict.fromkeys(["reservoir", "vodokhranilishche", "водохранилище", "гтс"], "reservoir"),
+  },
+  fallback=_resource_type_by_stem,
+)
+BOOLEAN_WORDS = Vocabulary(
+  {
+    **dict.fromkeys(["true", "1", "yes", "da", "y", "да"], True),
+    **dict.fromkeys(["false", "0", "no", "net", "n", "нет"], False),
+  }
+)
 
 
 def _parse_date(value: str | None) -> date | None:
@@ -163,10 +164,10 @@ def _parse_date(value: str | None) -> date | None:
     return None
 
 
-@router.get("", response_model=list[WaterObjectResponse])
+@router.get("", response_model=list[WaterObjectResponse], responses={200: PROJECTION_RESPONSE})
 async def list_water_objects(
   repo: WaterObjectRepositorySupabase = Depends(get_water_object_repository),
-  metrics_repo: ComputedMetricsRepositorySupabase = Depends(get_computed_metrics_repository),
+  etag: str = Depends(get_catalog_etag),
   region: str | None = Query(None),
   resource_type: str | None = Query(None),
   water_type: str | None = Query(None),
@@ -176,11 +177,23 @@ async def list_water_objects(
   priority: int | None = Query(None),
   passport_date_from: str | None = Query(None),
   passport_date_to: str | None = Query(None),
+  bbox: str | None = Query(None, description="Viewport west,south,east,north in degrees"),
+  zoom: int | None = Query(None, ge=0, le=22, description="Map zoom: one object per on-screen cell"),
   sort_by: str = Query("priority"),
   sort_dir: str = Query("desc"),
   limit: int = Query(50, ge=1, le=200),
   offset: int = Query(0, ge=0),
+  cursor: str | None = Query(None, description="Opaque X-Next-Cursor value from the previous page"),
+  count: str = Query(
+    "none", pattern="^(exact|planned|estimated|none)$", description="Opt in to X-Total-Count"
+  ),
+  fields: str | None = Query(None, description="Comma-separated fields to return, e.g. id,name,latitude,longitude"),
 ):
+  try:
+    projection = parse_fields(fields, WATER_OBJECT_FIELDS)
+    viewport = parse_bbox(bbox)
+  except ValueError as exc:
+    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
   query = WaterObjectQuery(
     region=region,
     resource_type=resource_type,  # type: ignore[arg-type]
@@ -191,31 +204,152 @@ async def list_water_objects(
     priority=priority,
     passport_date_from=_parse_date(passport_date_from),
     passport_date_to=_parse_date(passport_date_to),
+    bbox=viewport,
+    zoom=zoom,
     sort_by=sort_by,  # type: ignore[arg-type]
     sort_dir=sort_dir,  # type: ignore[arg-type]
     limit=limit,
     offset=offset,
+    cursor=cursor,
+    count=None if count == "none" else count,  # type: ignore[arg-type]
+    fields=projection,
+  )
+  try:
+    page = await PageWaterObjects(repo)(query)
+  except InvalidCursor as exc:
+    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+  headers = catalog_cache_headers(etag)
+  if page.total is not None:
+    headers["X-Total-Count"] = str(page.total)
+  if page.next_cursor:
+    headers["X-Next-Cursor"] = page.next_cursor
+  # repository rows are trusted: skip response_model validation (it still documents the schema)
+  if projection:
+    names = [name for name in WATER_OBJECT_FIELDS if name in projection]
+    items = [{name: row[name] for name in names if name in row} for row in page.items]
+  else:
+    items = [water_object_to_row(obj) for obj in page.items]
+  return ORJSONResponse(items, headers=headers)
+
+
+@router.get("/search", response_model=list[WaterObjectSearchResult])
+async def search_water_objects(
+  q: str = Query(..., min_length=1, max_length=100, description="Name or region, typed so far"),
+  limit: int = Query(10, ge=1, le=50),
+  mirror: CatalogMirror = Depends(get_catalog_mirror),
+):
+  """Typeahead over names and regions: prefixes and typos match, served from memory."""
+  try:
+    await mirror.ready()
+  except Exception as exc:  # noqa: BLE001 - the load failed; the next search retries it
+    raise HTTPException(
+      status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Поисковый индекс ещё не загружен"
+    ) from exc
+  return [
+    {
+      "id": obj.id,
+      "name": obj.name,
+      "region": obj.region,
+      "resource_type": obj.resource_type,
+      "water_type": obj.water_type,
+      "latitude": obj.latitude,
+      "longitude": obj.longitude,
+      "score": score,
+    }
+    for obj, score in mirror.search.search(q, limit=limit)
+  ]
+
+
+@router.get("/nearest", response_model=list[WaterObjectNearestResult])
+async def nearest_water_objects(
+  lat: float = Query(..., ge=-90, le=90),
+  lon: float = Query(..., ge=-180, le=180),
+  k: int = Query(10, ge=1, le=100),
+  region: str | None = Query(None),
+  resource_type: str | None = Query(None),
+  water_type: str | None = Query(None),
+  fauna: bool | None = Query(None),
+  technical_condition: int | None = Query(None, ge=1, le=5),
+  condition_min: int | None = Query(None, ge=1, le=5),
+  priority: int | None = Query(None),
+  passport_date_from: str | None = Query(None),
+  passport_date_to: str | None = Query(None),
+  mirror: CatalogMirror = Depends(get_catalog_mirror),
+):
+  """The ``k`` objects closest to the point that pass the filters, nearest first, from memory."""
+  query = WaterObjectQuery(
+    region=region,
+    resource_type=resource_type,  # type: ignore[arg-type]
+    water_type=water_type,  # type: ignore[arg-type]
+    fauna=fauna,
+    technical_condition=technical_condition,
+    condition_min=condition_min,
+    priority=priority,
+    passport_date_from=_parse_date(passport_date_from),
+    passport_date_to=_parse_date(passport_date_to),
+  )
+  try:
+    await mirror.ready()
+  except Exception as exc:  # noqa: BLE001 - the load failed; the next request retries it
+    raise HTTPException(
+      status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Каталог ещё не загружен"
+    ) from exc
+  filtered = query.model_dump(exclude_defaults=True)
+  found = mirror.nearest.nearest(
+    lat, lon, k, (lambda obj: object_matches(obj, query)) if filtered else None
+  )
+  # objects come from the mirror: skip response_model validation (it still documents the schema)
+  return ORJSONResponse(
+    [{**water_object_to_row(obj), "distance_km": round(distance, 3)} for obj, distance in found]
+  )
+
+
+@router.get("/export")
+async def export_water_objects(
+  repo: WaterObjectRepositorySupabase = Depends(get_water_object_repository),
+  metrics_repo: ComputedMetricsRepositorySupabase = Depends(get_computed_metrics_repository),
+  etag: str = Depends(get_catalog_etag),
+  format: str = Query("csv", pattern="^(csv|ndjson|parquet)$"),
+  region: str | None = Query(None),
+  resource_type: str | None = Query(None),
+  water_type: str | None = Query(None),
+  fauna: bool | None = Query(None),
+  technical_condition: int | None = Query(None, ge=1, le=5),
+  condition_min: int | None = Query(None, ge=1, le=5),
+  priority: int | None = Query(None),
+  passport_date_from: str | None = Query(None),
+  passport_date_to: str | None = Query(None),
+) -> StreamingResponse:
+  """Streams every matching object with its computed metrics, read in keyset chunks.
+
+  ``csv`` uses the column layout ``import-csv`` accepts, model inputs included, so a file imports
+  back to the same condition; ``ndjson`` and ``parquet`` carry the full catalog row (id and
+  computed metrics included) followed by the same inputs.
+  """
+  query = WaterObjectQuery(
+    region=region,
+    resource_type=resource_type,  # type: ignore[arg-type]
+    water_type=water_type,  # type: ignore[arg-type]
+    fauna=fauna,
+    technical_condition=technical_condition,
+    condition_min=condition_min,
+    priority=priority,
+    passport_date_from=_parse_date(passport_date_from),
+    passport_date_to=_parse_date(passport_date_to),
   )
-  objects = await ListWaterObjects(repo)(query)
-  metrics_map = await metrics_repo.get_by_object_ids([obj.id for obj in objects])
-
-  responses: list[WaterObjectResponse] = []
-  for obj in objects:
-    data = asdict(obj)
-    metric = metrics_map.get(obj.id)
-    if metric:
-      if metric.get("technical_condition") is not None:
-        data["technical_condition"] = int(metric["technical_condition"])
-      category = metric.get("priority_category")
-      if category:
-        data["priority_category"] = category
-        data["priority"] = PRIORITY_CATEGORY_TO_VALUE.get(category, data.get("priority"))
-      if metric.get("priority_score") is not None:
-        data["priority_score"] = int(metric["priority_score"])
-      if metric.get("marker_color"):
-        data["marker_color"] = metric["marker_color"]
-    responses.append(WaterObjectResponse.model_validate(data))
-  return responses
+  chunks = ExportWaterObjects(repo, metrics_repo, chunk_size=get_settings().export_chunk_size)(query)
+  if format == "parquet":
+    try:
+      body = encode_parquet(chunks, parquet_schema())
+    except ParquetUnavailable as exc:
+      raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail=str(exc)) from exc
+  elif format == "ndjson":
+    body = encode_ndjson(chunks)
+  else:
+    body = encode_csv(chunks, CANONICAL_COLUMNS)
+  headers = catalog_cache_headers(etag)
+  headers["Content-Disposition"] = f'attachment; filename="water_objects.{format}"'
+  return StreamingResponse(body, media_type=EXPORT_MEDIA_TYPES[format], headers=headers)
 
 
 @router.post("", response_model=WaterObjectResponse, status_code=status.HTTP_201_CREATED)
@@ -229,169 +363,317 @@ async def create_water_object(
 @router.get("/{object_id}", response_model=WaterObjectResponse)
 async def get_water_object(
   object_id: str,
+  response: Response,
   repo: WaterObjectRepositorySupabase = Depends(get_water_object_repository),
-  metrics_repo: ComputedMetricsRepositorySupabase = Depends(get_computed_metrics_repository),
+  etag: str = Depends(get_catalog_etag),
 ):
   obj = await GetWaterObject(repo)(object_id)
   if obj is None:
     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Water object not found")
-  data = asdict(obj)
-  metric = (await metrics_repo.get_by_object_ids([obj.id])).get(obj.id)
-  if metric:
-    if metric.get("technical_condition") is not None:
-      data["technical_condition"] = int(metric["technical_condition"])
-    category = metric.get("priority_category")
-    if category:
-      data["priority_category"] = category
-      data["priority"] = PRIORITY_CATEGORY_TO_VALUE.get(category, data.get("priority"))
-    if metric.get("priority_score") is not None:
-      data["priority_score"] = int(metric["priority_score"])
-    if metric.get("marker_color"):
-      data["marker_color"] = metric["marker_color"]
-  return WaterObjectResponse.model_validate(data)
+  response.headers.update(catalog_cache_headers(etag))
+  return WaterObjectResponse.model_validate(asdict(obj))
 
 
 @router.get("/{object_id}/priority")
 async def get_water_object_priority(
   object_id: str,
   repo: WaterObjectRepositorySupabase = Depends(get_water_object_repository),
-  metrics_repo: ComputedMetricsRepositorySupabase = Depends(get_computed_metrics_repository),
 ):
   obj = await GetWaterObject(repo)(object_id)
   if obj is None:
     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Water object not found")
-  metric = (await metrics_repo.get_by_object_ids([obj.id])).get(obj.id)
-  priority_value = obj.priority
-  if metric and metric.get("priority_category"):
-    priority_value = PRIORITY_CATEGORY_TO_VALUE.get(metric["priority_category"], priority_value)
-  return {"id": obj.id, "priority": priority_value}
+  return {"id": obj.id, "priority": obj.priority}
 
 
-@router.post("/import-csv", status_code=status.HTTP_201_CREATED)
-async def import_water_objects(
-  file: UploadFile = File(...),
-  repo: WaterObjectRepositorySupabase = Depends(get_water_object_repository),
-  metrics_repo: ComputedMetricsRepositorySupabase = Depends(get_computed_metrics_repository),
-):
-  payload = await file.read()
+def _detect_encoding(stream: BinaryIO) -> str:
+  """``utf-8-sig`` when the whole upload is valid UTF-8, ``cp1251`` otherwise; reads in chunks and rewinds."""
+  decoder = codecs.getincrementaldecoder("utf-8-sig")()
   try:
-    decoded = payload.decode("utf-8-sig")
+    while chunk := stream.read(CSV_READ_CHUNK_BYTES):
+      decoder.decode(chunk)
+    decoder.decode(b"", final=True)
   except UnicodeDecodeError:
-    decoded = payload.decode("cp1251", errors="ignore")
+    return "cp1251"
+  finally:
+    stream.seek(0)
+  return "utf-8-sig"
+
+
+def _open_csv(stream: BinaryIO) -> tuple[list[str] | None, Iterator[list[str]]]:
+  """Header row and an iterator over the remaining rows, as lists of cells."""
+  text = io.TextIOWrapper(stream, encoding=_detect_encoding(stream), errors="ignore", newline="")
+  reader = csv.reader(text)
+  return next(reader, None), reader
+
+
+def _next_rows(rows: Iterator[tuple[int, list[str]]], size: int) -> list[tuple[int, list[str]]]:
+  return list(islice(rows, size))
+
+
+@dataclass
+class _ImportReport:
+  plan: HeaderPlan
+  keep_items: bool
+  details_limit: int = SKIPPED_DETAILS_LIMIT
+  rows: int = 0
+  inserted: int = 0
+  skipped: int = 0
+  items: list[WaterObjectResponse] = field(default_factory=list)
+  skipped_details: list[dict] = field(default_factory=list)
+  chunk_errors: list[dict] = field(default_factory=list)
+
+  def skip(self, idx: int, row: list[str], reason: str) -> None:
+    self.skipped += 1
+    if len(self.skipped_details) < self.details_limit:
+      self.skipped_details.append({"row": idx, "reason": reason, "data": self.plan.record(row)})
+    logger.info("CSV row skipped: %s", reason, extra={"row": idx})
+
+  def progress(self) -> dict:
+    return {"rows": self.rows, "inserted": self.inserted, "skipped": self.skipped}
+
+  def summary(self) -> dict:
+    result = {
+      "inserted": self.inserted,
+      "skipped": self.skipped,
+      "skipped_details": self.skipped_details,
+      "chunk_errors": self.chunk_errors,
+    }
+    if self.keep_items:
+      result["items"] = self.items
+    return result
 
-  reader = csv.DictReader(StringIO(decoded))
-  if not reader.fieldnames:
-    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="CSV не содержит заголовок.")
 
-  _validate_headers(reader.fieldnames)
+_PendingRow = tuple[int, list[str], WaterObjectCreate, int, str, str, dict[str, Any]]
 
-  created: list[WaterObjectResponse] = []
-  skipped = 0
-  skipped_details: list[dict] = []
 
-  for idx, row in enumerate(reader, start=1):
-    normalized_row = {key: _row_value(row, key) for key in CANONICAL_COLUMNS}
+_ParsedRow = tuple[int, list[str], dict[str, str | None], date, float, float]
 
-    resource_type = _normalize_resource_type(normalized_row.get("resource_type")) or "reservoir"
-    water_type = _normalize_water_type(normalized_row.get("water_type")) or "fresh"
 
-    try:
-      passport_date_raw = normalized_row.get("passport_date")
-      if not passport_date_raw:
-        raise ValueError("passport_date is required")
-      passport_date = _parse_date(passport_date_raw)
-      if passport_date is None:
-        raise ValueError("passport_date invalid")
-
-      latitude_value = normalized_row.get("latitude")
-      longitude_value = normalized_row.get("longitude")
-      latitude = float(latitude_value) if latitude_value not in (None, "") else None
-      longitude = float(longitude_value) if longitude_value not in (None, "") else None
-      if latitude is None or longitude is None:
-        raise ValueError("coordinates are required")
-    except (ValueError, TypeError) as exc:
-      skipped += 1
-      reason = f"parse error: {exc}"
-      skipped_details.append({"row": idx, "reason": reason, "data": row})
-      logger.info("CSV row skipped: %s", reason, extra={"row": idx})
-      continue
+def _parse_row(idx: int, row: list[str], report: _ImportReport) -> _ParsedRow | None:
+  normalized_row = report.plan.values(row)
 
-    compute_payload = {
-      "passport_date": passport_date_raw,
-      "depth_max_m": normalized_row.get("depth_max_m"),
-      "vegetation_surface": normalized_row.get("vegetation_surface"),
-      "vegetation_underwater": normalized_row.get("vegetation_underwater"),
-      "phytoplankton_level": normalized_row.get("phytoplankton_level"),
-      "fish_presence": normalized_row.get("fish_presence"),
-      "fish_productivity": normalized_row.get("fish_productivity"),
-    }
+  try:
+    passport_date_raw = normalized_row.get("passport_date")
+    if not passport_date_raw:
+      raise ValueError("passport_date is required")
+    passport_date = _parse_date(passport_date_raw)
+    if passport_date is None:
+      raise ValueError("passport_date invalid")
+
+    latitude_value = normalized_row.get("latitude")
+    longitude_value = normalized_row.get("longitude")
+    latitude = float(latitude_value) if latitude_value not in (None, "") else None
+    longitude = float(longitude_value) if longitude_value not in (None, "") else None
+    if latitude is None or longitude is None:
+      raise ValueError("coordinates are required")
+  except (ValueError, TypeError) as exc:
+    report.skip(idx, row, f"parse error: {exc}")
+    return None
 
-    try:
-      technical_condition = compute_technical_condition(compute_payload)
-    except Exception as exc:  # noqa: BLE001 - хотим записать причину в CSV отчёт
-      skipped += 1
-      reason = f"condition calc error: {exc}"
-      skipped_details.append({"row": idx, "reason": reason, "data": row})
-      logger.info("CSV row skipped: %s", reason, extra={"row": idx})
+  return idx, row, normalized_row, passport_date, latitude, longitude
+
+
+def _prepare_rows(batch: list[tuple[int, list[str]]], report: _ImportReport) -> list[_PendingRow]:
+  parsed = [item for idx, row in batch if (item := _parse_row(idx, row, report)) is not None]
+  if not parsed:
+    return []
+  # состояние и приоритет — одним векторным расчётом на всю пачку
+  today = date.today()
+  conditions = compute_conditions_batch(
+    {column: [model_input(column, item[2].get(column)) for item in parsed] for column in TECHNICAL_COLUMNS},
+    reference_date=today,
+  )
+  # входы модели и отметка расчёта — чтобы RecomputeMetrics пересчитал метрики при смене года или весов
+  stamp = metric_stamp(today, model_version())
+
+  pending: list[_PendingRow] = []
+  for position, (idx, row, normalized_row, passport_date, latitude, longitude) in enumerate(parsed):
+    error = conditions.errors[position]
+    if error is not None:
+      report.skip(idx, row, f"condition calc error: {error}")
       continue
 
-    priority_score, priority_category = calculate_priority_score(passport_date, technical_condition)
-    priority_numeric = PRIORITY_CATEGORY_TO_VALUE[priority_category]
-    marker_color = marker_color_for_condition(technical_condition)
+    technical_condition = int(conditions.technical_condition[position])
+    priority_score = int(conditions.priority_score[position])
+    priority_category = str(conditions.priority_category[position])
+    marker_color = str(conditions.marker_color[position])
 
-    fauna = _bool_from_text(normalized_row.get("fauna"))
+    fauna = BOOLEAN_WORDS(normalized_row.get("fauna"))
     if fauna is None:
       fauna = False
 
-    pdf_url = normalized_row.get("pdf_url")
-
     try:
       payload_obj = WaterObjectCreate(
         name=normalized_row.get("name") or "Unnamed object",
         region=normalized_row.get("region") or "Unknown region",
-        resource_type=resource_type,  # type: ignore[arg-type]
-        water_type=water_type,  # type: ignore[arg-type]
+        resource_type=RESOURCE_TYPES(normalized_row.get("resource_type")) or "reservoir",  # type: ignore[arg-type]
+        water_type=WATER_TYPES(normalized_row.get("water_type")) or "fresh",  # type: ignore[arg-type]
         fauna=fauna,
         passport_date=passport_date,
         technical_condition=technical_condition,
         latitude=latitude,
         longitude=longitude,
-        pdf_url=pdf_url,
-        priority=priority_numeric,
+        pdf_url=normalized_row.get("pdf_url"),
+        priority=PRIORITY_CATEGORY_TO_VALUE[priority_category],
       )
     except (ValidationError, ValueError) as exc:
-      skipped += 1
-      reason = f"validation error: {exc}"
-      skipped_details.append({"row": idx, "reason": reason, "data": row})
-      logger.info("CSV row skipped: %s", reason, extra={"row": idx})
+      report.skip(idx, row, f"validation error: {exc}")
       continue
 
-    obj = await CreateWaterObject(repo)(payload_obj)
-    await metrics_repo.upsert_metric(
+    inputs = {**metric_inputs(normalized_row), **stamp}
+    pending.append((idx, row, payload_obj, priority_score, priority_category, marker_color, inputs))
+  return pending
+
+
+async def _write_batch(
+  pending: list[_PendingRow],
+  repo: WaterObjectRepositorySupabase,
+  metrics_repo: ComputedMetricsRepositorySupabase,
+  report: _ImportReport,
+  chunk_size: int,
+) -> None:
+  created_result = await CreateWaterObjects(repo, chunk_size=chunk_size)([item[2] for item in pending])
+  for error in created_result.errors:
+    rows = pending[error.start : error.start + error.size]
+    report.chunk_errors.append(
+      {"stage": "water_objects", "rows": [rows[0][0], rows[-1][0]], "error": error.error}
+    )
+    for idx, row, *_ in rows:
+      report.skip(idx, row, f"insert error: {error.error}")
+    logger.info("CSV chunk rejected: %s", error.error, extra={"rows": error.size})
+
+  # pair by payload position: the insert may leave out rows of a chunk that otherwise succeeded
+  positions = created_result.positions
+  pairs = [(pending[position], obj) for position, obj in zip(positions, created_result.items)]
+  echoed = set(positions) | created_result.failed_indexes()
+  for position, (idx, row, *_) in enumerate(pending):
+    if position not in echoed:
+      report.skip(idx, row, "insert error: the row was not returned by the database")
+  report.inserted += len(pairs)
+
+  metrics_result = await metrics_repo.upsert_many(
+    [
       {
         "object_id": obj.id,
-        "technical_condition": technical_condition,
+        "technical_condition": payload_obj.technical_condition,
         "priority_score": priority_score,
         "priority_category": priority_category,
         "marker_color": marker_color,
+        **inputs,
       }
+      for (_, _, payload_obj, priority_score, priority_category, marker_color, inputs), obj in pairs
+    ],
+    chunk_size=chunk_size,
+  )
+  for error in metrics_result.errors:
+    rows = pairs[error.start : error.start + error.size]
+    report.chunk_errors.append(
+      {"stage": "computed_metrics", "rows": [rows[0][0][0], rows[-1][0][0]], "error": error.error}
     )
+    logger.info("CSV metrics chunk rejected: %s", error.error, extra={"rows": error.size})
 
+  if not report.keep_items:
+    return
+  for (_, _, payload_obj, priority_score, priority_category, marker_color, _), obj in pairs:
     obj_dict = asdict(obj)
-    obj_dict["technical_condition"] = technical_condition
-    obj_dict["priority"] = priority_numeric
+    obj_dict["technical_condition"] = payload_obj.technical_condition
+    obj_dict["priority"] = payload_obj.priority
     obj_dict["priority_category"] = priority_category
     obj_dict["priority_score"] = priority_score
     obj_dict["marker_color"] = marker_color
-    created.append(WaterObjectResponse.model_validate(obj_dict))
+    report.items.append(WaterObjectResponse.model_validate(obj_dict))
+
+
+async def _import_batches(
+  rows: Iterator[list[str]],
+  repo: WaterObjectRepositorySupabase,
+  metrics_repo: ComputedMetricsRepositorySupabase,
+  report: _ImportReport,
+  chunk_size: int,
+) -> AsyncIterator[dict]:
+  """Reads, validates and writes ``chunk_size`` rows at a time, yielding progress after each batch."""
+  numbered = enumerate((row for row in rows if row), start=1)  # blank lines are skipped, as by DictReader
+  while batch := await asyncio.to_thread(_next_rows, numbered, chunk_size):
+    report.rows += len(batch)
+    pending = _prepare_rows(batch, report)
+    if pending:
+      await _write_batch(pending, repo, metrics_repo, report, chunk_size)
+    yield report.progress()
 
-  if skipped_details:
-    for detail in skipped_details[:5]:
-      logger.info("CSV row skipped detail", extra=detail)
 
-  return {
-    "inserted": len(created),
-    "skipped": skipped,
-    "items": created,
-    "skipped_details": skipped_details[:5],
-  }
+@router.post("/import-csv", status_code=status.HTTP_201_CREATED)
+async def import_water_objects(
+  request: Request,
+  file: UploadFile = File(...),
+  repo: WaterObjectRepositorySupabase = Depends(get_water_object_repository),
+  metrics_repo: ComputedMetricsRepositorySupabase = Depends(get_computed_metrics_repository),
+  jobs: JobManager = Depends(get_job_manager),
+  mode: str = Query(
+    "full",
+    pattern="^(full|summary|ndjson)$",
+    description="full: summary plus every created object; summary: counters only; ndjson: streamed progress",
+  ),
+  background: bool = Query(False, description="Answer 202 with a job id at once; poll GET /jobs/{id}"),
+  idempotency_key: str | None = Header(None),
+  identity: dict[str, str] | None = Depends(get_optional_identity),
+):
+  detached = background or mode == "ndjson"
+  stream = detach_upload(file) if detached else file.file
+  try:
+    headers, rows = await asyncio.to_thread(_open_csv, stream)
+    if not headers:
+      raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="CSV не содержит заголовок.")
+    plan = CSV_SCHEMA.compile(headers)
+    _validate_headers(plan)
+  except BaseException:
+    if detached:
+      stream.close()
+    raise
+
+  chunk_size = get_settings().import_chunk_size
+
+  if background:
+    state = request.app.state
+
+    async def run(job: Job) -> dict:
+      job_repo, job_metrics_repo = job_repositories(state)
+      report = _ImportReport(plan, keep_items=False, details_limit=job.max_errors)
+      try:
+        async for progress in _import_batches(rows, job_repo, job_metrics_repo, report, chunk_size):
+          job.report(progress, report.skipped_details + report.chunk_errors)
+      finally:
+        stream.close()
+      return report.summary()
+
+    return submit_job(
+      request,
+      jobs,
+      "import-csv",
+      run,
+      idempotency_key=idempotency_key,
+      identity=identity,
+      release=stream.close,
+    )
+
+  report = _ImportReport(plan, keep_items=mode == "full")
+  batches = _import_batches(rows, repo, metrics_repo, report, chunk_size)
+
+  if mode != "ndjson":
+    async for _ in batches:
+      pass
+    return report.summary()
+
+  async def progress_lines() -> AsyncIterator[str]:
+    try:
+      async for progress in batches:
+        yield json.dumps(progress) + "\n"
+      yield json.dumps({"done": True, **report.summary()}, ensure_ascii=False, default=str) + "\n"
+    except Exception as exc:  # noqa: BLE001 - статус уже отправлен, сообщаем об ошибке в потоке
+      logger.exception("CSV import failed", extra={"rows": report.rows})
+      yield json.dumps({"error": str(exc), **report.progress()}, ensure_ascii=False) + "\n"
+    finally:
+      stream.close()
+
+  return StreamingResponse(
+    progress_lines(), status_code=status.HTTP_201_CREATED, media_type="application/x-ndjson"
+  )
@@ -1,15 +1,17 @@
+from collections.abc import Callable
 from datetime import date
-from dataclasses import asdict
+from typing import Any
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 
 from app.application.water_objects.use_cases import ListWaterObjects
-from app.core.deps import get_water_object_repository, get_computed_metrics_repository
-from app.infrastructure.supabase.computed_metrics import ComputedMetricsRepositorySupabase
+from app.core.deps import catalog_cache_headers, get_catalog_etag, get_water_object_repository
+from app.infrastructure.records import water_object_to_row
 from app.infrastructure.supabase.water_objects import WaterObjectRepositorySupabase
 from app.models.condition_model import marker_color_for_condition, VALUE_TO_PRIORITY_CATEGORY
-from app.schemas.water_object import WaterObjectQuery
+from app.schemas.water_object import PROJECTION_RESPONSE, WaterObjectQuery, parse_bbox, parse_fields
 
 
 class MapCoordinates(BaseModel):
@@ -41,43 +43,63 @@ class MapObject(BaseModel):
   pdfUrl: str | None = None
 
 
+def _priority_label(data: dict[str, Any]) -> str:
+  return data.get("priority_category") or VALUE_TO_PRIORITY_CATEGORY.get(data.get("priority"), "low") or "low"
+
+
+# MapObject field -> (catalog view columns it needs, value builder); builders emit JSON-ready values
+MAP_FIELDS: dict[str, tuple[tuple[str, ...], Callable[[dict[str, Any]], Any]]] = {
+  "id": (("id",), lambda data: data["id"]),
+  "name": (("name",), lambda data: data["name"]),
+  "region": (("region",), lambda data: data["region"]),
+  "resourceType": (("resource_type",), lambda data: data["resource_type"]),
+  "waterType": (("water_type",), lambda data: "fresh" if data["water_type"] == "fresh" else "saline"),
+  "hasFauna": (("fauna",), lambda data: data["fauna"]),
+  "passportDate": (("passport_date",), lambda data: data["passport_date"]),
+  "condition": (("technical_condition",), lambda data: data["technical_condition"]),
+  "priority": (("priority_category", "priority"), _priority_label),
+  "priorityCategory": (("priority_category", "priority"), _priority_label),
+  "priorityScore": (("priority_score",), lambda data: data.get("priority_score")),
+  "markerColor": (
+    ("marker_color", "technical_condition"),
+    lambda data: data.get("marker_color") or marker_color_for_condition(data["technical_condition"]),
+  ),
+  "coordinates": (("latitude", "longitude"), lambda data: {"lat": data["latitude"], "lng": data["longitude"]}),
+  "position": ((), lambda data: {"x": 0.0, "y": 0.0}),
+  "image": ((), lambda data: "/placeholder.svg"),
+  "pdfUrl": (("pdf_url",), lambda data: data.get("pdf_url")),
+}
+
 router = APIRouter()
 
 
-@router.get("/maps", response_model=list[MapObject])
+@router.get("/maps", response_model=list[MapObject], responses={200: PROJECTION_RESPONSE})
 async def list_map_objects(
   repo: WaterObjectRepositorySupabase = Depends(get_water_object_repository),
-  metrics_repo: ComputedMetricsRepositorySupabase = Depends(get_computed_metrics_repository),
-) -> list[MapObject]:
-  objects = await ListWaterObjects(repo)(WaterObjectQuery(limit=200))
-  metrics_map = await metrics_repo.get_by_object_ids([obj.id for obj in objects])
-  result: list[MapObject] = []
-  for obj in objects:
-    data = asdict(obj)
-    metric = metrics_map.get(obj.id)
-    condition = int(metric["technical_condition"]) if metric and metric.get("technical_condition") else data["technical_condition"]
-    priority_category = metric.get("priority_category") if metric else VALUE_TO_PRIORITY_CATEGORY.get(data.get("priority"))
-    priority_score = int(metric["priority_score"]) if metric and metric.get("priority_score") is not None else None
-    marker_color = metric.get("marker_color") if metric and metric.get("marker_color") else marker_color_for_condition(condition)
-    priority_label = priority_category or VALUE_TO_PRIORITY_CATEGORY.get(data.get("priority"), "low")
-    result.append(
-      MapObject(
-        id=data["id"],
-        name=data["name"],
-        region=data["region"],
-        resourceType=data["resource_type"],
-        waterType="fresh" if data["water_type"] == "fresh" else "saline",
-        hasFauna=data["fauna"],
-        passportDate=data["passport_date"],
-        condition=condition,
-        priority=priority_label or "low",
-        priorityCategory=priority_label,
-        priorityScore=priority_score,
-        markerColor=marker_color,
-        coordinates=MapCoordinates(lat=data["latitude"], lng=data["longitude"]),
-        position=MapPosition(x=0, y=0),
-        image="/placeholder.svg",
-        pdfUrl=data.get("pdf_url"),
-      )
-    )
-  return result
+  etag: str = Depends(get_catalog_etag),
+  fields: str | None = Query(None, description="Comma-separated MapObject fields, e.g. id,name,coordinates,markerColor"),
+  bbox: str | None = Query(None, description="Viewport west,south,east,north in degrees"),
+  zoom: int | None = Query(None, ge=0, le=22, description="Map zoom: one object per on-screen cell"),
+) -> ORJSONResponse:
+  try:
+    projection = parse_fields(fields, tuple(MAP_FIELDS))
+    viewport = parse_bbox(bbox)
+  except ValueError as exc:
+    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+  if projection is None:
+    columns = None
+    names = tuple(MAP_FIELDS)
+  else:
+    columns = tuple(dict.fromkeys(column for name in projection for column in MAP_FIELDS[name][0]))
+    names = tuple(name for name in MAP_FIELDS if name in projection)
+  builders = [(name, MAP_FIELDS[name][1]) for name in names]
+
+  # with a viewport the most important objects on screen come first (the default priority sort)
+  query = WaterObjectQuery(limit=200, fields=columns, bbox=viewport, zoom=zoom)
+  objects = await ListWaterObjects(repo)(query)
+  # rows come from the repository, so the models above only document the response (no validation)
+  rows = (obj if isinstance(obj, dict) else water_object_to_row(obj) for obj in objects)
+  return ORJSONResponse(
+    [{name: build(data) for name, build in builders} for data in rows], headers=catalog_cache_headers(etag)
+  )
@@ -1,16 +1,123 @@
+from collections.abc import Callable
+from contextlib import asynccontextmanager
+
+import httpx
+import psycopg
+from postgrest import APIError
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.application.metrics.use_cases import RECOMPUTE_LOCK_KEY, RecomputeMetrics, recompute_job
+from app.core.config import Settings, get_settings
+from app.core.deps import job_repositories
+from app.core.security import PasswordHasher, TokenVerifier
+from app.infrastructure.cache import CatalogCache
+from app.infrastructure.catalog_mirror import CatalogLoader, CatalogMirror
+from app.infrastructure.catalog_version import CatalogVersion
+from app.infrastructure.jobs import Job, JobManager, JobRun
+from app.infrastructure.postgres.pool import PostgresPool
+from app.infrastructure.postgres.water_objects import WaterObjectRepositoryPostgres
+from app.infrastructure.replicas import ReadSession, ReplicaRouter
+from app.infrastructure.scheduler import PeriodicJob
+from app.infrastructure.single_flight import SingleFlight
+from app.infrastructure.supabase.client import SupabaseClient, replica_unavailable
+from app.infrastructure.supabase.water_objects import WaterObjectRepositorySupabase
+
 from app.interfaces.api.v1.auth import router as auth_router
 from app.interfaces.api.v1.water_objects import router as water_objects_router
 from app.interfaces.api.v1.reports import router as reports_router
+from app.interfaces.api.v1.jobs import router as jobs_router
+from app.interfaces.api.v1.system import router as system_router
 from app.interfaces.maps import router as maps_router
 from app.ai.api import router as ai_router
 from app.ai.services import AnalyticsService, InsightService
+from app.schemas.water_object import WaterObjectQuery
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+  postgres: PostgresPool | None = app.state.postgres
+  replica = app.state.read_router.replica
+  if postgres is not None:
+    await postgres.open()
+  if isinstance(replica, PostgresPool):
+    await replica.open()
+  app.state.catalog_mirror.start()
+  app.state.metrics_recompute.start()
+  try:
+    yield
+  finally:
+    # jobs and the mirror load still go through the pools below, so they stop first
+    await app.state.metrics_recompute.close()
+    await app.state.jobs.close()
+    await app.state.catalog_mirror.close()
+    if isinstance(replica, PostgresPool):
+      await replica.close()
+    elif isinstance(replica, SupabaseClient):
+      await replica.aclose()
+    if postgres is not None:
+      await postgres.close()
+    app.state.password_hasher.close()
+    await app.state.supabase.aclose()
+
+
+def _build_read_router(settings: Settings, supabase: SupabaseClient, postgres: PostgresPool | None) -> ReplicaRouter:
+  """Route reads of the active repository backend to its replica, if one is configured."""
+  if postgres is not None:
+    pool_replica = (
+      PostgresPool.from_settings(settings, url=settings.database_read_url) if settings.database_read_url else None
+    )
+    return ReplicaRouter.from_settings(
+      settings, postgres, pool_replica, unavailable_errors=(psycopg.OperationalError,)
+    )
+  client_replica = (
+    SupabaseClient.from_settings(settings, url=settings.supabase_read_url) if settings.supabase_read_url else None
+  )
+  return ReplicaRouter.from_settings(
+    settings,
+    supabase,
+    client_replica,
+    unavailable_errors=(httpx.TransportError, APIError),
+    is_unavailable=replica_unavailable,
+  )
+
+
+def _catalog_loader(
+  supabase: SupabaseClient, postgres: PostgresPool | None, read_router: ReplicaRouter
+) -> CatalogLoader:
+  """Full catalog scan for the catalog mirror, served by the read replica when there is one."""
+
+  def load():
+    reads = ReadSession(read_router)
+    if postgres is not None:
+      return WaterObjectRepositoryPostgres(postgres, reads=reads).iter_chunks(WaterObjectQuery())
+    return WaterObjectRepositorySupabase(supabase, reads=reads).iter_chunks(WaterObjectQuery())
+
+  return load
+
+
+def _metrics_recompute_runs(app: FastAPI, settings: Settings) -> Callable[[bool], JobRun]:
+  """Recompute job runs for the schedule and the endpoint.
+
+  Each run gets its own repository and read session. On the Postgres backend it also takes an
+  advisory lock, so with several workers only one of them recomputes at a time.
+  """
+  state = app.state
+
+  def runs(full: bool = False) -> JobRun:
+    async def run(job: Job) -> dict:
+      _, metrics = job_repositories(state)
+      lock = state.postgres.try_advisory_lock(RECOMPUTE_LOCK_KEY) if state.postgres is not None else None
+      recompute = RecomputeMetrics(metrics, chunk_size=settings.metrics_recompute_chunk_size)
+      return await recompute_job(recompute, full=full, lock=lock)(job)
+
+    return run
+
+  return runs
 
 
 def create_app() -> FastAPI:
-  app = FastAPI(title="GidroAtlas API", version="0.1.0")
+  app = FastAPI(title="GidroAtlas API", version="0.1.0", lifespan=lifespan)
 
   app.add_middleware(
     CORSMiddleware,
@@ -18,15 +125,41 @@ def create_app() -> FastAPI:
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count", "X-Next-Cursor", "ETag"],
   )
 
   app.include_router(auth_router, prefix="/api/v1")
   app.include_router(water_objects_router, prefix="/api/v1")
   app.include_router(reports_router, prefix="/api/v1")
+  app.include_router(jobs_router, prefix="/api/v1")
+  app.include_router(system_router, prefix="/api/v1")
   app.include_router(ai_router, prefix="/api/v1")
   app.include_router(maps_router)
 
-  analytics_service = AnalyticsService()
+  settings = get_settings()
+  supabase = SupabaseClient.from_settings(settings)
+  app.state.supabase = supabase  # type: ignore[attr-defined]
+  postgres = PostgresPool.from_settings(settings) if settings.repository_backend == "postgres" else None
+  app.state.postgres = postgres  # type: ignore[attr-defined]
+  app.state.read_router = _build_read_router(settings, supabase, postgres)  # type: ignore[attr-defined]
+  app.state.catalog_cache = (  # type: ignore[attr-defined]
+    CatalogCache.from_settings(settings) if settings.catalog_cache_enabled else None
+  )
+  app.state.single_flight = SingleFlight()  # type: ignore[attr-defined]
+  app.state.catalog_version = CatalogVersion.from_settings(settings)  # type: ignore[attr-defined]
+  app.state.catalog_mirror = CatalogMirror.from_settings(  # type: ignore[attr-defined]
+    settings, _catalog_loader(supabase, postgres, app.state.read_router)
+  )
+  app.state.password_hasher = PasswordHasher.from_settings(settings)  # type: ignore[attr-defined]
+  app.state.token_verifier = TokenVerifier.from_settings(settings)  # type: ignore[attr-defined]
+  app.state.jobs = JobManager.from_settings(settings)  # type: ignore[attr-defined]
+  app.state.metrics_recompute_runs = _metrics_recompute_runs(app, settings)  # type: ignore[attr-defined]
+  interval = settings.metrics_recompute_interval_seconds if settings.metrics_recompute_scheduler else 0
+  app.state.metrics_recompute = PeriodicJob(  # type: ignore[attr-defined]
+    app.state.jobs, "recompute-metrics", app.state.metrics_recompute_runs(False), interval
+  )
+
+  analytics_service = AnalyticsService(supabase=supabase)
   app.state.analytics_service = analytics_service  # type: ignore[attr-defined]
   app.state.insight_service = InsightService(analytics_service)  # type: ignore[attr-defined]
   return app
@@ -1,9 +1,14 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import hashlib
+from collections.abc import Callable, Mapping, Sequence
+from dataclasses import astuple, dataclass
 from datetime import date, datetime
 from typing import Any, TypedDict
 
+import numpy as np
+import pandas as pd
+
 CONDITION_COLORS: dict[int, str] = {
   1: '#0ea05d',  # зелёный
   2: '#7acb64',  # салатовый
@@ -14,6 +19,8 @@ CONDITION_COLORS: dict[int, str] = {
 
 PRIORITY_CATEGORY_TO_VALUE = {'low': 1, 'medium': 2, 'high': 3}
 VALUE_TO_PRIORITY_CATEGORY = {value: key for key, value in PRIORITY_CATEGORY_TO_VALUE.items()}
+PASSPORT_DATE_REQUIRED = "passport_date is required to compute technical condition"
+TECHNICAL_CONDITION_REQUIRED = "technical_condition is required to compute priority"
 
 
 class TechnicalRow(TypedDict, total=False):
@@ -26,6 +33,12 @@ class TechnicalRow(TypedDict, total=False):
   fish_productivity: float | str | None
 
 
+TECHNICAL_COLUMNS = tuple(TechnicalRow.__annotations__)
+# входы модели, которые хранятся в computed_metrics (дата паспорта — в water_objects)
+METRIC_INPUT_COLUMNS = tuple(column for column in TECHNICAL_COLUMNS if column != "passport_date")
+# увеличивается при изменении формул, чтобы пересчитать уже сохранённые метрики
+MODEL_REVISION = 1
+
 @dataclass(frozen=True)
 class ConditionWeights:
   age: float = 0.25
@@ -47,6 +60,15 @@ DEFAULT_WEIGHTS = ConditionWeights()
 DEFAULT_THRESHOLDS = ConditionThresholds()
 
 
+def model_version(
+  weights: ConditionWeights = DEFAULT_WEIGHTS,
+  thresholds: ConditionThresholds = DEFAULT_THRESHOLDS,
+) -> str:
+  """Отпечаток модели: меняется вместе с ревизией формул, любым весом или порогом."""
+  payload = repr((MODEL_REVISION, astuple(weights), astuple(thresholds)))
+  return hashlib.blake2b(payload.encode(), digest_size=6).hexdigest()
+
+
 def normalize_level(level: str | None) -> float:
   """Преобразование «слабо/средне/сильно» → 0/0.5/1."""
   if not level:
@@ -95,7 +117,7 @@ def compute_technical_condition(
   """
   passport_raw = row.get("passport_date")
   if not passport_raw:
-    raise ValueError("passport_date is required to compute technical condition")
+    raise ValueError(PASSPORT_DATE_REQUIRED)
   passport_date = datetime.strptime(passport_raw, "%Y-%m-%d").date()
   today = reference_date or datetime.now().date()
   years = max(0, today.year - passport_date.year)
@@ -165,3 +187,193 @@ def calculate_priority_score(
     category = "low"
   return score, category
 
+
+ConditionColumns = Mapping[str, Sequence[Any]] | pd.DataFrame
+
+
+@dataclass(frozen=True)
+class ConditionBatch:
+  """Результат пакетного расчёта: массивы одинаковой длины, по элементу на строку.
+
+  ``errors`` — текст ошибки, которую для этой строки подняла бы скалярная функция, или ``None``;
+  остальные значения в такой строке не определены.
+  """
+
+  technical_condition: np.ndarray
+  priority_score: np.ndarray
+  priority_category: np.ndarray
+  marker_color: np.ndarray
+  errors: np.ndarray
+
+  @property
+  def valid(self) -> np.ndarray:
+    return np.equal(self.errors, None)
+
+
+def _size(columns: ConditionColumns) -> int:
+  """Число строк: длина фрейма или самой длинной из переданных колонок."""
+  if isinstance(columns, pd.DataFrame):
+    return len(columns)
+  return max((len(values) for values in columns.values()), default=0)
+
+
+def _column(columns: ConditionColumns, name: str, size: int) -> pd.Series:
+  values = columns.get(name)
+  if values is None:
+    return pd.Series([None] * size, dtype=object)
+  return pd.Series(values).reset_index(drop=True)
+
+
+def _map_distinct(
+  series: pd.Series, func: Callable[[Any], float], missing: float
+) -> tuple[np.ndarray, np.ndarray]:
+  """Применяет скалярную ``func`` один раз на каждое различное значение колонки.
+
+  Пустые (None/NaN) значения получают ``missing``. Возвращает значения и тексты ошибок
+  (ValueError/TypeError из ``func``) по строкам.
+  """
+  codes, distinct = pd.factorize(series)
+  # factorize помечает пустые значения кодом -1, т.е. последним элементом таблицы
+  values = np.empty(len(distinct) + 1, dtype=float)
+  errors = np.full(len(distinct) + 1, None, dtype=object)
+  for position, value in enumerate(distinct):
+    try:
+      values[position] = func(value)
+    except (ValueError, TypeError) as exc:
+      values[position] = np.nan
+      errors[position] = str(exc)
+  values[-1] = missing
+  return values[codes], errors[codes]
+
+
+def _passport_year(value: date | str) -> float:
+  if isinstance(value, date):
+    return value.year
+  if not value:
+    raise ValueError(PASSPORT_DATE_REQUIRED)
+  return datetime.strptime(value, "%Y-%m-%d").year
+
+
+def _age_years(passport_dates: pd.Series, reference_date: date | None) -> tuple[np.ndarray, np.ndarray]:
+  """Возраст паспорта в годах и тексты ошибок разбора даты по строкам."""
+  years, errors = _map_distinct(passport_dates, _passport_year, np.nan)
+  errors[np.isnan(years) & np.equal(errors, None)] = PASSPORT_DATE_REQUIRED
+  today = reference_date or datetime.now().date()
+  return np.maximum(0, today.year - np.nan_to_num(years, nan=today.year)).astype(np.int64), errors
+
+
+def _priorities(condition: np.ndarray, age_years: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+  priority_score = (6 - condition) * 3 + age_years
+  priority_category = np.select(
+    [priority_score >= 12, priority_score >= 6], ["high", "medium"], default="low"
+  ).astype(object)
+  return priority_score, priority_category
+
+
+def _marker_colors(condition: np.ndarray) -> np.ndarray:
+  return np.array([marker_color_for_condition(value) for value in range(6)], dtype=object)[condition]
+
+
+def _blank(series: pd.Series) -> np.ndarray:
+  return (series.isna() | series.eq("")).to_numpy(dtype=bool)
+
+
+def _levels(series: pd.Series) -> np.ndarray:
+  return _map_distinct(series, normalize_level, normalize_level(None))[0]
+
+
+def _optional_float(value: Any) -> float:
+  return np.nan if value == "" else float(value)
+
+
+def _fish_absent(value: Any) -> float:
+  return float(not value or "нет" in value.lower())
+
+
+def compute_conditions_batch(
+  columns: ConditionColumns,
+  *,
+  weights: ConditionWeights = DEFAULT_WEIGHTS,
+  thresholds: ConditionThresholds = DEFAULT_THRESHOLDS,
+  reference_date: date | None = None,
+) -> ConditionBatch:
+  """
+  Пакетный вариант :func:`compute_technical_condition` + :func:`calculate_priority_score`.
+
+  :param columns: DataFrame или словарь колонок (ключи как в :class:`TechnicalRow`); отсутствующая колонка — пустая
+  :param weights: набор весов для каждого фактора
+  :param thresholds: пороги перехода категорий
+  :param reference_date: дата, относительно которой считается возраст паспорта (для тестов)
+
+  Даты и текстовые уровни разбираются один раз на каждое различное значение, остальное
+  считается векторно. Для строк из CSV (строки, числа, None, "") результат совпадает со
+  скалярными функциями; NaN, как и в pandas, считается пустым значением.
+  """
+  size = _size(columns)
+
+  age_years, passport_errors = _age_years(_column(columns, "passport_date", size), reference_date)
+  age_component = np.minimum(age_years / 30, 1)
+
+  depth_column = _column(columns, "depth_max_m", size)
+  depth, depth_errors = _map_distinct(depth_column, _optional_float, np.nan)
+  depth_component = np.where(_blank(depth_column), 0.5, 1 - np.minimum(depth / 20, 1))
+
+  vegetation_component = (
+    0.6 * _levels(_column(columns, "vegetation_surface", size))
+    + 0.4 * _levels(_column(columns, "vegetation_underwater", size))
+  )
+  phytoplankton_component = _levels(_column(columns, "phytoplankton_level", size))
+
+  productivity_column = _column(columns, "fish_productivity", size)
+  productivity, productivity_errors = _map_distinct(productivity_column, _optional_float, np.nan)
+  fish_absent = _map_distinct(_column(columns, "fish_presence", size), _fish_absent, 1.0)[0].astype(bool)
+  fish_component = np.select(
+    [fish_absent, _blank(productivity_column), productivity >= 60, productivity >= 40, productivity >= 20],
+    [1.0, 0.5, 0.0, 0.33, 0.66],
+    default=1.0,
+  )
+
+  score = (
+    weights.age * age_component
+    + weights.depth * depth_component
+    + weights.vegetation * vegetation_component
+    + weights.phytoplankton * phytoplankton_component
+    + weights.fish * fish_component
+  )
+  condition = np.select(
+    [score < thresholds.very_good, score < thresholds.good, score < thresholds.satisfactory, score < thresholds.bad],
+    [1, 2, 3, 4],
+    default=5,
+  ).astype(np.int64)
+
+  priority_score, priority_category = _priorities(condition, age_years)
+  marker_color = _marker_colors(condition)
+
+  # та же очерёдность проверок, что в скалярной функции: дата, глубина, продуктивность
+  errors = productivity_errors.copy()
+  errors[np.not_equal(depth_errors, None)] = depth_errors[np.not_equal(depth_errors, None)]
+  errors[np.not_equal(passport_errors, None)] = passport_errors[np.not_equal(passport_errors, None)]
+  return ConditionBatch(condition, priority_score, priority_category, marker_color, errors)
+
+
+def compute_priorities_batch(
+  columns: ConditionColumns,
+  *,
+  reference_date: date | None = None,
+) -> ConditionBatch:
+  """
+  Пакетный :func:`calculate_priority_score` для строк с уже известным состоянием.
+
+  :param columns: колонки ``passport_date`` и ``technical_condition`` (1–5)
+  :param reference_date: дата, относительно которой считается возраст паспорта (для тестов)
+
+  Для метрик, входы которых не сохранены: состояние остаётся прежним, приоритет и цвет маркера
+  пересчитываются.
+  """
+  size = _size(columns)
+  age_years, errors = _age_years(_column(columns, "passport_date", size), reference_date)
+  known = pd.to_numeric(_column(columns, "technical_condition", size), errors="coerce").to_numpy(dtype=float)
+  errors[np.isnan(known) & np.equal(errors, None)] = TECHNICAL_CONDITION_REQUIRED
+  condition = np.nan_to_num(known, nan=5).astype(np.int64)
+  priority_score, priority_category = _priorities(condition, age_years)
+  return ConditionBatch(condition, priority_score, priority_category, _marker_colors(condition), errors)
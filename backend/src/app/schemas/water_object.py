@@ -3,9 +3,12 @@ from typing import Literal
 
 from pydantic import BaseModel, Field, HttpUrl
 
+from app.domain.geo import BoundingBox
+
 ResourceType = Literal["lake", "canal", "reservoir"]
 WaterType = Literal["fresh", "non_fresh"]
 SortDirection = Literal["asc", "desc"]
+CountMode = Literal["exact", "planned", "estimated"]
 
 
 class WaterObjectCreate(BaseModel):
@@ -32,6 +35,54 @@ class WaterObjectResponse(WaterObjectCreate):
   marker_color: str | None = None
 
 
+WATER_OBJECT_FIELDS = tuple(WaterObjectResponse.model_fields)
+
+# OpenAPI description of list responses trimmed by ``fields=``; the full model stays the schema
+PROJECTION_RESPONSE = {
+  "description": "Successful Response. With `fields=` every item carries only `id` and the requested fields."
+}
+
+
+class WaterObjectSearchResult(BaseModel):
+  id: str
+  name: str
+  region: str
+  resource_type: ResourceType
+  water_type: WaterType
+  latitude: float
+  longitude: float
+  score: float
+
+
+class WaterObjectNearestResult(WaterObjectResponse):
+  distance_km: float
+
+
+def parse_fields(value: str | None, allowed: tuple[str, ...]) -> tuple[str, ...] | None:
+  """Parse a comma-separated ``fields=`` value; ``id`` is always returned first."""
+  if not value:
+    return None
+  requested = [name.strip() for name in value.split(",") if name.strip()]
+  unknown = [name for name in requested if name not in allowed]
+  if unknown:
+    raise ValueError(f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(allowed)}")
+  return tuple(dict.fromkeys(["id", *requested]))
+
+
+def parse_bbox(value: str | None) -> BoundingBox | None:
+  """Parse ``bbox=west,south,east,north`` in degrees."""
+  if not value:
+    return None
+  try:
+    bbox = BoundingBox(*(float(part) for part in value.split(",")))
+  except (TypeError, ValueError):
+    raise ValueError("bbox must be west,south,east,north in degrees") from None
+  longitudes_valid = -180 <= bbox.west <= 180 and -180 <= bbox.east <= 180
+  if not (-90 <= bbox.south <= bbox.north <= 90 and longitudes_valid):
+    raise ValueError("bbox is outside of -180..180 longitude / -90..90 latitude")
+  return bbox
+
+
 class WaterObjectQuery(BaseModel):
   region: str | None = None
   resource_type: ResourceType | None = None
@@ -42,9 +93,14 @@ class WaterObjectQuery(BaseModel):
   priority: int | None = None
   passport_date_from: date | None = None
   passport_date_to: date | None = None
+  bbox: BoundingBox | None = None
+  zoom: int | None = Field(default=None, ge=0, le=22)  # keeps one object per on-screen cell of the bbox
   sort_by: Literal[
     "name", "region", "priority", "technical_condition", "passport_date", "resource_type", "water_type"
   ] = "priority"
   sort_dir: SortDirection = "desc"
   limit: int = Field(default=50, ge=1, le=200)
-  offset: int = Field(default=0, ge=0)
+  offset: int = Field(default=0, ge=0)  # compatibility paging; ignored when cursor is set
+  cursor: str | None = None
+  count: CountMode | None = None
+  fields: tuple[str, ...] | None = None  # view columns to fetch; None fetches full objects
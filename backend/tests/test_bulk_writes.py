@@ -0,0 +1,130 @@
+from datetime import date
+from pathlib import Path
+import asyncio
+import sys
+
+PROJECT_SRC = Path(__file__).resolve().parents[1] / "src"
+if str(PROJECT_SRC) not in sys.path:
+  sys.path.insert(0, str(PROJECT_SRC))
+
+from postgrest import APIError  # noqa: E402
+
+from app.domain.bulk import ChunkError  # noqa: E402
+from app.infrastructure.supabase.computed_metrics import ComputedMetricsRepositorySupabase  # noqa: E402
+from app.infrastructure.supabase.water_objects import WaterObjectRepositorySupabase  # noqa: E402
+from app.interfaces.api.v1.water_objects import (  # noqa: E402
+  CSV_SCHEMA,
+  _ImportReport,
+  _prepare_rows,
+  _write_batch,
+)
+from app.schemas.water_object import WaterObjectCreate  # noqa: E402
+
+
+def _payload(name: str, condition: int = 3) -> WaterObjectCreate:
+  return WaterObjectCreate(
+    name=name,
+    region="Алматинская",
+    resource_type="lake",
+    water_type="fresh",
+    fauna=True,
+    passport_date=date(2015, 1, 1),
+    technical_condition=condition,
+    latitude=43.0,
+    longitude=76.0,
+  )
+
+
+class _Response:
+  def __init__(self, data):
+    self.data = data
+
+
+class _Client:
+  """PostgREST-клиент в памяти: отвечает строками в обратном порядке и умеет «терять» строки.
+
+  ``rejected`` — имена, из-за которых отклоняется весь чанк; ``dropped`` — имена, которые
+  записываются, но не возвращаются в ответе.
+  """
+
+  def __init__(self, *, rejected=(), dropped=()):
+    self.rejected = set(rejected)
+    self.dropped = set(dropped)
+    self.objects: list[dict] = []
+    self.metrics: dict[str, dict] = {}
+    self._upsert: list[dict] | None = None
+
+  async def insert_many(self, table, rows):
+    if any(row["name"] in self.rejected for row in rows):
+      raise APIError({"code": "23514", "message": "check constraint violated"})
+    self.objects.extend(rows)
+    return [row for row in reversed(rows) if row["name"] not in self.dropped]
+
+  def table(self, name):
+    return self
+
+  def upsert(self, rows, on_conflict):
+    self._upsert = rows
+    return self
+
+  async def execute(self, query):
+    rows, self._upsert = self._upsert, None
+    if any(row["object_id"] in self.rejected for row in rows):
+      raise APIError({"code": "23503", "message": "foreign key violated"})
+    for row in rows:
+      self.metrics[row["object_id"]] = row
+    return _Response(rows)
+
+
+def test_create_many_realigns_echoed_rows_and_reports_failed_chunks():
+  client = _Client(rejected={"Озеро 3"}, dropped={"Озеро 1"})
+  repo = WaterObjectRepositorySupabase(client)
+  payloads = [_payload(f"Озеро {index}") for index in range(5)]
+  result = asyncio.run(repo.create_many(payloads, chunk_size=2))
+
+  assert result.errors == [ChunkError(start=2, size=2, error=result.errors[0].error)]
+  assert "check constraint" in result.errors[0].error
+  # «Озеро 1» записано, но не вернулось — у него нет позиции, остальные сопоставлены по id
+  assert result.positions == [0, 4]
+  assert [obj.name for obj in result.items] == ["Озеро 0", "Озеро 4"]
+  assert result.failed_indexes() == {2, 3}
+
+
+def test_upsert_many_keeps_going_after_a_failed_chunk():
+  client = _Client(rejected={"id-2"})
+  repo = ComputedMetricsRepositorySupabase(client)
+  payloads = [{"object_id": f"id-{index}", "technical_condition": 3} for index in range(5)]
+  result = asyncio.run(repo.upsert_many(payloads, chunk_size=2))
+
+  assert [(error.start, error.size) for error in result.errors] == [(2, 2)]
+  assert [row["object_id"] for row in result.items] == ["id-0", "id-1", "id-4"]
+  assert set(client.metrics) == {"id-0", "id-1", "id-4"}
+
+
+HEADER = ["name", "region", "resource_type", "water_type", "fauna", "passport_date", "latitude", "longitude",
+          "depth_max_m"]
+
+
+def test_import_writes_metrics_for_the_object_each_row_created():
+  rows = [
+    ["Озеро 0", "Абай", "lake", "fresh", "true", "2015-01-01", "43", "76", "2"],
+    ["Озеро 1", "Абай", "lake", "fresh", "true", "2015-01-01", "43", "76", "25"],
+    ["Озеро 2", "Абай", "lake", "fresh", "true", "2015-01-01", "43", "76", "8"],
+  ]
+  client = _Client(dropped={"Озеро 1"})
+  plan = CSV_SCHEMA.compile(HEADER)
+  report = _ImportReport(plan=plan, keep_items=True)
+  pending = _prepare_rows(list(enumerate(rows, start=1)), report)
+  assert report.skipped == 0
+
+  repo, metrics_repo = WaterObjectRepositorySupabase(client), ComputedMetricsRepositorySupabase(client)
+  asyncio.run(_write_batch(pending, repo, metrics_repo, report, chunk_size=10))
+
+  ids = {row["name"]: row["id"] for row in client.objects}
+  # метрики каждой строки легли на её собственный объект, а не сдвинулись на соседний
+  assert client.metrics[ids["Озеро 2"]]["depth_max_m"] == 8.0
+  assert client.metrics[ids["Озеро 0"]]["depth_max_m"] == 2.0
+  assert ids["Озеро 1"] not in client.metrics
+  assert report.inserted == 2 and report.skipped == 1
+  assert report.skipped_details[0]["row"] == 2
+  assert [item.name for item in report.items] == ["Озеро 0", "Озеро 2"]
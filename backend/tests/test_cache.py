@@ -0,0 +1,63 @@
+from pathlib import Path
+import sys
+
+PROJECT_SRC = Path(__file__).resolve().parents[1] / "src"
+if str(PROJECT_SRC) not in sys.path:
+  sys.path.insert(0, str(PROJECT_SRC))
+
+from app.core.ttl_cache import TTLCache  # noqa: E402
+from app.infrastructure.cache import CatalogCache  # noqa: E402
+
+
+class FakeClock:
+  def __init__(self):
+    self.now = 0.0
+
+  def __call__(self) -> float:
+    return self.now
+
+
+def test_ttl_cache_evicts_least_recently_used():
+  cache = TTLCache(max_entries=2, ttl_seconds=60)
+  cache.set('a', 1)
+  cache.set('b', 2)
+  assert cache.get('a') == 1  # 'a' становится самым свежим
+  cache.set('c', 3)
+
+  assert cache.get('b') is None
+  assert cache.get('a') == 1
+  assert cache.get('c') == 3
+  assert cache.stats()['evictions'] == 1
+
+
+def test_ttl_cache_expires_entries():
+  clock = FakeClock()
+  cache = TTLCache(max_entries=10, ttl_seconds=5, clock=clock)
+  cache.set('a', 1)
+  clock.now = 4.9
+  assert cache.get('a') == 1
+  clock.now = 5.0
+  assert cache.get('a') is None
+
+  stats = cache.stats()
+  assert stats['hits'] == 1
+  assert stats['misses'] == 1
+  assert stats['expirations'] == 1
+  assert stats['size'] == 0
+
+
+def test_catalog_cache_invalidation_is_per_object_for_ids_and_global_for_pages():
+  cache = CatalogCache(max_entries=16, ttl_seconds=60)
+  cache.objects.set('a', 'obj-a')
+  cache.objects.set('b', 'obj-b')
+  cache.metrics.set('a', {'object_id': 'a'})
+  cache.pages.set('q', ['obj-a', 'obj-b'])
+  generation = cache.generation
+
+  cache.invalidate_metrics(['a'])
+
+  assert cache.metrics.get('a') is None
+  assert cache.objects.get('a') is None
+  assert cache.objects.get('b') == 'obj-b'
+  assert cache.pages.get('q') is None
+  assert cache.generation > generation
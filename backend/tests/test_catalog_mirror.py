@@ -0,0 +1,204 @@
+from datetime import date
+from pathlib import Path
+import asyncio
+import sys
+
+import pytest
+
+PROJECT_SRC = Path(__file__).resolve().parents[1] / "src"
+if str(PROJECT_SRC) not in sys.path:
+  sys.path.insert(0, str(PROJECT_SRC))
+
+from app.domain.geo import BoundingBox  # noqa: E402
+from app.domain.water_object import WaterObject  # noqa: E402
+from app.infrastructure.catalog_mirror import CatalogMirror  # noqa: E402
+from app.infrastructure.catalog_query import object_matches, page_objects  # noqa: E402
+from app.infrastructure.spatial_index import SpatialGrid, thin_for_zoom  # noqa: E402
+from app.infrastructure.supabase.water_objects import WaterObjectRepositorySupabase  # noqa: E402
+from app.schemas.water_object import WaterObjectQuery, parse_bbox  # noqa: E402
+
+
+def _object(index: int, latitude: float, longitude: float, priority: int | None = 2) -> WaterObject:
+  return WaterObject(
+    id=f"id-{index:03d}",
+    name=f"Озеро {index}",
+    region="Алматинская",
+    resource_type="lake",
+    water_type="fresh",
+    fauna=True,
+    passport_date=date(2015, 1, 1),
+    technical_condition=3,
+    latitude=latitude,
+    longitude=longitude,
+    pdf_url=None,
+    priority=priority,
+  )
+
+
+# сетка 10x10 объектов с шагом 0.1° вокруг Алматы
+GRID = [
+  _object(row * 10 + column, 43.0 + row * 0.1, 76.0 + column * 0.1)
+  for row in range(10)
+  for column in range(10)
+]
+
+
+def _mirror(objects, **options) -> CatalogMirror:
+  async def load():
+    yield list(objects)
+
+  mirror = CatalogMirror(load, **options)
+  asyncio.run(mirror.ready())
+  return mirror
+
+
+def test_parse_bbox_validates_order_and_ranges():
+  assert parse_bbox("76,43,77.5,44") == BoundingBox(76.0, 43.0, 77.5, 44.0)
+  assert parse_bbox(None) is None
+  for value in ("76,43,77", "a,b,c,d", "76,44,77,43", "76,43,190,44"):
+    with pytest.raises(ValueError):
+      parse_bbox(value)
+
+
+def test_grid_returns_only_objects_inside_the_box():
+  grid = SpatialGrid(cell_degrees=0.25)
+  grid.reset(GRID)
+  bbox = BoundingBox(76.15, 43.25, 76.45, 43.55)
+  expected = {obj.id for obj in GRID if bbox.contains(obj.latitude, obj.longitude)}
+  assert {obj.id for obj in grid.within(bbox)} == expected
+  assert len(expected) == 9
+  # окно больше занятых ячеек — тот же результат
+  assert len(grid.within(BoundingBox(-180, -90, 180, 90))) == len(GRID)
+
+
+def test_grid_moves_changed_objects_and_crosses_the_antimeridian():
+  grid = SpatialGrid(cell_degrees=1.0)
+  grid.reset([_object(1, 60.0, 179.5), _object(2, 60.0, -179.5), _object(3, 60.0, 0.0)])
+  crossing = BoundingBox(179.0, 59.0, -179.0, 61.0)
+  assert {obj.id for obj in grid.within(crossing)} == {"id-001", "id-002"}
+
+  grid.add(_object(3, 60.0, 179.9))
+  assert len(grid.within(crossing)) == 3
+  assert grid.within(BoundingBox(-1.0, 59.0, 1.0, 61.0)) == []
+  assert grid.stats()["objects"] == 3
+
+
+def test_zoom_keeps_the_most_important_object_per_cell():
+  near = [_object(1, 43.001, 76.001, priority=1), _object(2, 43.002, 76.002, priority=3)]
+  assert [obj.id for obj in thin_for_zoom(near, zoom=10)] == ["id-002"]
+  # на крупном масштабе оба объекта видны отдельно
+  assert len(thin_for_zoom(near, zoom=22)) == 2
+  assert len(thin_for_zoom(GRID, zoom=3)) < len(GRID)
+
+
+def test_viewport_pages_follow_sql_order_and_cursor():
+  objects = [*GRID[:5], _object(50, 43.01, 76.01, priority=None)]
+  base = {"bbox": BoundingBox(75.0, 42.0, 78.0, 45.0), "sort_by": "priority", "sort_dir": "desc"}
+  first = page_objects(objects, WaterObjectQuery(**base, limit=3, count="exact"))
+  # null при сортировке по убыванию идёт первым, затем id
+  assert [obj.id for obj in first.items] == ["id-050", "id-000", "id-001"]
+  assert first.total == 6
+  second = page_objects(objects, WaterObjectQuery(**base, limit=3, cursor=first.next_cursor))
+  assert [obj.id for obj in second.items] == ["id-002", "id-003", "id-004"]
+
+  query = WaterObjectQuery(**base, limit=2, fields=("id", "latitude"))
+  projected = page_objects(objects, query)
+  assert projected.items == [
+    {"id": "id-050", "latitude": 43.01},
+    {"id": "id-000", "latitude": 43.0},
+  ]
+
+
+def test_mirror_applies_writes_and_metrics():
+  mirror = _mirror(GRID[:3])
+  mirror.add(_object(90, 43.0, 76.0))
+  assert [obj.id for obj, _ in mirror.search.search("озеро 90")] == ["id-090"]
+  assert len(mirror.spatial.within(BoundingBox(75.9, 42.9, 76.05, 43.05))) == 2
+
+  mirror.update_metrics({"object_id": "id-090", "technical_condition": 5, "priority_score": 17})
+  assert mirror.get("id-090").technical_condition == 5
+  assert mirror.get("id-090").priority_score == 17
+  mirror.update_metrics({"object_id": "missing", "technical_condition": 5})
+  assert len(mirror) == 4
+
+
+def test_metrics_category_sets_the_effective_priority_like_the_view():
+  mirror = _mirror(GRID[:3])
+  mirror.update_metrics({"object_id": "id-001", "priority_category": "high", "priority_score": 40})
+  updated = mirror.get("id-001")
+  assert updated.priority == 3
+  assert object_matches(updated, WaterObjectQuery(priority=3))
+  assert not object_matches(updated, WaterObjectQuery(priority=2))
+  # без категории остаётся базовый приоритет объекта
+  mirror.update_metrics({"object_id": "id-002", "technical_condition": 4})
+  assert mirror.get("id-002").priority == 2
+
+
+class _UpdateClient:
+  """Минимальный клиент PostgREST для update().eq()."""
+
+  def __init__(self):
+    self.updates = []
+
+  def table(self, name):
+    return self
+
+  def update(self, values):
+    self.updates.append(values)
+    return self
+
+  def eq(self, column, value):
+    return self
+
+  async def execute(self, query):
+    return None
+
+
+def test_uploaded_passport_url_reaches_the_mirror():
+  mirror = _mirror(GRID[:3])
+  repo = WaterObjectRepositorySupabase(_UpdateClient(), mirror=mirror)
+  asyncio.run(repo.update_pdf_url("id-001", "https://storage/passports/id-001.pdf"))
+  assert mirror.get("id-001").pdf_url == "https://storage/passports/id-001.pdf"
+  bbox = BoundingBox(75.0, 42.0, 78.0, 45.0)
+  page = asyncio.run(repo.list_page(WaterObjectQuery(bbox=bbox, fields=("id", "pdf_url"))))
+  assert {"id": "id-001", "pdf_url": "https://storage/passports/id-001.pdf"} in page.items
+
+
+def test_failed_load_is_reported_and_retried():
+  attempts = []
+
+  async def load():
+    attempts.append(1)
+    if len(attempts) == 1:
+      raise ConnectionError("database is down")
+    yield GRID[:2]
+
+  mirror = CatalogMirror(load)
+
+  async def scenario():
+    with pytest.raises(ConnectionError):
+      await mirror.ready()
+    assert not mirror.current()
+    await mirror.ready()
+
+  asyncio.run(scenario())
+  assert len(attempts) == 2 and len(mirror) == 2
+
+
+def test_stale_mirror_reloads_in_the_background():
+  now = [0.0]
+  catalog = list(GRID[:2])
+  mirror = _mirror(catalog, refresh_seconds=60, clock=lambda: now[0])
+  catalog.append(_object(99, 43.5, 76.5))  # записан другим процессом
+
+  async def scenario():
+    now[0] = 61
+    assert mirror.current()  # не ждёт перезагрузки
+    stale = mirror.get("id-099")
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    return stale, mirror.get("id-099")
+
+  stale, fresh = asyncio.run(scenario())
+  assert stale is None and fresh is not None
+  assert mirror.loads == 2
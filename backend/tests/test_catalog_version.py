@@ -0,0 +1,88 @@
+from pathlib import Path
+import sys
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+PROJECT_SRC = Path(__file__).resolve().parents[1] / "src"
+if str(PROJECT_SRC) not in sys.path:
+  sys.path.insert(0, str(PROJECT_SRC))
+
+from app.core.deps import catalog_cache_headers, get_catalog_etag  # noqa: E402
+from app.infrastructure.catalog_version import CatalogVersion  # noqa: E402
+
+
+class FakeClock:
+  def __init__(self):
+    self.now = 1000.0
+
+  def __call__(self) -> float:
+    return self.now
+
+
+def test_etag_changes_with_writes_parameters_and_window():
+  clock = FakeClock()
+  version = CatalogVersion(60.0, clock=clock)
+  tag = version.etag("/api/v1/water-objects", ("limit", "50"))
+
+  assert tag.startswith('"') and tag.endswith('"')
+  assert version.etag("/api/v1/water-objects", ("limit", "50")) == tag
+  assert version.etag("/api/v1/water-objects", ("limit", "20")) != tag
+
+  version.bump()
+  after_write = version.etag("/api/v1/water-objects", ("limit", "50"))
+  assert after_write != tag
+
+  # окно ограничивает жизнь тега, даже если запись прошла в другом процессе
+  clock.now += 60
+  assert version.etag("/api/v1/water-objects", ("limit", "50")) != after_write
+
+
+def test_zero_window_ties_tags_to_writes_only():
+  clock = FakeClock()
+  version = CatalogVersion(0, clock=clock)
+  tag = version.etag("/maps")
+  clock.now += 10_000
+  assert version.etag("/maps") == tag
+
+
+def _client(version: CatalogVersion) -> tuple[TestClient, list[str]]:
+  app = FastAPI()
+  app.state.catalog_version = version
+  reads: list[str] = []
+
+  @app.get("/items")
+  async def items(etag: str = Depends(get_catalog_etag)):
+    reads.append(etag)  # стоит на месте запроса к базе
+    return {"ok": True}
+
+  return TestClient(app), reads
+
+
+def test_current_tag_answers_304_without_reading():
+  version = CatalogVersion(0)
+  client, reads = _client(version)
+
+  first = client.get("/items", params={"region": "Алматинская"})
+  assert first.status_code == 200
+  tag = reads[0]
+
+  cached = client.get("/items", params={"region": "Алматинская"}, headers={"If-None-Match": f'W/"x", {tag}'})
+  assert cached.status_code == 304
+  assert cached.headers["etag"] == tag
+  assert cached.headers["cache-control"] == catalog_cache_headers(tag)["Cache-Control"]
+  assert reads == [tag]
+  assert version.not_modified == 1
+
+
+def test_write_invalidates_tag():
+  version = CatalogVersion(0)
+  client, reads = _client(version)
+  client.get("/items", params={"a": "1", "b": "2"})
+  tag = reads[0]
+  assert client.get("/items?b=2&a=1", headers={"If-None-Match": tag}).status_code == 304
+
+  version.bump()
+  refreshed = client.get("/items?a=1&b=2", headers={"If-None-Match": tag})
+  assert refreshed.status_code == 200
+  assert reads[-1] != tag
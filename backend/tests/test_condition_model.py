@@ -1,13 +1,22 @@
 from datetime import date
 from pathlib import Path
+import random
 import sys
 
+import numpy as np
+import pandas as pd
+
 PROJECT_SRC = Path(__file__).resolve().parents[1] / "src"
 if str(PROJECT_SRC) not in sys.path:
   sys.path.insert(0, str(PROJECT_SRC))
 
 from app.models.condition_model import (  # noqa: E402
+  PASSPORT_DATE_REQUIRED,
+  ConditionThresholds,
+  ConditionWeights,
   calculate_priority_score,
+  compute_conditions_batch,
+  compute_priorities_batch,
   compute_technical_condition,
   fish_score,
   marker_color_for_condition,
@@ -62,3 +71,64 @@ def test_marker_color_for_condition_has_fallback():
   assert marker_color_for_condition(1).startswith('#')
   assert marker_color_for_condition(99) == '#94a3b8'
 
+
+
+def test_batch_matches_scalar_functions():
+  rng = random.Random(7)
+  choices = {
+    'passport_date': ['2010-01-01', '1990-06-30', '2024-1-5', '2030-01-01', '', None, '01.02.2010', '2010-02-30'],
+    'depth_max_m': [10, 0.5, '25', '3.7', '', None, 'глубоко', '-2', 'nan'],
+    'vegetation_surface': ['Слабо', 'средне', 'сильно', 'нет данных', '', None],
+    'vegetation_underwater': ['слабое', 'Сильное', None],
+    'phytoplankton_level': ['средний', 'сильный', '', None],
+    'fish_presence': ['сазан', 'нет', 'Нет рыбы', '', None],
+    'fish_productivity': [65, 45, '25', '5', '', None, 'много'],
+  }
+  weights = ConditionWeights(age=0.4, depth=0.1)
+  thresholds = ConditionThresholds(very_good=0.15, bad=0.7)
+  reference = date(2025, 1, 1)
+
+  # все колонки, затем случайные наборы без части колонок (в том числе без passport_date)
+  subsets = [list(choices)] + [rng.sample(list(choices), rng.randint(1, len(choices) - 1)) for _ in range(8)]
+  subsets.append(['depth_max_m'])
+  for keys in subsets:
+    rows = [{key: rng.choice(choices[key]) for key in keys} for _ in range(200)]
+    batch = compute_conditions_batch(
+      {key: [row[key] for row in rows] for key in keys},
+      weights=weights,
+      thresholds=thresholds,
+      reference_date=reference,
+    )
+    assert len(batch.errors) == len(rows)
+
+    for position, row in enumerate(rows):
+      try:
+        condition = compute_technical_condition(
+          row, weights=weights, thresholds=thresholds, reference_date=reference
+        )
+      except ValueError as exc:
+        assert batch.errors[position] == str(exc)
+        continue
+      assert batch.errors[position] is None
+      assert batch.technical_condition[position] == condition
+      score, category = calculate_priority_score(row.get('passport_date'), condition, reference_date=reference)
+      assert (batch.priority_score[position], batch.priority_category[position]) == (score, category)
+      assert batch.marker_color[position] == marker_color_for_condition(condition)
+
+
+def test_batch_accepts_dataframe_and_missing_columns():
+  frame = pd.DataFrame({'passport_date': ['2010-01-01', '2020-01-01'], 'depth_max_m': [10.0, np.nan]}, index=[5, 9])
+  batch = compute_conditions_batch(frame, reference_date=date(2025, 1, 1))
+  expected = [
+    compute_technical_condition({'passport_date': '2010-01-01', 'depth_max_m': 10.0}, reference_date=date(2025, 1, 1)),
+    compute_technical_condition({'passport_date': '2020-01-01'}, reference_date=date(2025, 1, 1)),
+  ]
+  assert batch.technical_condition.tolist() == expected
+  assert batch.valid.all()
+
+
+def test_batch_without_passport_dates_reports_every_row():
+  batch = compute_conditions_batch(pd.DataFrame({'depth_max_m': ['1', '2']}))
+  assert batch.errors.tolist() == [PASSPORT_DATE_REQUIRED] * 2
+  priorities = compute_priorities_batch({'technical_condition': [3]})
+  assert priorities.errors.tolist() == [PASSPORT_DATE_REQUIRED]
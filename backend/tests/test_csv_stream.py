@@ -0,0 +1,24 @@
+from pathlib import Path
+import io
+import sys
+
+PROJECT_SRC = Path(__file__).resolve().parents[1] / "src"
+if str(PROJECT_SRC) not in sys.path:
+  sys.path.insert(0, str(PROJECT_SRC))
+
+from app.interfaces.api.v1 import water_objects  # noqa: E402
+
+
+def test_utf8_is_detected_across_chunk_boundaries(monkeypatch):
+  # многобайтовые символы разрезаются границей чанка
+  monkeypatch.setattr(water_objects, "CSV_READ_CHUNK_BYTES", 3)
+  stream = io.BytesIO("name\nОзеро\n".encode("utf-8-sig"))
+  assert water_objects._detect_encoding(stream) == "utf-8-sig"
+  assert stream.tell() == 0
+
+
+def test_cp1251_fallback_and_multiline_rows():
+  stream = io.BytesIO('name,region\n"Озеро\nБольшое",Абай\n'.encode("cp1251"))
+  headers, rows = water_objects._open_csv(stream)
+  assert headers == ["name", "region"]
+  assert water_objects._next_rows(enumerate(rows, start=1), 10) == [(1, ["Озеро\nБольшое", "Абай"])]
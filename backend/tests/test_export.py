@@ -0,0 +1,155 @@
+from datetime import date
+from pathlib import Path
+import asyncio
+import csv
+import io
+import sys
+
+import orjson
+import pytest
+
+PROJECT_SRC = Path(__file__).resolve().parents[1] / "src"
+if str(PROJECT_SRC) not in sys.path:
+  sys.path.insert(0, str(PROJECT_SRC))
+
+from app.application.water_objects.use_cases import ExportWaterObjects  # noqa: E402
+from app.domain.water_object import WaterObject  # noqa: E402
+from app.infrastructure.export import (  # noqa: E402
+  encode_csv,
+  encode_ndjson,
+  encode_parquet,
+  export_row,
+  parquet_schema,
+)
+from app.interfaces.api.v1.water_objects import (  # noqa: E402
+  CANONICAL_COLUMNS,
+  CSV_SCHEMA,
+  _ImportReport,
+  _prepare_rows,
+)
+from app.models.condition_model import compute_technical_condition  # noqa: E402
+from app.schemas.water_object import WaterObjectQuery  # noqa: E402
+
+
+def _object(index: int, **overrides) -> WaterObject:
+  values = dict(
+    id=f"6f1c0d1e-0000-4000-8000-{index:012d}",
+    name=f"Озеро, №{index}",
+    region="Абай",
+    resource_type="lake",
+    water_type="fresh",
+    fauna=index % 2 == 0,
+    passport_date=date(2015, 3, index + 1),
+    technical_condition=3,
+    latitude=46.5,
+    longitude=74.25,
+    pdf_url=None,
+    priority=2,
+    priority_category="medium",
+    priority_score=24,
+    marker_color="#f4b000",
+  )
+  values.update(overrides)
+  return WaterObject(**values)
+
+
+CHUNKS = [[_object(0), _object(1)], [_object(2, priority_score=None, priority_category=None)]]
+
+
+async def _chunks():
+  for chunk in CHUNKS:
+    yield [export_row(obj, None) for obj in chunk]
+
+
+def _collect(body) -> list[bytes]:
+  async def scenario():
+    return [part async for part in body]
+
+  return asyncio.run(scenario())
+
+
+def test_csv_export_uses_the_import_layout():
+  parts = _collect(encode_csv(_chunks(), CANONICAL_COLUMNS))
+  # заголовок и по одной части на каждый прочитанный чанк
+  assert len(parts) == 1 + len(CHUNKS)
+
+  rows = list(csv.reader(io.StringIO(b"".join(parts).decode("utf-8-sig"))))
+  plan = CSV_SCHEMA.compile(rows[0])
+  assert not plan.missing and not plan.extra
+
+  first = plan.values(rows[1])
+  assert first["name"] == "Озеро, №0"
+  assert first["fauna"] == "true"
+  assert first["passport_date"] == "2015-03-01"
+  assert first["depth_max_m"] is None
+  assert len(rows) == 4
+
+
+def test_ndjson_export_carries_metrics():
+  lines = b"".join(_collect(encode_ndjson(_chunks()))).splitlines()
+  records = [orjson.loads(line) for line in lines]
+  assert [record["id"] for record in records] == [obj.id for chunk in CHUNKS for obj in chunk]
+  assert records[0]["priority_score"] == 24
+  assert records[2]["priority_category"] is None
+
+
+def test_parquet_export_writes_a_row_group_per_chunk():
+  pq = pytest.importorskip("pyarrow.parquet")
+  data = b"".join(_collect(encode_parquet(_chunks(), parquet_schema())))
+
+  parquet = pq.ParquetFile(io.BytesIO(data))
+  assert parquet.num_row_groups == len(CHUNKS)
+  rows = parquet.read().to_pylist()
+  assert rows[0]["passport_date"] == date(2015, 3, 1)
+  assert rows[2]["priority_score"] is None
+
+
+# входы модели, как их хранит computed_metrics после импорта
+INPUTS = [
+  {"depth_max_m": 2.0, "fish_presence": "нет", "phytoplankton_level": "сильно"},
+  {"depth_max_m": 15.0, "vegetation_surface": "слабо", "fish_presence": "есть", "fish_productivity": 70.0},
+  {},
+]
+
+
+class _Catalog:
+  def __init__(self, objects):
+    self.objects = objects
+
+  async def iter_chunks(self, query, *, chunk_size=1000):
+    for start in range(0, len(self.objects), chunk_size):
+      yield self.objects[start : start + chunk_size]
+
+
+class _Metrics:
+  def __init__(self, rows):
+    self.rows = rows
+    self.lookups = 0
+
+  async def get_by_object_ids(self, object_ids):
+    self.lookups += 1
+    return {object_id: self.rows[object_id] for object_id in object_ids if object_id in self.rows}
+
+
+def test_csv_export_imports_back_to_the_same_condition():
+  objects, metrics = [], {}
+  for index, inputs in enumerate(INPUTS):
+    obj = _object(index)
+    source = {"passport_date": obj.passport_date.isoformat(), **inputs}
+    obj = _object(index, technical_condition=compute_technical_condition(source))
+    objects.append(obj)
+    if inputs:
+      metrics[obj.id] = {"object_id": obj.id, **inputs}
+  metrics_repo = _Metrics(metrics)
+  chunks = ExportWaterObjects(_Catalog(objects), metrics_repo, chunk_size=2)(WaterObjectQuery())
+  data = b"".join(_collect(encode_csv(chunks, CANONICAL_COLUMNS))).decode("utf-8-sig")
+  assert metrics_repo.lookups == 2  # один запрос метрик на чанк
+
+  header, *rows = list(csv.reader(io.StringIO(data)))
+  plan = CSV_SCHEMA.compile(header)
+  assert plan.values(rows[0])["depth_max_m"] == "2.0"
+  report = _ImportReport(plan=plan, keep_items=False)
+  pending = _prepare_rows(list(enumerate(rows, start=1)), report)
+  assert report.skipped == 0
+  assert [item[2].technical_condition for item in pending] == [obj.technical_condition for obj in objects]
+  assert [item[6]["fish_presence"] for item in pending] == ["нет", "есть", None]
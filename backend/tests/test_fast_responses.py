@@ -0,0 +1,62 @@
+from dataclasses import asdict
+from datetime import date
+from pathlib import Path
+import sys
+
+import orjson
+
+PROJECT_SRC = Path(__file__).resolve().parents[1] / "src"
+if str(PROJECT_SRC) not in sys.path:
+  sys.path.insert(0, str(PROJECT_SRC))
+
+from app.domain.water_object import WaterObject  # noqa: E402
+from app.infrastructure.records import water_object_to_row  # noqa: E402
+from app.interfaces.maps import MAP_FIELDS, MapObject  # noqa: E402
+from app.schemas.water_object import WaterObjectResponse  # noqa: E402
+
+OBJECTS = [
+  WaterObject(
+    id="6f1c0d1e-0000-4000-8000-000000000001",
+    name="Балхаш",
+    region="Карагандинская",
+    resource_type="lake",
+    water_type="non_fresh",
+    fauna=True,
+    passport_date=date(2010, 1, 1),
+    technical_condition=3,
+    latitude=46.0,
+    longitude=74.25,
+    pdf_url="https://example.org/p.pdf",
+    priority=2,
+    priority_category="medium",
+    priority_score=24,
+    marker_color="#f4b000",
+  ),
+  WaterObject(
+    id="6f1c0d1e-0000-4000-8000-000000000002",
+    name="Канал",
+    region="Алматинская",
+    resource_type="canal",
+    water_type="fresh",
+    fauna=False,
+    passport_date=date(2024, 5, 17),
+    technical_condition=1,
+    latitude=43.0,
+    longitude=-1.5,
+    pdf_url=None,
+    priority=None,
+  ),
+]
+
+
+def test_list_rows_serialize_like_the_validated_model():
+  for obj in OBJECTS:
+    validated = WaterObjectResponse.model_validate(asdict(obj)).model_dump(mode="json")
+    assert orjson.loads(orjson.dumps(water_object_to_row(obj))) == validated
+
+
+def test_map_rows_serialize_like_the_validated_model():
+  for obj in OBJECTS:
+    data = water_object_to_row(obj)
+    fast = {name: build(data) for name, (_, build) in MAP_FIELDS.items()}
+    assert orjson.loads(orjson.dumps(fast)) == MapObject(**fast).model_dump(mode="json")
@@ -0,0 +1,45 @@
+from pathlib import Path
+import sys
+
+import pandas as pd
+
+PROJECT_SRC = Path(__file__).resolve().parents[1] / "src"
+if str(PROJECT_SRC) not in sys.path:
+  sys.path.insert(0, str(PROJECT_SRC))
+
+from app.infrastructure.ingestion import IngestionSchema, Vocabulary  # noqa: E402
+
+SCHEMA = IngestionSchema({"name": ["name"], "latitude": ["latitude", "lat"], "region": ["region"]})
+
+
+def test_plan_resolves_aliases_once_and_prefers_earlier_alias():
+  plan = SCHEMA.compile(["LAT", " Name ", "Latitude", "comment"])
+  assert plan.sources == {"name": (1,), "latitude": (2, 0), "region": ()}
+  assert plan.missing == ("region",)
+  assert plan.extra == ("comment",)
+  # пустое значение основного алиаса — берём следующий
+  assert plan.values(["43.1", "Балхаш", ""]) == {"name": "Балхаш", "latitude": "43.1", "region": None}
+  assert plan.record(["43.1", "Балхаш"]) == {"LAT": "43.1", " Name ": "Балхаш"}
+
+
+def test_plan_renames_frame_columns_in_place():
+  frame = pd.DataFrame({"Name": ["a"], "lat": [1.0], "region": ["r"]})
+  plan = SCHEMA.compile(list(frame.columns))
+  assert plan.rename(frame) is frame
+  assert list(frame.columns) == ["name", "latitude", "region"]
+
+
+def test_vocabulary_resolves_each_raw_value_once():
+  calls = []
+
+  def fallback(value):
+    calls.append(value)
+    return "lake" if "озер" in value else None
+
+  vocabulary = Vocabulary({"Озеро": "lake", "нет": False}, fallback)
+  assert vocabulary(" ОЗЕРО ") == "lake"
+  assert vocabulary("Нет") is False
+  assert [vocabulary("Горное озеро") for _ in range(3)] == ["lake"] * 3
+  assert vocabulary("пруд") is None and vocabulary("пруд") is None
+  assert vocabulary(None) is None
+  assert calls == ["горное озеро", "пруд"]
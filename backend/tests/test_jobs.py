@@ -0,0 +1,178 @@
+from pathlib import Path
+from types import SimpleNamespace
+import asyncio
+import sys
+
+import pytest
+
+PROJECT_SRC = Path(__file__).resolve().parents[1] / "src"
+if str(PROJECT_SRC) not in sys.path:
+  sys.path.insert(0, str(PROJECT_SRC))
+
+from app.core.deps import job_repositories  # noqa: E402
+from app.infrastructure.jobs import JobManager, JobQueueFull  # noqa: E402
+from app.infrastructure.replicas import ReplicaRouter  # noqa: E402
+from app.infrastructure.scheduler import PeriodicJob  # noqa: E402
+
+
+def test_job_reports_progress_and_result():
+  async def scenario():
+    jobs = JobManager(workers=1)
+    step = asyncio.Event()
+
+    async def run(job):
+      job.report({"rows": 1}, [{"row": 1, "reason": "bad"}])
+      await step.wait()
+      return {"inserted": 1}
+
+    job = jobs.submit("import-csv", run)
+    assert job.status == "queued"
+    await asyncio.sleep(0)
+    assert jobs.get(job.id).snapshot()["progress"] == {"rows": 1}
+    assert job.status == "running"
+    step.set()
+    await asyncio.sleep(0)
+    snapshot = job.snapshot()
+    await jobs.close()
+    return snapshot
+
+  snapshot = asyncio.run(scenario())
+  assert snapshot["status"] == "succeeded"
+  assert snapshot["result"] == {"inserted": 1}
+  assert snapshot["errors"] == [{"row": 1, "reason": "bad"}]
+
+
+def test_failure_is_recorded_and_worker_keeps_going():
+  async def scenario():
+    jobs = JobManager(workers=1)
+
+    async def broken(job):
+      raise ValueError("boom")
+
+    async def fine(job):
+      return {}
+
+    failed = jobs.submit("import-csv", broken)
+    succeeded = jobs.submit("import-csv", fine)
+    for _ in range(3):
+      await asyncio.sleep(0)
+    await jobs.close()
+    return failed, succeeded, jobs.stats()
+
+  failed, succeeded, stats = asyncio.run(scenario())
+  assert (failed.status, failed.error) == ("failed", "boom")
+  assert succeeded.status == "succeeded"
+  assert (stats["failed"], stats["succeeded"]) == (1, 1)
+
+
+def test_full_queue_rejects_and_idempotency_key_reuses_job():
+  async def scenario():
+    jobs = JobManager(workers=1, max_queued=1)
+    blocker = asyncio.Event()
+
+    async def run(job):
+      await blocker.wait()
+      return {}
+
+    first = jobs.submit("passports-zip", run, idempotency_key="upload-1")
+    await asyncio.sleep(0)  # воркер забрал первую задачу, очередь снова пуста
+    jobs.submit("passports-zip", run)
+    # повтор клиента с тем же ключом не ставит задачу заново, даже при полной очереди
+    assert jobs.submit("passports-zip", run, idempotency_key="upload-1") is first
+    with pytest.raises(JobQueueFull):
+      jobs.submit("passports-zip", run)
+    stats = jobs.stats()
+    await jobs.close()
+    return first, stats
+
+  first, stats = asyncio.run(scenario())
+  assert first.status == "failed" and first.error == "interrupted by shutdown"
+  assert (stats["submitted"], stats["rejected"], stats["queued"]) == (2, 1, 1)
+
+
+def test_idempotency_key_is_scoped_by_kind_and_owner():
+  async def scenario():
+    jobs = JobManager(workers=1)
+
+    async def run(job):
+      return {}
+
+    first = jobs.submit("import-csv", run, idempotency_key="k", owner="alice")
+    same = jobs.submit("import-csv", run, idempotency_key="k", owner="alice")
+    # тот же ключ для другого эндпоинта или от другого пользователя — отдельная задача
+    other_kind = jobs.submit("passports-zip", run, idempotency_key="k", owner="alice")
+    other_owner = jobs.submit("import-csv", run, idempotency_key="k", owner="bob")
+    anonymous = jobs.submit("import-csv", run, idempotency_key="k")
+    await jobs.close()
+    return first, same, [other_kind, other_owner, anonymous]
+
+  first, same, others = asyncio.run(scenario())
+  assert same is first
+  assert len({job.id for job in [first, *others]}) == 4
+
+
+def test_only_finished_jobs_are_dropped_beyond_retention():
+  async def scenario():
+    jobs = JobManager(workers=1, max_retained=2)
+
+    async def run(job):
+      return {}
+
+    old = jobs.submit("import-csv", run, idempotency_key="old")
+    await asyncio.sleep(0)
+    newer = [jobs.submit("import-csv", run) for _ in range(2)]
+    await jobs.close()
+    return jobs, old, newer
+
+  jobs, old, newer = asyncio.run(scenario())
+  assert jobs.get(old.id) is None
+  assert jobs.find("import-csv", "old") is None
+  assert [jobs.get(job.id) for job in newer] == newer
+
+
+def test_periodic_job_skips_ticks_while_the_previous_run_is_unfinished():
+  async def scenario():
+    jobs = JobManager(workers=1)
+    step = asyncio.Event()
+    runs = []
+
+    async def run(job):
+      runs.append(job.id)
+      await step.wait()
+      return {}
+
+    schedule = PeriodicJob(jobs, "recompute-metrics", run, interval_seconds=3600)
+    schedule.start()  # первый запуск — сразу при старте
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert schedule.tick() is None  # предыдущий ещё выполняется
+    step.set()
+    await asyncio.sleep(0)
+    second = schedule.tick()
+    await asyncio.sleep(0)
+    stats = schedule.stats()
+    await schedule.close()
+    await jobs.close()
+    return runs, second, stats
+
+  runs, second, stats = asyncio.run(scenario())
+  assert len(runs) == 2 and second is not None
+  assert stats["submitted"] == 2 and stats["skipped"] == 1
+
+
+def test_background_jobs_get_their_own_read_session():
+  state = SimpleNamespace(
+    postgres=None,
+    supabase="client",
+    read_router=ReplicaRouter("primary", "replica"),
+    catalog_cache=None,
+    single_flight=None,
+    catalog_version=None,
+    catalog_mirror=None,
+  )
+  repo, metrics = job_repositories(state)
+  # оба репозитория задачи делят одну сессию: запись задачи прижимает её чтения к primary
+  assert repo._reads is metrics._reads
+  repo._reads.note_write()
+  later, _ = job_repositories(state)
+  assert later._reads is not repo._reads and not later._reads.pinned
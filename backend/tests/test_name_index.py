@@ -0,0 +1,86 @@
+from difflib import SequenceMatcher
+from pathlib import Path
+import random
+import sys
+
+PROJECT_SRC = Path(__file__).resolve().parents[1] / "src"
+if str(PROJECT_SRC) not in sys.path:
+  sys.path.insert(0, str(PROJECT_SRC))
+
+from app.infrastructure.name_index import NameMatcher, normalize_name  # noqa: E402
+
+NAMES = [
+  'Озеро Балхаш',
+  'Бартогайское водохранилище',
+  'Капшагайское водохранилище',
+  'Канал Иртыш-Караганда',
+  'Большое Алматинское озеро',
+  'Аральское море',
+  'Шардаринское водохранилище',
+  'Кок',
+  'Озеро Зайсан',
+]
+
+
+def reference_match(name: str, names: list[str], min_ratio: float = 0.6) -> str | None:
+  """Построчный перебор, как в исходном find_by_similar_name."""
+  for candidate in names:
+    if candidate.lower() == name.lower():
+      return candidate
+  target = normalize_name(name)
+  best = None
+  for candidate in names:
+    normalized = normalize_name(candidate)
+    if normalized == target:
+      return candidate
+    ratio = SequenceMatcher(None, target, normalized).ratio()
+    if target in normalized or normalized in target:
+      ratio = max(ratio, 0.95)
+    if ratio >= min_ratio and (best is None or ratio > best[0]):
+      best = (ratio, candidate)
+  return best[1] if best else None
+
+
+def test_name_matcher_agrees_with_full_scan():
+  matcher = NameMatcher(NAMES, lambda name: name)
+  queries = [
+    'озеро балхаш',
+    'Бартогайское_водохранилище',
+    'Капшагайское вдхр',
+    'Канал Иртыш Караганда',
+    'Алматинское',
+    'Аральское',
+    'Шардара',
+    'кок',
+    'Кокколь',
+    'Зайсан',
+    'Совсем другое имя',
+  ]
+  for query in queries:
+    assert matcher.match(query) == reference_match(query, NAMES), query
+
+
+def test_name_matcher_prefers_substrings_and_respects_min_ratio():
+  matcher = NameMatcher(NAMES, lambda name: name)
+  assert matcher.match('Бартогайское') == 'Бартогайское водохранилище'
+  assert matcher.match('Неизвестный', min_ratio=0.9) is None
+
+
+def test_name_matcher_finds_better_rows_outside_the_shortlist():
+  # 'Аксу' не делит ни одной триграммы с запросом, но похоже сильнее, чем 'Ак сай'
+  matcher = NameMatcher(['Ак сай', 'Аксу'], lambda name: name)
+  assert matcher.match('Ак су') == 'Аксу'
+  assert NameMatcher(['ca b', 'dab'], lambda name: name).match('da b') == 'dab'
+
+
+def test_name_matcher_fuzz_agrees_with_full_scan():
+  rng = random.Random(11)
+  alphabet = 'abcd _-'
+  for _ in range(400):
+    names = [
+      ''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 7))) for _ in range(rng.randint(1, 8))
+    ]
+    matcher = NameMatcher(names, lambda name: name)
+    for _ in range(5):
+      query = ''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 7)))
+      assert matcher.match(query) == reference_match(query, names), (query, names)
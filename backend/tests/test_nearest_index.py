@@ -0,0 +1,103 @@
+from dataclasses import replace
+from datetime import date
+from pathlib import Path
+import random
+import sys
+
+PROJECT_SRC = Path(__file__).resolve().parents[1] / "src"
+if str(PROJECT_SRC) not in sys.path:
+  sys.path.insert(0, str(PROJECT_SRC))
+
+from app.domain.water_object import WaterObject  # noqa: E402
+from app.infrastructure import nearest_index  # noqa: E402
+from app.infrastructure.nearest_index import NearestIndex, haversine_km  # noqa: E402
+
+
+def _object(index: int, latitude: float, longitude: float, condition: int = 3) -> WaterObject:
+  return WaterObject(
+    id=f"id-{index:04d}",
+    name=f"Водохранилище {index}",
+    region="Алматинская",
+    resource_type="reservoir" if index % 2 else "lake",
+    water_type="fresh",
+    fauna=True,
+    passport_date=date(2015, 1, 1),
+    technical_condition=condition,
+    latitude=latitude,
+    longitude=longitude,
+    pdf_url=None,
+    priority=2,
+  )
+
+
+_random = random.Random(7)
+OBJECTS = [
+  _object(index, _random.uniform(40.5, 55.5), _random.uniform(46.5, 87.3), _random.randint(1, 5))
+  for index in range(2000)
+]
+
+
+def _brute_force(objects, latitude, longitude, k, matches=lambda obj: True):
+  ranked = sorted(
+    (haversine_km(latitude, longitude, obj.latitude, obj.longitude), obj.id)
+    for obj in objects
+    if matches(obj)
+  )
+  return [object_id for _, object_id in ranked[:k]]
+
+
+def _ids(found):
+  return [obj.id for obj, _ in found]
+
+
+def test_haversine_distance():
+  # Алматы — Астана, около 970 км по дуге большого круга
+  assert 960 < haversine_km(43.238, 76.946, 51.169, 71.449) < 980
+  assert haversine_km(10.0, 179.9, 10.0, -179.9) < 25
+
+
+def test_nearest_matches_a_full_scan():
+  index = NearestIndex()
+  index.reset(OBJECTS)
+  found = index.nearest(43.25, 76.9, 10)
+  assert _ids(found) == _brute_force(OBJECTS, 43.25, 76.9, 10)
+  distances = [distance for _, distance in found]
+  assert distances == sorted(distances)
+
+
+def test_filters_widen_the_search_until_enough_objects_match():
+  index = NearestIndex()
+  index.reset(OBJECTS)
+
+  def poor_reservoir(obj):
+    return obj.resource_type == "reservoir" and obj.technical_condition >= 5
+
+  found = index.nearest(50.0, 60.0, 10, poor_reservoir)
+  assert _ids(found) == _brute_force(OBJECTS, 50.0, 60.0, 10, poor_reservoir)
+  assert index.nearest(50.0, 60.0, 5, lambda obj: False) == []
+
+
+def test_writes_are_visible_before_the_rebuild(monkeypatch):
+  monkeypatch.setattr(nearest_index, "REBUILD_MIN_PENDING", 3)
+  index = NearestIndex()
+  index.reset(OBJECTS[:100])
+  assert index.builds == 1
+
+  # новый объект рядом с точкой и перенесённый объект
+  created = _object(5000, 43.2501, 76.9001)
+  moved = replace(OBJECTS[0], latitude=43.2502, longitude=76.9002)
+  index.add(created)
+  index.add(moved)
+  assert _ids(index.nearest(43.25, 76.9, 2)) == ["id-5000", "id-0000"]
+  assert index.builds == 1
+
+  # смена метрик без смены координат не требует перестройки
+  index.add(replace(OBJECTS[1], technical_condition=5))
+  assert index.stats()["pending"] == 2
+  assert index.nearest(0, 0, 100, lambda obj: obj.id == "id-0001")[0][0].technical_condition == 5
+
+  for number in range(3):
+    index.add(_object(6000 + number, 60.0, 60.0))
+  objects = [*OBJECTS[1:100], created, moved] + [_object(6000 + n, 60.0, 60.0) for n in range(3)]
+  assert _ids(index.nearest(55.0, 65.0, 8)) == _brute_force(objects, 55.0, 65.0, 8)
+  assert index.builds == 2 and index.stats()["pending"] == 0
@@ -0,0 +1,108 @@
+from datetime import date
+from pathlib import Path
+import base64
+import json
+import sys
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+PROJECT_SRC = Path(__file__).resolve().parents[1] / "src"
+if str(PROJECT_SRC) not in sys.path:
+  sys.path.insert(0, str(PROJECT_SRC))
+
+from app.core.deps import get_catalog_etag, get_water_object_repository  # noqa: E402
+from app.domain.water_object import WaterObjectPage  # noqa: E402
+from app.infrastructure.pagination import (  # noqa: E402
+  InvalidCursor,
+  decode_cursor,
+  encode_cursor,
+  keyset_filter,
+  quote_literal,
+)
+from app.interfaces.api.v1 import water_objects  # noqa: E402
+
+OBJECT_ID = "6f1c0d1e-0000-4000-8000-000000000001"
+
+
+@pytest.mark.parametrize("value", [3, None, "Озеро \"Старое\", №2", "2010-01-01", 2.5])
+def test_cursor_round_trips_the_sort_key(value):
+  cursor = encode_cursor("name", "asc", value, OBJECT_ID)
+  assert "=" not in cursor and "/" not in cursor and "+" not in cursor  # безопасен в query string
+  assert decode_cursor(cursor, "name", "asc") == (value, OBJECT_ID)
+
+
+def test_cursor_keeps_native_dates_readable():
+  cursor = encode_cursor("passport_date", "desc", date(2010, 1, 1), OBJECT_ID)
+  assert decode_cursor(cursor, "passport_date", "desc") == ("2010-01-01", OBJECT_ID)
+
+
+def _raw(payload) -> str:
+  return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize(
+  "cursor",
+  [
+    "not a cursor!",
+    _raw({"sort_by": "name"})[:-3],  # обрезанный
+    _raw(["name", "asc", 3]),  # не хватает id
+    _raw("name"),  # строка из четырёх символов тоже «распаковывается» в четыре поля
+    _raw(["name", "asc", 3, {"id": 1}]),
+    base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+  ],
+)
+def test_tampered_cursor_is_rejected(cursor):
+  with pytest.raises(InvalidCursor, match="Malformed"):
+    decode_cursor(cursor, "name", "asc")
+
+
+def test_cursor_from_another_sort_order_is_rejected():
+  cursor = encode_cursor("priority", "desc", 2, OBJECT_ID)
+  with pytest.raises(InvalidCursor, match="different sort order"):
+    decode_cursor(cursor, "priority", "asc")
+  with pytest.raises(InvalidCursor):
+    decode_cursor(cursor, "name", "desc")
+
+
+def test_quote_literal_escapes_postgrest_reserved_characters():
+  assert quote_literal("a,b.c") == '"a,b.c"'
+  assert quote_literal('say "hi"') == '"say \\"hi\\""'
+  assert quote_literal("C:\\dir") == '"C:\\\\dir"'
+  assert quote_literal(True) == '"true"'
+  assert quote_literal(3) == '"3"'
+
+
+def test_keyset_filter_places_nulls_like_postgres():
+  after = 'id.gt."x"'
+  # asc: NULLS LAST — после непустого ключа идут и бóльшие значения, и все null
+  assert keyset_filter("priority", False, 2, "x") == f'priority.gt."2",and(priority.eq."2",{after}),priority.is.null'
+  # desc: NULLS FIRST — null уже пройдены, остаются только меньшие значения
+  assert keyset_filter("priority", True, 2, "x") == f'priority.lt."2",and(priority.eq."2",{after})'
+  # курсор внутри блока null
+  assert keyset_filter("priority", False, None, "x") == f"and(priority.is.null,{after})"
+  assert keyset_filter("priority", True, None, "x") == f"and(priority.is.null,{after}),priority.not.is.null"
+
+
+class _Repository:
+  def __init__(self):
+    self.queries = []
+
+  async def list_page(self, query):
+    self.queries.append(query)
+    return WaterObjectPage(items=[], total=0 if query.count else None)
+
+
+def test_list_counts_only_when_the_client_asks():
+  app = FastAPI()
+  app.include_router(water_objects.router)
+  repo = _Repository()
+  app.dependency_overrides[get_water_object_repository] = lambda: repo
+  app.dependency_overrides[get_catalog_etag] = lambda: '"test"'
+  client = TestClient(app)
+
+  response = client.get("/water-objects")
+  assert repo.queries[-1].count is None and "X-Total-Count" not in response.headers
+  response = client.get("/water-objects", params={"count": "exact"})
+  assert repo.queries[-1].count == "exact" and response.headers["X-Total-Count"] == "0"
@@ -0,0 +1,97 @@
+from datetime import date
+from pathlib import Path
+import asyncio
+import io
+import sys
+import zipfile
+
+PROJECT_SRC = Path(__file__).resolve().parents[1] / "src"
+if str(PROJECT_SRC) not in sys.path:
+  sys.path.insert(0, str(PROJECT_SRC))
+
+from app.domain.water_object import WaterObject  # noqa: E402
+from app.infrastructure.name_index import NameMatcher  # noqa: E402
+from app.interfaces.api.v1.reports import _match_passports, _upload_passports  # noqa: E402
+
+
+def _object(object_id: str, name: str) -> WaterObject:
+  return WaterObject(
+    id=object_id,
+    name=name,
+    region="Алматинская",
+    resource_type="lake",
+    water_type="fresh",
+    fauna=True,
+    passport_date=date(2015, 1, 1),
+    technical_condition=3,
+    latitude=43.0,
+    longitude=76.0,
+    pdf_url=None,
+    priority=2,
+  )
+
+
+OBJECTS = [_object("id-1", "Озеро Балхаш"), _object("id-2", "Озеро Зайсан"), _object("id-3", "Аксу")]
+
+
+class _Repository:
+  def __init__(self):
+    self.pdf_urls: dict[str, str] = {}
+
+  async def name_matcher(self):
+    return NameMatcher(OBJECTS, lambda obj: obj.name)
+
+  async def update_pdf_url(self, object_id, pdf_url):
+    self.pdf_urls[object_id] = pdf_url
+
+
+class _Storage:
+  """Хранилище, которое отказывает на объекте id-2."""
+
+  def __init__(self):
+    self.uploaded: dict[str, bytes] = {}
+
+  async def upload_to_bucket(self, bucket, path, content, *, content_type, upsert):
+    await asyncio.sleep(0)
+    if path == "passports/id-2.pdf":
+      raise ConnectionError("storage is unavailable")
+    self.uploaded[path] = content
+
+  def get_public_url(self, bucket, path):
+    return f"https://storage/{bucket}/{path}"
+
+
+def _archive(files: dict[str, bytes]) -> zipfile.ZipFile:
+  buffer = io.BytesIO()
+  with zipfile.ZipFile(buffer, "w") as archive:
+    for name, content in files.items():
+      archive.writestr(name, content)
+  buffer.seek(0)
+  return zipfile.ZipFile(buffer)
+
+
+def test_failed_upload_is_reported_without_cancelling_the_others():
+  zip_file = _archive({
+    "Озеро_Балхаш.pdf": b"old",
+    "Озеро Зайсан.pdf": b"zaisan",
+    "Аксу.pdf": b"aksu",
+    "balkhash/Озеро-Балхаш.pdf": b"new",
+    "Неизвестное.pdf": b"?",
+  })
+  repo, storage = _Repository(), _Storage()
+  summary = {"processed": 0, "uploaded": 0, "skipped": 0, "failed": 0}
+  errors: list[dict] = []
+
+  async def scenario():
+    matched = await _match_passports(zip_file, repo, summary, errors)
+    return await _upload_passports(zip_file, matched, repo, storage, summary, errors)
+
+  items = asyncio.run(scenario())
+  assert summary == {"processed": 5, "uploaded": 2, "skipped": 2, "failed": 1}
+  assert sorted(item["object_id"] for item in items) == ["id-1", "id-3"]
+  # из двух файлов одного объекта загружен последний в архиве
+  assert storage.uploaded["passports/id-1.pdf"] == b"new"
+  assert set(repo.pdf_urls) == {"id-1", "id-3"}
+  failed = [error for error in errors if error.get("object_id") == "id-2"]
+  assert failed and "storage is unavailable" in failed[0]["reason"]
+  assert {error["file"] for error in errors} == {"Озеро_Балхаш.pdf", "Неизвестное.pdf", "Озеро Зайсан.pdf"}
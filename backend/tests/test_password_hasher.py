@@ -0,0 +1,51 @@
+from pathlib import Path
+import asyncio
+import sys
+
+import pytest
+
+PROJECT_SRC = Path(__file__).resolve().parents[1] / "src"
+if str(PROJECT_SRC) not in sys.path:
+  sys.path.insert(0, str(PROJECT_SRC))
+
+from app.core.security import PasswordHasher, PasswordHasherBusy  # noqa: E402
+
+
+def test_hash_and_verify_run_in_worker_processes():
+  hasher = PasswordHasher(workers=1, max_pending=4, rounds=4)
+
+  async def scenario():
+    hashed = await hasher.hash("secret123")
+    return await hasher.verify("secret123", hashed), await hasher.verify("wrong", hashed)
+
+  try:
+    assert asyncio.run(scenario()) == (True, False)
+  finally:
+    hasher.close()
+  assert hasher.stats()["completed"] == 3
+
+
+def test_full_queue_is_rejected_without_waiting():
+  hasher = PasswordHasher(workers=1, max_pending=0, rounds=4)
+
+  with pytest.raises(PasswordHasherBusy):
+    asyncio.run(hasher.hash("secret123"))
+  assert hasher.stats()["rejected"] == 1
+
+
+def test_pool_broken_by_a_dead_worker_is_replaced():
+  hasher = PasswordHasher(workers=1, max_pending=4, rounds=4)
+
+  async def scenario():
+    hashed = await hasher.hash("secret123")
+    # воркер убит снаружи (например, OOM killer) — пул становится BrokenProcessPool
+    for process in list(hasher._executor._processes.values()):
+      process.kill()
+      process.join()
+    return await hasher.verify("secret123", hashed)
+
+  try:
+    assert asyncio.run(scenario()) is True
+  finally:
+    hasher.close()
+  assert hasher.stats()["restarts"] == 1
@@ -0,0 +1,126 @@
+from pathlib import Path
+import asyncio
+import sqlite3
+import sys
+
+import pytest
+from psycopg import sql
+
+PROJECT_SRC = Path(__file__).resolve().parents[1] / "src"
+if str(PROJECT_SRC) not in sys.path:
+  sys.path.insert(0, str(PROJECT_SRC))
+
+from app.infrastructure.postgres.pool import conninfo_from_url, insert_statement  # noqa: E402
+from app.infrastructure.postgres.water_objects import (  # noqa: E402
+  EXACT_COUNT_LIMIT,
+  WaterObjectRepositoryPostgres,
+)
+
+
+def _sqlite(statement: sql.Composable) -> str:
+  # psycopg рендерит идентификаторы в двойных кавычках, как и sqlite; отличаются только плейсхолдеры
+  return statement.as_string(None).replace("%s", "?")
+
+
+def test_conninfo_drops_the_driver_suffix():
+  assert conninfo_from_url("postgresql+psycopg://user:pw@db:5432/app") == "postgresql://user:pw@db:5432/app"
+  assert conninfo_from_url("postgresql://user@db/app") == "postgresql://user@db/app"
+  assert conninfo_from_url("postgres+asyncpg://db/app?sslmode=require") == "postgres://db/app?sslmode=require"
+
+
+def test_insert_statement_renders_one_placeholder_group_per_row():
+  statement = insert_statement("water_objects", ["id", "name"], 2).as_string(None)
+  assert statement == 'insert into "water_objects" ("id", "name") values (%s, %s), (%s, %s) returning *'
+  upsert = insert_statement("computed_metrics", ["object_id", "priority_score"], 1, conflict_key="object_id")
+  assert upsert.as_string(None).endswith(
+    'on conflict ("object_id") do update set "priority_score" = excluded."priority_score" returning *'
+  )
+
+
+def test_upsert_statement_updates_existing_rows():
+  db = sqlite3.connect(":memory:")
+  db.execute("create table computed_metrics (object_id text primary key, priority_score int, marker_color text)")
+  columns = ["object_id", "priority_score", "marker_color"]
+  upsert = _sqlite(insert_statement("computed_metrics", columns, 2, conflict_key="object_id"))
+  db.execute(upsert, ["a", 10, "#111", "b", 20, "#222"]).fetchall()
+  returned = db.execute(upsert, ["a", 11, "#333", "c", 30, "#444"]).fetchall()
+  assert sorted(returned) == [("a", 11, "#333"), ("c", 30, "#444")]
+  assert db.execute("select * from computed_metrics order by object_id").fetchall() == [
+    ("a", 11, "#333"),
+    ("b", 20, "#222"),
+    ("c", 30, "#444"),
+  ]
+  # только ключ — конфликт переписывает сам ключ, а не падает на пустом set
+  key_only = _sqlite(insert_statement("computed_metrics", ["object_id"], 1, conflict_key="object_id"))
+  assert db.execute(key_only, ["a"]).fetchall() == [("a", 11, "#333")]
+
+
+ROWS = [("id-1", 2), ("id-2", None), ("id-3", 1), ("id-4", 2), ("id-5", None), ("id-6", 3)]
+
+
+def _postgres_order(descending: bool) -> list[tuple[str, int | None]]:
+  """Порядок Postgres по умолчанию: NULLS FIRST для desc, NULLS LAST для asc, затем id."""
+  present = sorted((row for row in ROWS if row[1] is not None), key=lambda row: row[0])
+  present.sort(key=lambda row: row[1], reverse=descending)
+  nulls = sorted(row for row in ROWS if row[1] is None)
+  return nulls + present if descending else present + nulls
+
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_keyset_returns_exactly_the_rows_after_the_cursor(descending):
+  db = sqlite3.connect(":memory:")
+  db.execute("create table catalog (id text, priority int)")
+  db.executemany("insert into catalog values (?, ?)", ROWS)
+  expected = _postgres_order(descending)
+  column = sql.Identifier("priority")
+  for position, (after_id, value) in enumerate(expected):
+    condition, params = WaterObjectRepositoryPostgres._keyset(column, descending, value, after_id)
+    rows = db.execute(f"select id, priority from catalog where {_sqlite(condition)}", params).fetchall()
+    assert sorted(rows) == sorted(expected[position + 1 :]), (after_id, value)
+
+
+class _Cursor:
+  def __init__(self, row):
+    self._row = row
+
+  async def fetchone(self):
+    return self._row
+
+
+class _Connection:
+  def __init__(self, planned: int, total: int):
+    self.planned = planned
+    self.total = total
+    self.statements: list[str] = []
+
+  async def execute(self, statement, params):
+    text = statement.as_string(None)
+    self.statements.append(text)
+    if text.startswith("explain"):
+      return _Cursor({"QUERY PLAN": [{"Plan": {"Plan Rows": self.planned}}]})
+    return _Cursor({"total": self.total})
+
+
+def _count(mode, planned, total=42):
+  repo = WaterObjectRepositoryPostgres(None)
+  conn = _Connection(planned, total)
+  where = sql.SQL(" where {col} = %s").format(col=sql.Identifier("region"))
+  return asyncio.run(repo._count(conn, mode, where, ["Абай"])), conn.statements
+
+
+def test_count_uses_the_plan_estimate_unless_the_result_is_small():
+  assert _count(None, planned=10) == (None, [])
+
+  total, statements = _count("planned", planned=10)
+  assert total == 10 and len(statements) == 1
+  assert statements[0] == 'explain (format json) select 1 from "water_objects_catalog" where "region" = %s'
+
+  # оценка мала — уточняем точным count(*)
+  total, statements = _count("estimated", planned=10)
+  assert total == 42 and statements[1].startswith("select count(*)")
+  # большую выборку не пересчитываем
+  total, statements = _count("estimated", planned=EXACT_COUNT_LIMIT + 1)
+  assert total == EXACT_COUNT_LIMIT + 1 and len(statements) == 1
+
+  total, statements = _count("exact", planned=10)
+  assert total == 42 and len(statements) == 1
@@ -0,0 +1,108 @@
+from datetime import date
+from pathlib import Path
+import sys
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+PROJECT_SRC = Path(__file__).resolve().parents[1] / "src"
+if str(PROJECT_SRC) not in sys.path:
+  sys.path.insert(0, str(PROJECT_SRC))
+
+from app.core.deps import get_catalog_etag, get_water_object_repository  # noqa: E402
+from app.domain.water_object import WaterObject, WaterObjectPage  # noqa: E402
+from app.infrastructure.records import water_object_to_row  # noqa: E402
+from app.interfaces import maps  # noqa: E402
+from app.interfaces.api.v1 import water_objects  # noqa: E402
+from app.schemas.water_object import WATER_OBJECT_FIELDS, parse_fields  # noqa: E402
+
+OBJECT = WaterObject(
+  id="6f1c0d1e-0000-4000-8000-000000000001",
+  name="Балхаш",
+  region="Карагандинская",
+  resource_type="lake",
+  water_type="non_fresh",
+  fauna=True,
+  passport_date=date(2010, 1, 1),
+  technical_condition=3,
+  latitude=46.0,
+  longitude=74.25,
+  pdf_url=None,
+  priority=2,
+  priority_category="medium",
+  priority_score=24,
+  marker_color="#f4b000",
+)
+
+
+class _Repository:
+  """Отдаёт строки так же, как репозитории: словари только запрошенных колонок при fields."""
+
+  def __init__(self):
+    self.queries = []
+
+  def _rows(self, query):
+    self.queries.append(query)
+    if query.fields is None:
+      return [OBJECT]
+    row = water_object_to_row(OBJECT)
+    return [{name: row[name] for name in query.fields}]
+
+  async def list_page(self, query):
+    return WaterObjectPage(items=self._rows(query))
+
+  async def list_filtered(self, query):
+    return self._rows(query)
+
+
+@pytest.fixture
+def client_and_repo():
+  app = FastAPI()
+  app.include_router(water_objects.router)
+  app.include_router(maps.router)
+  repo = _Repository()
+  app.dependency_overrides[get_water_object_repository] = lambda: repo
+  app.dependency_overrides[get_catalog_etag] = lambda: '"test"'
+  return TestClient(app), repo
+
+
+def test_parse_fields_puts_id_first_and_rejects_unknown_names():
+  assert parse_fields(None, WATER_OBJECT_FIELDS) is None
+  assert parse_fields("", WATER_OBJECT_FIELDS) is None
+  assert parse_fields(" name, latitude,name ,", WATER_OBJECT_FIELDS) == ("id", "name", "latitude")
+  assert parse_fields("id,name", WATER_OBJECT_FIELDS) == ("id", "name")
+  with pytest.raises(ValueError, match="Unknown fields: depth"):
+    parse_fields("name,depth", WATER_OBJECT_FIELDS)
+
+
+def test_projected_list_rows_carry_only_the_requested_fields(client_and_repo):
+  client, repo = client_and_repo
+  response = client.get("/water-objects", params={"fields": "name,latitude"})
+  assert response.status_code == 200
+  assert response.json() == [{"id": OBJECT.id, "name": "Балхаш", "latitude": 46.0}]
+  assert repo.queries[-1].fields == ("id", "name", "latitude")
+
+  # без fields — полная строка каталога
+  full = client.get("/water-objects").json()
+  assert set(full[0]) == set(WATER_OBJECT_FIELDS)
+  assert client.get("/water-objects", params={"fields": "depth"}).status_code == 400
+
+
+def test_projected_map_rows_read_only_the_columns_they_need(client_and_repo):
+  client, repo = client_and_repo
+  response = client.get("/maps", params={"fields": "coordinates,markerColor"})
+  assert response.json() == [
+    {"id": OBJECT.id, "markerColor": "#f4b000", "coordinates": {"lat": 46.0, "lng": 74.25}}
+  ]
+  assert set(repo.queries[-1].fields) == {"id", "latitude", "longitude", "marker_color", "technical_condition"}
+
+
+def test_openapi_keeps_the_full_response_models(client_and_repo):
+  client, _ = client_and_repo
+  paths = client.get("/openapi.json").json()["paths"]
+  listed = paths["/water-objects"]["get"]["responses"]["200"]
+  assert listed["content"]["application/json"]["schema"]["items"]["$ref"].endswith("/WaterObjectResponse")
+  assert "fields=" in listed["description"]
+  mapped = paths["/maps"]["get"]["responses"]["200"]
+  assert mapped["content"]["application/json"]["schema"]["items"]["$ref"].endswith("/MapObject")
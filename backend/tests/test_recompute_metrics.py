@@ -0,0 +1,204 @@
+from dataclasses import replace
+from datetime import date
+from contextlib import asynccontextmanager
+from pathlib import Path
+import asyncio
+import sys
+
+PROJECT_SRC = Path(__file__).resolve().parents[1] / "src"
+if str(PROJECT_SRC) not in sys.path:
+  sys.path.insert(0, str(PROJECT_SRC))
+
+from app.application.metrics.use_cases import (  # noqa: E402
+  RecomputeMetrics,
+  metric_inputs,
+  metric_stamp,
+  model_input,
+  recompute_job,
+)
+from app.domain.bulk import BulkWriteResult  # noqa: E402
+from app.models.condition_model import (  # noqa: E402
+  DEFAULT_WEIGHTS,
+  TECHNICAL_COLUMNS,
+  calculate_priority_score,
+  compute_conditions_batch,
+  compute_technical_condition,
+  marker_color_for_condition,
+  model_version,
+)
+
+IMPORTED = date(2025, 6, 1)
+
+
+class _MetricsRepository:
+  """computed_metrics в памяти с той же семантикой отбора устаревших строк, что у репозиториев."""
+
+  def __init__(self, rows):
+    self.rows = {row["object_id"]: row for row in rows}
+    self.upserted: list[str] = []
+    self.stamped: list[str] = []
+
+  async def iter_stale(self, reference_year, version, *, full=False, chunk_size=1000):
+    stale = [
+      dict(row)
+      for _, row in sorted(self.rows.items())
+      if full
+      or row.get("reference_year") != reference_year
+      or (row.get("model_version") is not None and row["model_version"] != version)
+    ]
+    for start in range(0, len(stale), chunk_size):
+      yield stale[start : start + chunk_size]
+
+  async def upsert_many(self, payloads, *, chunk_size=500):
+    for payload in payloads:
+      self.rows[payload["object_id"]].update(payload)
+      self.upserted.append(payload["object_id"])
+    return BulkWriteResult(items=list(payloads))
+
+  async def stamp_many(self, object_ids, stamp, *, chunk_size=500):
+    for object_id in object_ids:
+      self.rows[object_id].update(stamp)
+      self.stamped.append(object_id)
+    return len(object_ids)
+
+
+CSV_ROWS = [
+  # старый паспорт: возраст входит и в состояние, и в приоритет
+  {"passport_date": "1990-01-01", "depth_max_m": "2", "fish_presence": "нет"},
+  # возраст больше 30 лет: состояние от года не зависит
+  {"passport_date": "1960-05-01", "depth_max_m": "15", "vegetation_surface": "слабо", "fish_presence": "есть",
+   "fish_productivity": "70"},
+  {"passport_date": "2024-02-01", "depth_max_m": "", "phytoplankton_level": "сильно"},
+]
+
+
+def _imported_rows():
+  """Строки так, как их записывает импорт CSV."""
+  batch = compute_conditions_batch(
+    {column: [row.get(column) for row in CSV_ROWS] for column in TECHNICAL_COLUMNS}, reference_date=IMPORTED
+  )
+  stamp = metric_stamp(IMPORTED, model_version())
+  return [
+    {
+      "object_id": f"id-{position}",
+      "passport_date": row["passport_date"],
+      "technical_condition": int(batch.technical_condition[position]),
+      "priority_score": int(batch.priority_score[position]),
+      "priority_category": str(batch.priority_category[position]),
+      "marker_color": str(batch.marker_color[position]),
+      **metric_inputs(row),
+      **stamp,
+    }
+    for position, row in enumerate(CSV_ROWS)
+  ]
+
+
+def _run(repo, **options):
+  full = options.pop("full", False)
+  return asyncio.run(RecomputeMetrics(repo, **options)(full=full))
+
+
+def test_inputs_are_stored_in_model_form():
+  assert metric_inputs({"depth_max_m": "2.5", "fish_productivity": "", "fish_presence": "есть"}) == {
+    "depth_max_m": 2.5,
+    "vegetation_surface": None,
+    "vegetation_underwater": None,
+    "phytoplankton_level": None,
+    "fish_presence": "есть",
+    "fish_productivity": None,
+  }
+
+
+def test_non_finite_inputs_are_stored_as_null():
+  # NaN и бесконечность не сериализуются в JSON для PostgREST
+  stored = metric_inputs({"depth_max_m": "nan", "fish_productivity": float("inf")})
+  assert stored["depth_max_m"] is None and stored["fish_productivity"] is None
+  assert model_input("depth_max_m", "-inf") == ""
+  assert model_input("depth_max_m", "3") == "3"
+  assert model_input("fish_presence", "nan") == "nan"
+
+
+def test_model_version_follows_weights():
+  assert model_version() == model_version()
+  assert model_version(replace(DEFAULT_WEIGHTS, age=0.3)) != model_version()
+
+
+def test_current_rows_are_not_touched():
+  repo = _MetricsRepository(_imported_rows())
+  report = _run(repo, reference_date=date(2025, 12, 31))
+  assert report.scanned == 0
+  assert repo.upserted == repo.stamped == []
+
+
+def test_new_year_rewrites_changed_rows_with_the_scalar_result():
+  repo = _MetricsRepository(_imported_rows())
+  today = date(2026, 1, 1)
+  report = _run(repo, reference_date=today)
+  # возраст в приоритете растёт у каждого объекта
+  assert report.progress() == {"scanned": 3, "changed": 3, "stamped": 0, "failed": 0}
+  for position, source in enumerate(CSV_ROWS):
+    row = repo.rows[f"id-{position}"]
+    condition = compute_technical_condition(source, reference_date=today)
+    assert row["technical_condition"] == condition
+    assert (row["priority_score"], row["priority_category"]) == calculate_priority_score(
+      source["passport_date"], condition, reference_date=today
+    )
+    assert row["reference_year"] == 2026 and row["model_version"] == model_version()
+
+  # повторный запуск в том же году ничего не читает
+  assert _run(repo, reference_date=today).scanned == 0
+
+
+def test_weight_change_only_rewrites_rows_whose_values_moved():
+  repo = _MetricsRepository(_imported_rows())
+  weights = replace(DEFAULT_WEIGHTS, phytoplankton=0.45)
+  report = _run(repo, reference_date=IMPORTED, weights=weights)
+  assert report.scanned == 3
+  assert report.changed == len(repo.upserted) and report.stamped == len(repo.stamped)
+  moved = [
+    f"id-{position}"
+    for position, source in enumerate(CSV_ROWS)
+    if compute_technical_condition(source, weights=weights, reference_date=IMPORTED)
+    != compute_technical_condition(source, reference_date=IMPORTED)
+  ]
+  # перезаписаны только строки, у которых сменилось состояние; остальным обновлена отметка
+  assert repo.upserted == moved and 0 < len(moved) < len(CSV_ROWS)
+  assert all(row["model_version"] == model_version(weights) for row in repo.rows.values())
+
+
+def test_rows_without_stored_inputs_get_priority_from_their_condition():
+  rows = [
+    {"object_id": "legacy-1", "passport_date": "2000-01-01", "technical_condition": 4, "priority_score": 31,
+     "priority_category": "high", "marker_color": marker_color_for_condition(4)},
+    {"object_id": "legacy-2", "passport_date": "2000-01-01", "technical_condition": None},
+  ]
+  repo = _MetricsRepository(rows)
+  report = _run(repo, reference_date=date(2026, 3, 1))
+  assert repo.rows["legacy-1"]["technical_condition"] == 4
+  assert repo.rows["legacy-1"]["priority_score"] == (6 - 4) * 3 + 26
+  assert repo.rows["legacy-1"]["model_version"] is None
+  assert report.failed == 1 and report.errors[0]["object_id"] == "legacy-2"
+
+
+class _Job:
+  def report(self, progress, errors):
+    pass
+
+
+def test_recompute_is_skipped_when_another_process_holds_the_lock():
+  repo = _MetricsRepository(_imported_rows())
+  released = []
+
+  def lock(locked):
+    @asynccontextmanager
+    async def hold():
+      yield locked
+      released.append(locked)
+
+    return hold()
+
+  recompute = RecomputeMetrics(repo, reference_date=date(2026, 1, 1))
+  busy = asyncio.run(recompute_job(recompute, lock=lock(False))(_Job()))
+  assert "skipped" in busy and repo.upserted == []
+  done = asyncio.run(recompute_job(recompute, lock=lock(True))(_Job()))
+  assert done["scanned"] == 3 and released == [False, True]
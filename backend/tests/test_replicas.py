@@ -0,0 +1,106 @@
+from pathlib import Path
+import asyncio
+import sys
+
+PROJECT_SRC = Path(__file__).resolve().parents[1] / "src"
+if str(PROJECT_SRC) not in sys.path:
+  sys.path.insert(0, str(PROJECT_SRC))
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+from postgrest import APIError  # noqa: E402
+
+from app.infrastructure.replicas import ReadSession, ReplicaRouter  # noqa: E402
+from app.infrastructure.supabase.client import project_url, replica_unavailable  # noqa: E402
+
+
+class FakeClock:
+  def __init__(self):
+    self.now = 0.0
+
+  def __call__(self) -> float:
+    return self.now
+
+
+class Down(Exception):
+  pass
+
+
+async def _name(target: str) -> str:
+  if target == "down":
+    raise Down()
+  return target
+
+
+def test_reads_go_to_replica_and_writes_pin_the_request():
+  clock = FakeClock()
+  router = ReplicaRouter("primary", "replica", sticky_seconds=5, clock=clock)
+  first, second = ReadSession(router), ReadSession(router)
+
+  assert asyncio.run(first.read(_name)) == "replica"
+  first.note_write()
+  assert asyncio.run(first.read(_name)) == "primary"
+  # соседний запрос тоже читает с primary, пока реплика может отставать
+  assert asyncio.run(second.read(_name)) == "primary"
+  clock.now = 5.0
+  assert asyncio.run(second.read(_name)) == "replica"
+  assert asyncio.run(first.read(_name)) == "primary"
+
+
+def test_unhealthy_replica_falls_back_to_primary_until_retry():
+  clock = FakeClock()
+  router = ReplicaRouter("primary", "down", unavailable_errors=(Down,), retry_seconds=30, clock=clock)
+
+  assert asyncio.run(router.read(_name)) == "primary"
+  assert router.stats()["fallbacks"] == 1
+  assert router.stats()["healthy"] is False
+  # до истечения паузы реплику не трогаем
+  assert asyncio.run(router.read(_name)) == "primary"
+  assert router.stats()["fallbacks"] == 1
+  clock.now = 30.0
+  assert asyncio.run(router.read(_name)) == "primary"
+  assert router.stats()["fallbacks"] == 2
+
+
+def test_without_replica_everything_reads_primary():
+  router = ReplicaRouter("primary")
+  assert asyncio.run(router.read(_name)) == "primary"
+  assert router.stats()["configured"] is False
+
+
+def test_only_server_side_postgrest_errors_fall_back():
+  failures = {"replica": APIError({"code": "PGRST002", "message": "no schema cache"})}
+
+  async def read(target):
+    if target in failures:
+      raise failures[target]
+    return target
+
+  router = ReplicaRouter(
+    "primary", "replica", unavailable_errors=(APIError,), is_unavailable=replica_unavailable
+  )
+  assert asyncio.run(router.read(read)) == "primary"
+  assert router.stats()["fallbacks"] == 1
+
+  # ошибка запроса повторилась бы и на primary — отдаём её как есть, реплика остаётся здоровой
+  router = ReplicaRouter(
+    "primary", "replica", unavailable_errors=(APIError,), is_unavailable=replica_unavailable
+  )
+  failures["replica"] = APIError({"code": "42703", "message": "column does not exist"})
+  with pytest.raises(APIError):
+    asyncio.run(router.read(read))
+  assert router.stats()["healthy"] is True
+
+
+def test_replica_unavailable_classifies_errors():
+  assert replica_unavailable(httpx.ConnectError("refused"))
+  assert replica_unavailable(APIError({"code": 503, "message": "JSON could not be generated"}))
+  assert replica_unavailable(APIError({"code": "57P01", "message": "terminating connection"}))
+  assert not replica_unavailable(APIError({"code": "PGRST116", "message": "0 rows"}))
+  assert not replica_unavailable(APIError({"code": 404, "message": "not found"}))
+  assert not replica_unavailable(ValueError("bad"))
+
+
+def test_replica_url_may_be_given_as_postgrest_url():
+  assert project_url("https://replica.supabase.co") == "https://replica.supabase.co"
+  assert project_url("https://replica.supabase.co/rest/v1/") == "https://replica.supabase.co"
@@ -0,0 +1,86 @@
+from datetime import date
+from pathlib import Path
+import sys
+
+PROJECT_SRC = Path(__file__).resolve().parents[1] / "src"
+if str(PROJECT_SRC) not in sys.path:
+  sys.path.insert(0, str(PROJECT_SRC))
+
+from app.domain.water_object import WaterObject  # noqa: E402
+from app.infrastructure.search_index import SearchIndex, search_terms  # noqa: E402
+
+CATALOG = [
+  ("Балхаш", "Карагандинская"),
+  ("Большое Алматинское озеро", "Алматинская"),
+  ("Капчагайское водохранилище", "Алматинская"),
+  ("Канал Иртыш-Караганда", "Павлодарская"),
+  ("Озеро Ёлкино", "Костанайская"),
+  ("Щучье", "Акмолинская"),
+]
+
+
+def _object(index: int, name: str, region: str) -> WaterObject:
+  return WaterObject(
+    id=f"id-{index}",
+    name=name,
+    region=region,
+    resource_type="lake",
+    water_type="fresh",
+    fauna=True,
+    passport_date=date(2015, 1, 1),
+    technical_condition=3,
+    latitude=46.0,
+    longitude=74.0,
+    pdf_url=None,
+    priority=2,
+  )
+
+
+OBJECTS = [_object(index, name, region) for index, (name, region) in enumerate(CATALOG)]
+
+
+def _loaded_index(objects=OBJECTS) -> SearchIndex:
+  index = SearchIndex()
+  index.reset(objects)
+  return index
+
+
+def _names(index: SearchIndex, text: str) -> list[str]:
+  return [obj.name for obj, _ in index.search(text)]
+
+
+def test_terms_follow_name_normalization():
+  assert search_terms("Озеро_Ёлкино-Большое  ") == ["озеро", "елкино", "большое"]
+
+
+def test_prefix_typo_and_multi_term_matches():
+  index = _loaded_index()
+  assert _names(index, "балх") == ["Балхаш"]
+  # перестановка и замена буквы — одна правка
+  assert _names(index, "блахаш") == ["Балхаш"]
+  assert _names(index, "Балкаш") == ["Балхаш"]
+  # опечатка внутри префикса
+  assert _names(index, "капчагаиск") == ["Капчагайское водохранилище"]
+  assert _names(index, "елкино") == ["Озеро Ёлкино"]
+  # все слова запроса должны найтись
+  assert _names(index, "алм озеро") == ["Большое Алматинское озеро"]
+  assert _names(index, "иртыш караг") == ["Канал Иртыш-Караганда"]
+  assert _names(index, "xyz") == []
+
+
+def test_name_matches_rank_above_region_matches():
+  index = _loaded_index()
+  ranked = _names(index, "алматинское")
+  assert ranked[0] == "Большое Алматинское озеро"
+  assert "Капчагайское водохранилище" in ranked
+
+
+def test_added_objects_are_searchable_and_reindexed():
+  index = _loaded_index()
+  index.add(_object(10, "Зеркальное", "Абай"))
+  assert _names(index, "зеркал") == ["Зеркальное"]
+
+  index.add(_object(10, "Тенгиз", "Акмолинская"))
+  assert _names(index, "зеркал") == []
+  assert _names(index, "тенгиз") == ["Тенгиз"]
+  assert len(index) == len(OBJECTS) + 1
@@ -0,0 +1,83 @@
+from pathlib import Path
+import asyncio
+import sys
+
+PROJECT_SRC = Path(__file__).resolve().parents[1] / "src"
+if str(PROJECT_SRC) not in sys.path:
+  sys.path.insert(0, str(PROJECT_SRC))
+
+from app.infrastructure.single_flight import SingleFlight  # noqa: E402
+
+
+def test_concurrent_callers_share_one_call():
+  flights = SingleFlight()
+  calls = []
+
+  async def load():
+    calls.append(1)
+    await asyncio.sleep(0.01)
+    return object()
+
+  async def scenario():
+    results = await asyncio.gather(*(flights.do("key", load) for _ in range(10)))
+    # завершённый вызов не переиспользуется
+    again = await flights.do("key", load)
+    return results, again
+
+  results, again = asyncio.run(scenario())
+  assert len(calls) == 2
+  assert all(result is results[0] for result in results)
+  assert again is not results[0]
+  assert flights.stats()["followers"] == 9
+  assert flights.stats()["in_flight"] == 0
+
+
+def test_errors_reach_every_caller():
+  flights = SingleFlight()
+
+  async def load():
+    await asyncio.sleep(0.01)
+    raise ValueError("boom")
+
+  async def scenario():
+    return await asyncio.gather(*(flights.do("key", load) for _ in range(3)), return_exceptions=True)
+
+  results = asyncio.run(scenario())
+  assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_forget_starts_a_fresh_call_after_a_write():
+  flights = SingleFlight()
+  calls = []
+
+  async def load():
+    calls.append(1)
+    number = len(calls)
+    await asyncio.sleep(0.01)
+    return number
+
+  async def scenario():
+    before = asyncio.ensure_future(flights.do("key", load))
+    await asyncio.sleep(0)
+    flights.forget()
+    after = await flights.do("key", load)
+    return await before, after
+
+  assert asyncio.run(scenario()) == (1, 2)
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_call():
+  flights = SingleFlight()
+
+  async def load():
+    await asyncio.sleep(0.01)
+    return "done"
+
+  async def scenario():
+    first = asyncio.ensure_future(flights.do("key", load))
+    second = asyncio.ensure_future(flights.do("key", load))
+    await asyncio.sleep(0)
+    first.cancel()
+    return await second
+
+  assert asyncio.run(scenario()) == "done"
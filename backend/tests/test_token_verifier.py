@@ -0,0 +1,82 @@
+from pathlib import Path
+import sys
+import time
+
+import pytest
+from jose import JWTError, jwt
+
+PROJECT_SRC = Path(__file__).resolve().parents[1] / "src"
+if str(PROJECT_SRC) not in sys.path:
+  sys.path.insert(0, str(PROJECT_SRC))
+
+from app.core.security import TokenVerifier  # noqa: E402
+
+
+class FakeClock:
+  def __init__(self, now: float):
+    self.now = now
+
+  def __call__(self) -> float:
+    return self.now
+
+
+NOW = int(time.time())
+
+
+def _token(secret: str, exp: int) -> str:
+  return jwt.encode({"sub": "alice", "exp": exp}, secret, algorithm="HS256")
+
+
+def test_verified_token_is_served_from_cache():
+  verifier = TokenVerifier(wall_clock=FakeClock(NOW))
+  token = _token("s1", exp=NOW + 3600)
+
+  assert verifier.decode(token, "s1", "HS256")["sub"] == "alice"
+  assert verifier.decode(token, "s1", "HS256")["sub"] == "alice"
+  assert verifier.stats()["hits"] == 1
+  assert verifier.stats()["misses"] == 1
+
+
+def test_callers_get_their_own_copy_of_cached_claims():
+  verifier = TokenVerifier(wall_clock=FakeClock(NOW))
+  token = _token("s1", exp=NOW + 3600)
+
+  verifier.decode(token, "s1", "HS256")["sub"] = "mallory"
+  cached = verifier.decode(token, "s1", "HS256")
+  cached["role"] = "expert"
+  assert verifier.decode(token, "s1", "HS256") == {"sub": "alice", "exp": NOW + 3600}
+
+
+def test_secret_change_drops_cached_tokens():
+  verifier = TokenVerifier(wall_clock=FakeClock(NOW))
+  token = _token("s1", exp=NOW + 3600)
+  verifier.decode(token, "s1", "HS256")
+
+  # токен, подписанный старым секретом, снова проходит полную проверку и отклоняется
+  with pytest.raises(JWTError):
+    verifier.decode(token, "s2", "HS256")
+  assert verifier.stats()["size"] == 0
+
+
+def test_cached_entry_expires_with_the_token():
+  clock = FakeClock(NOW)
+  verifier = TokenVerifier(wall_clock=clock)
+  token = _token("s1", exp=NOW + 3600)
+  verifier.decode(token, "s1", "HS256")
+
+  clock.now = NOW + 3599
+  verifier.decode(token, "s1", "HS256")
+  assert verifier.stats()["hits"] == 1
+  # по наступлении exp запись больше не используется
+  clock.now = NOW + 3600
+  verifier.decode(token, "s1", "HS256")
+  assert verifier.stats()["expirations"] == 1
+
+
+def test_expired_tokens_are_rejected():
+  verifier = TokenVerifier()
+  token = _token("s1", exp=NOW - 10)
+
+  with pytest.raises(JWTError):
+    verifier.decode(token, "s1", "HS256")
+  assert verifier.stats()["size"] == 0